@@ -0,0 +1,57 @@
+"""
+Benchmark for ReportGenerator.generate_csv_report.
+
+Populates an in-memory index with N duplicate groups (two files per group, sharing
+both the exact and the potential match hash) and times the report generation.
+Run from the project root:
+
+    python benchmarks/bench_report_generator.py [groups ...]
+"""
+import os
+import sys
+import tempfile
+import time
+
+# Add the src directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from database import DatabaseManager
+from report_generator import ReportGenerator
+
+def populate(db_manager, groups, files_per_group=2):
+    rows = (
+        (f"file_{group}.bin", f"dir_{copy}/file_{group}.bin", 1024, "0", "00",
+         f"exact{group:012d}", f"potential{group:012d}")
+        for group in range(groups)
+        for copy in range(files_per_group)
+    )
+    with db_manager.connection:
+        db_manager.connection.executemany('''
+            INSERT INTO files (
+                filename, relative_full_path, file_size, creation_time,
+                first_10_bytes, exact_match_hash, potential_match_hash
+            ) VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
+
+def run(groups):
+    db_manager = DatabaseManager(':memory:')
+    db_manager.create_table()
+    populate(db_manager, groups)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_file = os.path.join(tmp_dir, "report.csv")
+        start = time.perf_counter()
+        ReportGenerator(db_manager).generate_csv_report(output_file)
+        elapsed = time.perf_counter() - start
+    db_manager.close()
+    return elapsed
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000]
+    results = [(groups, run(groups)) for groups in sizes]
+    print()
+    print(f"{'groups':>10} {'seconds':>10} {'us/group':>10}")
+    for groups, elapsed in results:
+        print(f"{groups:>10} {elapsed:>10.3f} {elapsed / groups * 1e6:>10.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+End-to-end benchmark for the scan, index and report phases.
+
+Builds a synthetic directory tree in a temporary directory (file count, directory
+fanout, log-normal file sizes and the fraction of files that are copies of another
+file are configurable), then runs the scanner into a fresh index database twice:
+a cold scan that hashes every file and a warm re-scan served from the hash cache.
+For each run it prints the per-phase timers and counters recorded by the scanner
+(see stats) with files/s, bytes read and DB write rates, plus the read/write
+syscalls and bytes reported by /proc/self/io where available (Linux).
+Run from the project root:
+
+    python benchmarks/bench_scanner.py [--files N] [--fanout N] [--median-kb N]
+        [--sigma X] [--duplicates RATIO] [--near-duplicates THRESHOLD] [--seed N]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+# Add the src directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+import stats
+from database import DatabaseManager
+from report_generator import ReportGenerator
+from scanner import FileScanner
+from utils import set_debug_mode
+
+def build_tree(root, files, fanout, median_kb, sigma, duplicates, seed):
+    """
+    Writes the synthetic tree: files are spread over a tree of directories with
+    fanout subdirectories per level, and a duplicates fraction of them are copies
+    of a previously written file.
+
+    :return: The total number of bytes written.
+    """
+    rng = random.Random(seed)
+    directories = [root]
+    while len(directories) * fanout < files:
+        parent = directories[len(directories) // fanout] if len(directories) > 1 else root
+        directories.append(os.path.join(parent, f"dir_{len(directories)}"))
+    for directory in directories:
+        os.makedirs(directory, exist_ok=True)
+
+    written = []
+    total = 0
+    for index in range(files):
+        if written and rng.random() < duplicates:
+            content = rng.choice(written)
+        else:
+            size = max(1, int(rng.lognormvariate(0, sigma) * median_kb * 1024))
+            content = rng.randbytes(size)
+            written.append(content)
+        path = os.path.join(directories[index % len(directories)], f"file_{index}.bin")
+        with open(path, "wb") as f:
+            f.write(content)
+        total += len(content)
+    return total
+
+def read_proc_io():
+    """
+    Returns the I/O counters of this process (rchar, wchar, syscr, syscw), or None.
+    """
+    try:
+        with open("/proc/self/io") as f:
+            return {key: int(value) for key, value in (line.split(": ") for line in f)}
+    except OSError:
+        return None
+
+def run(label, target_folder, db_path, report_path, near_duplicates):
+    stats.reset()
+    db_manager = DatabaseManager(db_path, near_duplicate_threshold=near_duplicates)
+    db_manager.create_table()
+    io_before = read_proc_io()
+    start = time.perf_counter()
+    FileScanner(target_folder).scan(db_manager.insert_file)
+    io_scan = read_proc_io()
+    ReportGenerator(db_manager).generate_csv_report(report_path)
+    elapsed = time.perf_counter() - start
+    io_after = read_proc_io()
+    db_manager.close()
+
+    snapshot = stats.snapshot()
+    phases = snapshot['phases']
+    print(f"\n{label}: {elapsed:.2f}s")
+    for phase_name in ('scan', 'index', 'report'):
+        print(f"  {phase_name:<8}{phases.get(phase_name, 0.0):8.3f}s")
+    for line in stats.summary_lines():
+        if line.split(':')[0] not in phases:
+            print(f"  {line}")
+    if io_before is not None:
+        for name, first, second in (('scan+index', io_before, io_scan), ('report', io_scan, io_after)):
+            delta = {key: second[key] - first[key] for key in ('rchar', 'wchar', 'syscr', 'syscw')}
+            print(f"  {name:<11}read syscalls {delta['syscr']}, write syscalls {delta['syscw']}, "
+                  f"read {delta['rchar'] / (1024 * 1024):.1f} MiB, written {delta['wchar'] / (1024 * 1024):.1f} MiB")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scan, index and report phases.")
+    parser.add_argument("--files", type=int, default=5000, help="Number of files")
+    parser.add_argument("--fanout", type=int, default=20, help="Files and subdirectories per directory")
+    parser.add_argument("--median-kb", type=float, default=16, help="Median file size in KiB")
+    parser.add_argument("--sigma", type=float, default=1.5, help="Log-normal sigma of the file sizes")
+    parser.add_argument("--duplicates", type=float, default=0.2, help="Fraction of files that are copies")
+    parser.add_argument("--near-duplicates", type=float, default=None, help="Near-duplicate threshold (disabled by default)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    set_debug_mode(False)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        target_folder = os.path.join(tmp_dir, "tree")
+        total = build_tree(target_folder, args.files, args.fanout, args.median_kb, args.sigma, args.duplicates, args.seed)
+        print(f"Built {args.files} files ({total / (1024 * 1024):.1f} MiB, {args.duplicates:.0%} copies) in {target_folder}")
+        db_path = os.path.join(tmp_dir, "index.db")
+        report_path = os.path.join(tmp_dir, "report.csv")
+        run("Cold scan", target_folder, db_path, report_path, args.near_duplicates)
+        run("Warm re-scan", target_folder, db_path, report_path, args.near_duplicates)
+
+if __name__ == "__main__":
+    main()
@@ -2,4 +2,5 @@
 from .database import DatabaseManager
 from .report_generator import ReportGenerator
 from .scanner import FileScanner
-from .utils import calculate_file_hash, read_file_metadata, extract_first_n_bytes
\ No newline at end of file
+from .utils import calculate_file_hash, read_file_metadata, extract_first_n_bytes
+from .hashing import available_algorithms, get_hasher, hash_file, register_algorithm
\ No newline at end of file
@@ -1,13 +1,39 @@
 import os
 import sqlite3
 import hashlib
-from utils import extract_first_n_bytes, debug, error, info
+from hashing import DEFAULT_ALGORITHM, get_hasher, is_cryptographic
+import similarity
+import stats
+from utils import extract_first_n_bytes, calculate_file_hash, is_valid_file, debug, error, info
 
 class DatabaseManager:
-    def __init__(self, db_path='db/index.db'):
-        info(f"Connecting to database at {db_path}...")
+    def __init__(self, db_path='db/index.db', hash_algorithm=DEFAULT_ALGORITHM,
+                 near_duplicate_threshold=None, near_duplicate_max_size=256 * 1024 * 1024):
+        """
+        :param db_path: The path to the SQLite index database.
+        :param hash_algorithm: The algorithm used for full-content hashing; must be a
+            cryptographic digest, since files with equal digests are reported as exact duplicates.
+        :param near_duplicate_threshold: The Jaccard similarity above which two files are near
+            duplicates, or None to disable near-duplicate detection.
+        :param near_duplicate_max_size: Files larger than this are not sketched for near duplicates.
+        """
+        get_hasher(hash_algorithm)  # Fail fast on an unsupported algorithm
+        if not is_cryptographic(hash_algorithm):
+            raise ValueError(
+                f"Hash algorithm {hash_algorithm} is a non-cryptographic checksum: unrelated files would be "
+                f"reported as exact duplicates when their checksums collide. Use md5, sha1, sha256 or blake2b."
+            )
+        self.hash_algorithm = hash_algorithm
+        self.near_duplicate_threshold = near_duplicate_threshold
+        self.near_duplicate_max_size = near_duplicate_max_size
+        self.lsh_bands, self.lsh_rows = (
+            similarity.lsh_parameters(near_duplicate_threshold) if near_duplicate_threshold else (None, None)
+        )
+        # The scan session of the current scan; files indexed during it are tagged with its id
+        self.scan_generation = 0
+        info("Connecting to database at %s...", db_path)
         self.connection = sqlite3.connect(db_path)
-        info(f"Connected to database at {db_path}.")
+        info("Connected to database at %s.", db_path)
 
     def create_table(self):
         with self.connection:
@@ -23,15 +49,107 @@ class DatabaseManager:
                     potential_match_hash TEXT NOT NULL
                 )
             ''')
+            # Indexes backing the duplicate lookups (GROUP BY / IN on the hash columns)
+            self.connection.execute('CREATE INDEX IF NOT EXISTS idx_files_exact_match_hash ON files (exact_match_hash)')
+            self.connection.execute('CREATE INDEX IF NOT EXISTS idx_files_potential_match_hash ON files (potential_match_hash)')
+            self.connection.execute('CREATE INDEX IF NOT EXISTS idx_files_file_size ON files (file_size)')
+            # Add column 'scan_generation' to indexes created before scan sessions existed
+            columns = [row[1] for row in self.connection.execute("PRAGMA table_info(files)")]
+            if 'scan_generation' not in columns:
+                self.connection.execute("ALTER TABLE files ADD COLUMN scan_generation INTEGER NOT NULL DEFAULT 0")
+            # Scan sessions; the id of a session is the scan generation of the files it indexed,
+            # and a session still 'running' at startup was interrupted and is resumed
+            self.connection.execute('''
+                CREATE TABLE IF NOT EXISTS scan_sessions (
+                    id INTEGER PRIMARY KEY,
+                    target_folder TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    started_at TEXT NOT NULL DEFAULT (datetime('now')),
+                    finished_at TEXT
+                )
+            ''')
+            # Directories whose files were all indexed by a running session
+            self.connection.execute('''
+                CREATE TABLE IF NOT EXISTS scanned_directories (
+                    session_id INTEGER NOT NULL,
+                    path TEXT NOT NULL,
+                    PRIMARY KEY (session_id, path)
+                ) WITHOUT ROWID
+            ''')
+            # Content digests keyed by file identity and version, so renamed or moved
+            # files reuse the digest instead of being read again
+            self.connection.execute('''
+                CREATE TABLE IF NOT EXISTS hash_cache (
+                    st_dev INTEGER NOT NULL,
+                    st_ino INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    digest TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    algorithm TEXT NOT NULL DEFAULT 'md5',
+                    PRIMARY KEY (st_dev, st_ino, size, mtime_ns)
+                ) WITHOUT ROWID
+            ''')
+            # Add column 'algorithm' to hash caches created before it existed (all md5)
+            columns = [row[1] for row in self.connection.execute("PRAGMA table_info(hash_cache)")]
+            if 'algorithm' not in columns:
+                self.connection.execute("ALTER TABLE hash_cache ADD COLUMN algorithm TEXT NOT NULL DEFAULT 'md5'")
+            # MinHash sketches for near-duplicate detection, recomputed only when the content digest changes
+            self.connection.execute('''
+                CREATE TABLE IF NOT EXISTS file_sketches (
+                    path TEXT PRIMARY KEY,
+                    digest TEXT NOT NULL,
+                    signature BLOB NOT NULL
+                ) WITHOUT ROWID
+            ''')
+            # LSH band buckets of the sketches; files sharing a bucket are near-duplicate candidates
+            self.connection.execute('''
+                CREATE TABLE IF NOT EXISTS lsh_buckets (
+                    band INTEGER NOT NULL,
+                    bucket INTEGER NOT NULL,
+                    path TEXT NOT NULL
+                )
+            ''')
+            self.connection.execute('CREATE INDEX IF NOT EXISTS idx_lsh_buckets_bucket ON lsh_buckets (band, bucket)')
+            self.connection.execute('CREATE INDEX IF NOT EXISTS idx_lsh_buckets_path ON lsh_buckets (path)')
+            self.connection.execute('''
+                CREATE TABLE IF NOT EXISTS lsh_settings (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    bands INTEGER NOT NULL,
+                    rows INTEGER NOT NULL
+                )
+            ''')
+        if self.near_duplicate_threshold:
+            self._sync_lsh_buckets()
+
+    def _sync_lsh_buckets(self):
+        """
+        Rebuilds the LSH buckets from the stored sketches when the banding changed
+        (i.e. the near-duplicate threshold was changed since the buckets were written).
+        """
+        settings = self.connection.execute('SELECT bands, rows FROM lsh_settings WHERE id = 1').fetchone()
+        if settings == (self.lsh_bands, self.lsh_rows):
+            return
+        info("Rebuilding near-duplicate buckets for %d bands of %d rows...", self.lsh_bands, self.lsh_rows)
+        with self.connection:
+            self.connection.execute('DELETE FROM lsh_buckets')
+            cursor = self.connection.execute('SELECT path, signature FROM file_sketches')
+            for path, blob in cursor:
+                self._insert_lsh_buckets(path, similarity.signature_from_bytes(blob))
+            self.connection.execute(
+                'INSERT OR REPLACE INTO lsh_settings (id, bands, rows) VALUES (1, ?, ?)',
+                (self.lsh_bands, self.lsh_rows)
+            )
+        info("Rebuilding near-duplicate buckets...done.")
 
     def insert_file(self, relative_full_path, metadata):
         """
         Inserts or updates a file record in the database.
 
         :param relative_full_path: The relative path of the file.
-        :param metadata: A dictionary containing file metadata (size, created_time, filename).
+        :param metadata: A dictionary containing file metadata as returned by read_file_metadata.
         """
-        debug(f"Inserting/updating file: {relative_full_path}...")
+        debug("Inserting/updating file: %s", relative_full_path)
         # Extract metadata
         filename = metadata["filename"]
         file_size = metadata["size"]
@@ -40,19 +158,23 @@ class DatabaseManager:
         # Read the first 10 bytes of the file
         first_10_bytes = extract_first_n_bytes(relative_full_path, 10)
 
-        # Generate hashes
-        # Generate exact match hash and potential match hash
-
         # Generate exact match hash
-        # This hash is based on the filename, file size, creation time, and the first 10 bytes
-        # This is a simplified example; in a real-world scenario, you might want to use a more complex method
-        # to generate a hash.
-        # For example, you could use a combination of the filename, file size, creation time, and a hash of the first 10 bytes.
-        # The exact match hash is a unique identifier for the file.
-        # It should be unique for each file, even if the file is renamed or moved.
-        exact_match_hash = hashlib.sha256(
-            f"{filename}{file_size}{creation_time}{first_10_bytes}".encode()
-        ).hexdigest()
+        # Readable files are matched on a digest of their full content, served from the
+        # hash cache when the same file version was hashed before. Files whose content
+        # cannot be read (e.g. Google Drive placeholders) fall back to a hash of the
+        # filename, file size, creation time and first 10 bytes.
+        stats.add('files_indexed')
+        if is_valid_file(relative_full_path):
+            exact_match_hash = self._get_content_hash(relative_full_path, metadata)
+            if self.near_duplicate_threshold and similarity.MIN_FILE_SIZE <= file_size <= self.near_duplicate_max_size:
+                self._update_sketch(relative_full_path, exact_match_hash)
+            else:
+                self._delete_sketch(relative_full_path)
+        else:
+            exact_match_hash = hashlib.sha256(
+                f"{filename}{file_size}{creation_time}{first_10_bytes}".encode()
+            ).hexdigest()
+            self._delete_sketch(relative_full_path)
 
         # Generate potential match hash
         # This hash is based on file size and the first 10 bytes
@@ -65,59 +187,427 @@ class DatabaseManager:
 
         # Insert or update the record
         with self.connection:
-            debug(f"Inserting/updating file: {filename}, Path: {relative_full_path}")
             self.connection.execute('''
                 INSERT INTO files (
                     filename, relative_full_path, file_size, creation_time, 
-                    first_10_bytes, exact_match_hash, potential_match_hash
-                ) VALUES (?, ?, ?, ?, ?, ?, ?)
+                    first_10_bytes, exact_match_hash, potential_match_hash, scan_generation
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
                 ON CONFLICT(relative_full_path) DO UPDATE SET
                     filename=excluded.filename,
                     file_size=excluded.file_size,
                     creation_time=excluded.creation_time,
                     first_10_bytes=excluded.first_10_bytes,
                     exact_match_hash=excluded.exact_match_hash,
-                    potential_match_hash=excluded.potential_match_hash
+                    potential_match_hash=excluded.potential_match_hash,
+                    scan_generation=excluded.scan_generation
             ''', (filename, relative_full_path, file_size, creation_time,
-                  first_10_bytes.hex(), exact_match_hash, potential_match_hash))
+                  first_10_bytes.hex(), exact_match_hash, potential_match_hash, self.scan_generation))
+        stats.add('db_writes')
+        stats.add('db_commits')
+
+    def start_scan_session(self, target_folder):
+        """
+        Starts a scan session for the target folder, or resumes the session of an
+        interrupted scan of it. Files indexed from now on are tagged with the session id.
+
+        :param target_folder: The absolute path of the scanned folder.
+        :return: A tuple of the session id and True if an interrupted session was resumed.
+        """
+        row = self.connection.execute(
+            "SELECT id FROM scan_sessions WHERE target_folder = ? AND status = 'running' ORDER BY id DESC LIMIT 1",
+            (target_folder,)
+        ).fetchone()
+        resumed = row is not None
+        if resumed:
+            self.scan_generation = row[0]
+        else:
+            with self.connection:
+                cursor = self.connection.execute(
+                    "INSERT INTO scan_sessions (target_folder, status) VALUES (?, 'running')", (target_folder,)
+                )
+            self.scan_generation = cursor.lastrowid
+        return self.scan_generation, resumed
+
+    def get_completed_directories(self):
+        """
+        Returns the directories whose files were all indexed by the current scan session.
+        """
+        cursor = self.connection.execute(
+            'SELECT path FROM scanned_directories WHERE session_id = ?', (self.scan_generation,)
+        )
+        return {row[0] for row in cursor}
+
+    def mark_directory_completed(self, path):
+        """
+        Records that the files of a directory were all indexed by the current scan session,
+        so a resumed scan skips them.
+
+        :param path: The path of the directory.
+        """
+        with self.connection:
+            self.connection.execute(
+                'INSERT OR IGNORE INTO scanned_directories (session_id, path) VALUES (?, ?)',
+                (self.scan_generation, path)
+            )
+        stats.add('db_writes')
+        stats.add('db_commits')
+
+    def finish_scan_session(self, include_subdirectories=True):
+        """
+        Completes the current scan session and removes the files under its target folder
+        that it did not index (deleted, moved away or excluded since an earlier scan),
+        together with their near-duplicate sketches.
+
+        :param include_subdirectories: Whether the scan was recursive; if not, only the
+            direct children of the target folder are removed.
+        :return: The number of removed files.
+        """
+        target_folder = self.connection.execute(
+            'SELECT target_folder FROM scan_sessions WHERE id = ?', (self.scan_generation,)
+        ).fetchone()[0]
+        condition, parameters = self._folder_condition(target_folder, include_subdirectories)
+        stale_condition = f'scan_generation != ? AND {condition}'
+        stale = f'SELECT relative_full_path FROM files WHERE {stale_condition}'
+        parameters = (self.scan_generation,) + parameters
+        info("Removing files not found by the scan...")
+        with self.connection:
+            self.connection.execute(f'DELETE FROM lsh_buckets WHERE path IN ({stale})', parameters)
+            self.connection.execute(f'DELETE FROM file_sketches WHERE path IN ({stale})', parameters)
+            removed = self.connection.execute(
+                f'DELETE FROM files WHERE {stale_condition}', parameters
+            ).rowcount
+            self.connection.execute('DELETE FROM scanned_directories WHERE session_id = ?', (self.scan_generation,))
+            self.connection.execute(
+                "UPDATE scan_sessions SET status = 'completed', finished_at = datetime('now') WHERE id = ?",
+                (self.scan_generation,)
+            )
+        info("Removing files not found by the scan...done. Removed %d files.", removed)
+        return removed
+
+    def get_file_hashes(self, relative_full_path):
+        """
+        Returns the exact and potential match hashes of an indexed file.
+
+        :param relative_full_path: The relative path of the file.
+        :return: A tuple (exact_match_hash, potential_match_hash), or None if the file is not indexed.
+        """
+        return self.connection.execute(
+            'SELECT exact_match_hash, potential_match_hash FROM files WHERE relative_full_path = ?',
+            (relative_full_path,)
+        ).fetchone()
+
+    def delete_file(self, relative_full_path):
+        """
+        Removes a file from the index, together with its near-duplicate sketch.
+
+        :param relative_full_path: The relative path of the file.
+        :return: The (exact_match_hash, potential_match_hash) of the removed file, or None
+            if it was not indexed.
+        """
+        hashes = self.get_file_hashes(relative_full_path)
+        if hashes is None:
+            return None
+        with self.connection:
+            self.connection.execute('DELETE FROM lsh_buckets WHERE path = ?', (relative_full_path,))
+            self.connection.execute('DELETE FROM file_sketches WHERE path = ?', (relative_full_path,))
+            self.connection.execute('DELETE FROM files WHERE relative_full_path = ?', (relative_full_path,))
+        stats.add('db_writes', 3)
+        stats.add('db_commits')
+        return hashes
+
+    def delete_directory(self, path):
+        """
+        Removes all files under a directory from the index, together with their sketches.
+
+        :param path: The path of the directory.
+        :return: A list of the (exact_match_hash, potential_match_hash) of the removed files.
+        """
+        prefix = os.path.join(path, '')
+        under = 'substr(relative_full_path, 1, ?) = ?'
+        parameters = (len(prefix), prefix)
+        hashes = self.connection.execute(
+            f'SELECT exact_match_hash, potential_match_hash FROM files WHERE {under}', parameters
+        ).fetchall()
+        with self.connection:
+            for table in ('lsh_buckets', 'file_sketches'):
+                self.connection.execute(
+                    f'DELETE FROM {table} WHERE path IN (SELECT relative_full_path FROM files WHERE {under})', parameters
+                )
+            self.connection.execute(f'DELETE FROM files WHERE {under}', parameters)
+        stats.add('db_writes', 3)
+        stats.add('db_commits')
+        return hashes
+
+    def get_duplicate_groups(self, hash_column, hashes):
+        """
+        Returns the current members of the groups of the given hashes, e.g. the groups
+        affected by a change, without scanning the other groups.
+
+        :param hash_column: Either 'exact_match_hash' or 'potential_match_hash'.
+        :param hashes: The hashes of the groups.
+        :return: A dictionary mapping each hash to the sorted paths of the files sharing it
+            (empty or a single path when the group no longer holds duplicates).
+        """
+        if hash_column not in ('exact_match_hash', 'potential_match_hash'):
+            raise ValueError(f"Unsupported hash column: {hash_column}")
+        groups = {hash_value: [] for hash_value in hashes}
+        hashes = list(groups)
+        # Stay below SQLite's limit on the number of query parameters
+        for start in range(0, len(hashes), 500):
+            chunk = hashes[start:start + 500]
+            cursor = self.connection.execute(
+                f'SELECT {hash_column}, relative_full_path FROM files WHERE {hash_column} IN ({",".join("?" * len(chunk))}) '
+                f'ORDER BY relative_full_path',
+                chunk
+            )
+            for hash_value, path in cursor:
+                groups[hash_value].append(path)
+        return groups
+
+    def _update_sketch(self, relative_full_path, digest):
+        """
+        Computes and stores the MinHash sketch and LSH buckets of a file, unless the
+        stored sketch was computed from the same content. Committed together with the
+        file record by insert_file.
+
+        :param relative_full_path: The relative path of the file.
+        :param digest: The content digest of the file.
+        """
+        row = self.connection.execute('SELECT digest FROM file_sketches WHERE path = ?', (relative_full_path,)).fetchone()
+        if row is not None and row[0] == digest:
+            return
+        signature = similarity.file_signature(relative_full_path)
+        self.connection.execute(
+            'INSERT OR REPLACE INTO file_sketches (path, digest, signature) VALUES (?, ?, ?)',
+            (relative_full_path, digest, similarity.signature_to_bytes(signature))
+        )
+        self.connection.execute('DELETE FROM lsh_buckets WHERE path = ?', (relative_full_path,))
+        self._insert_lsh_buckets(relative_full_path, signature)
+        stats.add('db_writes', 2 + self.lsh_bands)
+
+    def _delete_sketch(self, relative_full_path):
+        """
+        Removes the sketch and LSH buckets of a file that is no longer sketched (e.g. it
+        shrank below similarity.MIN_FILE_SIZE), so it stops being reported as a near
+        duplicate. Committed together with the file record by insert_file.
+
+        :param relative_full_path: The relative path of the file.
+        """
+        self.connection.execute('DELETE FROM lsh_buckets WHERE path = ?', (relative_full_path,))
+        self.connection.execute('DELETE FROM file_sketches WHERE path = ?', (relative_full_path,))
+
+    def _insert_lsh_buckets(self, path, signature):
+        self.connection.executemany(
+            'INSERT INTO lsh_buckets (band, bucket, path) VALUES (?, ?, ?)',
+            [(band, bucket, path) for band, bucket in similarity.band_buckets(signature, self.lsh_bands, self.lsh_rows)]
+        )
+
+    def _get_content_hash(self, relative_full_path, metadata):
+        """
+        Returns the content digest of a file, reading the file only on a cache miss.
+
+        The cache is keyed by (st_dev, st_ino, size, mtime_ns): a rename or move within
+        the same device keeps the key, while any modification changes it.
+
+        :param relative_full_path: The relative path of the file.
+        :param metadata: A dictionary containing file metadata as returned by read_file_metadata.
+        :return: The hex digest of the file content.
+        """
+        if metadata.get("device") is None or not metadata.get("inode") or metadata.get("modified_time_ns") is None:
+            # No stable file identity (e.g. metadata from another source); always hash
+            return calculate_file_hash(relative_full_path, self.hash_algorithm)
+        key = self._hash_cache_key(metadata["device"], metadata["inode"], metadata["size"], metadata["modified_time_ns"])
+
+        row = self.connection.execute(
+            'SELECT digest, path FROM hash_cache WHERE st_dev = ? AND st_ino = ? AND size = ? AND mtime_ns = ? AND algorithm = ?',
+            (*key, self.hash_algorithm)
+        ).fetchone()
+        if row is not None:
+            stats.add('hash_cache_hits')
+            digest, cached_path = row
+            if cached_path != relative_full_path:
+                # Renamed or moved: remember the new location for vacuum_hash_cache
+                self.connection.execute(
+                    'UPDATE hash_cache SET path = ? WHERE st_dev = ? AND st_ino = ? AND size = ? AND mtime_ns = ?',
+                    (relative_full_path, *key)
+                )
+            return digest
+
+        stats.add('hash_cache_misses')
+        digest = calculate_file_hash(relative_full_path, self.hash_algorithm)
+        # Committed together with the file record by insert_file; replaces a digest
+        # computed with a previously configured algorithm
+        self.connection.execute(
+            'INSERT OR REPLACE INTO hash_cache (st_dev, st_ino, size, mtime_ns, digest, path, algorithm) VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (*key, digest, relative_full_path, self.hash_algorithm)
+        )
+        stats.add('db_writes')
+        return digest
+
+    @staticmethod
+    def _hash_cache_key(st_dev, st_ino, size, mtime_ns):
+        """
+        Builds a hash cache key, folding unsigned 64-bit identifiers (Windows file IDs)
+        into SQLite's signed INTEGER range.
+        """
+        def to_signed(value):
+            return value - (1 << 64) if value >= (1 << 63) else value
+        return (to_signed(st_dev), to_signed(st_ino), size, mtime_ns)
+
+    def vacuum_hash_cache(self):
+        """
+        Evicts hash cache entries whose file version no longer exists.
+
+        An entry is stale when its last known path is gone or now refers to a different
+        inode, size or modification time (the file was deleted, replaced or modified).
+
+        :return: The number of evicted entries.
+        """
+        info("Vacuuming hash cache...")
+        stale_keys = []
+        cursor = self.connection.execute('SELECT st_dev, st_ino, size, mtime_ns, path FROM hash_cache')
+        for st_dev, st_ino, size, mtime_ns, path in cursor:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                stale_keys.append((st_dev, st_ino, size, mtime_ns))
+                continue
+            if self._hash_cache_key(stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns) != (st_dev, st_ino, size, mtime_ns):
+                stale_keys.append((st_dev, st_ino, size, mtime_ns))
+        with self.connection:
+            self.connection.executemany(
+                'DELETE FROM hash_cache WHERE st_dev = ? AND st_ino = ? AND size = ? AND mtime_ns = ?',
+                stale_keys
+            )
+        info("Vacuuming hash cache...done. Evicted %d entries.", len(stale_keys))
+        return len(stale_keys)
+
+    @staticmethod
+    def _folder_condition(folder, include_subdirectories=True):
+        """
+        Returns an SQL condition selecting the files under a folder, and its parameters.
+
+        :param folder: The path of the folder.
+        :param include_subdirectories: Whether files in subdirectories are selected, or only
+            the direct children of the folder.
+        """
+        prefix = os.path.join(folder, '')
+        condition = 'substr(relative_full_path, 1, ?) = ?'
+        parameters = (len(prefix), prefix)
+        if not include_subdirectories:
+            condition += ' AND instr(substr(relative_full_path, ?), ?) = 0'
+            parameters += (len(prefix) + 1, os.sep)
+        return condition, parameters
+
+    def count_files(self, folder, include_subdirectories=True):
+        """
+        Returns the number of indexed files under a folder.
+
+        :param folder: The path of the folder.
+        :param include_subdirectories: Whether files in subdirectories are counted.
+        """
+        condition, parameters = self._folder_condition(folder, include_subdirectories)
+        return self.connection.execute(f'SELECT COUNT(*) FROM files WHERE {condition}', parameters).fetchone()[0]
 
     def get_exact_duplicates(self):
-        info(f"Fetching exact duplicates from the database...")
+        """
+        Yields the files sharing an exact match hash with at least one other file, ordered by hash.
+        """
+        info("Fetching exact duplicates from the database...")
+        return self._iter_duplicates('exact_match_hash')
+
+    def get_potential_duplicates(self):
+        """
+        Yields the files sharing a potential match hash with at least one other file, ordered by hash.
+        """
+        info("Fetching potential duplicates from the database...")
+        return self._iter_duplicates('potential_match_hash')
+
+    def _iter_duplicates(self, hash_column):
+        """
+        Streams duplicate records for the given hash column straight from the cursor.
+
+        Rows are fetched lazily, so the result set is never materialized as a whole.
+
+        :param hash_column: Either 'exact_match_hash' or 'potential_match_hash'.
+        """
+        if hash_column not in ('exact_match_hash', 'potential_match_hash'):
+            raise ValueError(f"Unsupported hash column: {hash_column}")
         cursor = self.connection.cursor()
-        cursor.execute('''
-            SELECT exact_match_hash, filename, relative_full_path, file_size
+        cursor.arraysize = 1000
+        cursor.execute(f'''
+            SELECT {hash_column}, filename, relative_full_path, file_size
             FROM files
-            WHERE exact_match_hash IN (
-                SELECT exact_match_hash
+            WHERE {hash_column} IN (
+                SELECT {hash_column}
                 FROM files
-                GROUP BY exact_match_hash
+                GROUP BY {hash_column}
                 HAVING COUNT(*) > 1
             )
-            ORDER BY exact_match_hash
+            ORDER BY {hash_column}
         ''')
-        results = cursor.fetchall()
-        info(f"Found {len(results)} exact duplicates.")
-        # Convert results to a list of dictionaries
-        return [{'hash': row[0], 'filename': row[1], 'path': row[2], 'size': row[3]} for row in results]
-    
-    def get_potential_duplicates(self):
-        info(f"Fetching potential duplicates from the database...")
+        count = 0
+        try:
+            while True:
+                rows = cursor.fetchmany()
+                if not rows:
+                    break
+                for row in rows:
+                    yield {'hash': row[0], 'filename': row[1], 'path': row[2], 'size': row[3]}
+                count += len(rows)
+        finally:
+            cursor.close()
+        info("Found %d duplicates by %s.", count, hash_column)
+
+    def get_near_duplicates(self):
+        """
+        Yields pairs of files whose estimated content similarity reaches the near-duplicate
+        threshold, excluding pairs that are exact duplicates.
+
+        Only files sharing at least one LSH bucket are compared, so the cost follows the
+        number of candidate pairs rather than all pairs of files.
+
+        :return: A generator of dictionaries with path, filename, duplicate_path,
+            duplicate_filename and similarity keys.
+        """
+        if not self.near_duplicate_threshold:
+            return
+        info("Fetching near duplicates (similarity >= %s) from the database...", self.near_duplicate_threshold)
         cursor = self.connection.cursor()
+        cursor.arraysize = 1000
         cursor.execute('''
-            SELECT potential_match_hash, filename, relative_full_path, file_size
-            FROM files
-            WHERE potential_match_hash IN (
-                SELECT potential_match_hash
-                FROM files
-                GROUP BY potential_match_hash
-                HAVING COUNT(*) > 1
-            )
-            ORDER BY potential_match_hash
+            SELECT fa.relative_full_path, fa.filename, fb.relative_full_path, fb.filename,
+                   sa.signature, sb.signature
+            FROM (
+                SELECT DISTINCT a.path AS path_a, b.path AS path_b
+                FROM lsh_buckets a
+                JOIN lsh_buckets b ON a.band = b.band AND a.bucket = b.bucket AND a.path < b.path
+            ) candidates
+            JOIN files fa ON fa.relative_full_path = candidates.path_a
+            JOIN files fb ON fb.relative_full_path = candidates.path_b
+            JOIN file_sketches sa ON sa.path = candidates.path_a
+            JOIN file_sketches sb ON sb.path = candidates.path_b
+            WHERE fa.exact_match_hash != fb.exact_match_hash
+            ORDER BY fa.relative_full_path, fb.relative_full_path
         ''')
-        results = cursor.fetchall()
-        info(f"Found {len(results)} potential duplicates.")
-        # Convert results to a list of dictionaries
-        return [{'hash': row[0], 'filename': row[1], 'path': row[2], 'size': row[3]} for row in results]
+        count = 0
+        try:
+            while True:
+                rows = cursor.fetchmany()
+                if not rows:
+                    break
+                for path, filename, dpath, dfilename, blob_a, blob_b in rows:
+                    score = similarity.estimate_similarity(
+                        similarity.signature_from_bytes(blob_a), similarity.signature_from_bytes(blob_b)
+                    )
+                    if score >= self.near_duplicate_threshold:
+                        count += 1
+                        yield {'path': path, 'filename': filename,
+                               'duplicate_path': dpath, 'duplicate_filename': dfilename,
+                               'similarity': score}
+        finally:
+            cursor.close()
+        info("Found %d near duplicate pairs.", count)
 
     def close(self):
         info("Closing database connection...")
@@ -0,0 +1,135 @@
+import hashlib
+import mmap
+import os
+import zlib
+import stats
+
+try:
+    import xxhash
+except ImportError:  # Optional dependency, only needed for the xxh* algorithms
+    xxhash = None
+
+DEFAULT_ALGORITHM = "md5"
+
+# Size of the reusable read buffer
+BUFFER_SIZE = 1024 * 1024
+
+# Files at least this large are hashed through a read-only memory map
+MMAP_THRESHOLD = 64 * 1024 * 1024
+
+class Crc32:
+    """
+    hashlib-style wrapper around zlib.crc32.
+
+    A fast, non-cryptographic checksum, not a proof of identity: only used to measure
+    hashing throughput (see benchmarks/bench_hashing.py).
+    """
+    name = "crc32"
+    digest_size = 4
+
+    def __init__(self):
+        self._value = 0
+
+    def update(self, data):
+        self._value = zlib.crc32(data, self._value)
+
+    def digest(self):
+        return self._value.to_bytes(4, "big")
+
+    def hexdigest(self):
+        return f"{self._value:08x}"
+
+_algorithms = {
+    "md5": hashlib.md5,
+    "sha1": hashlib.sha1,
+    "sha256": hashlib.sha256,
+    "blake2b": hashlib.blake2b,
+    "crc32": Crc32,
+}
+# Fast checksums that are not collision resistant: with enough files, unrelated
+# contents share a digest. They are available to hash_file (e.g. for benchmarks)
+# but refused as the exact match digest (see is_cryptographic).
+_non_cryptographic = {"crc32"}
+if xxhash is not None:
+    _algorithms["xxh64"] = xxhash.xxh64
+    _algorithms["xxh3_128"] = xxhash.xxh3_128
+    _non_cryptographic.update(("xxh64", "xxh3_128"))
+
+def register_algorithm(name, factory, cryptographic=True):
+    """
+    Registers a hashing algorithm.
+
+    :param name: The name used to select the algorithm (e.g. in config.yaml).
+    :param factory: A callable returning a new object with hashlib's update/hexdigest interface.
+    :param cryptographic: False if the digests are not collision resistant, so the algorithm
+        cannot be used to identify exact duplicates.
+    """
+    name = name.lower()
+    _algorithms[name] = factory
+    if cryptographic:
+        _non_cryptographic.discard(name)
+    else:
+        _non_cryptographic.add(name)
+
+def is_cryptographic(algorithm):
+    """
+    Returns True if the digests of the algorithm are collision resistant enough to treat
+    files with equal digests as exact duplicates.
+
+    :param algorithm: The name of a registered algorithm.
+    """
+    return algorithm.lower() not in _non_cryptographic
+
+def available_algorithms():
+    """
+    Returns the names of the registered hashing algorithms.
+    """
+    return sorted(_algorithms)
+
+def get_hasher(algorithm=DEFAULT_ALGORITHM):
+    """
+    Creates a new hash object for the given algorithm.
+
+    :param algorithm: The name of a registered algorithm.
+    :return: A new hash object.
+    :raises ValueError: If the algorithm is not registered.
+    """
+    try:
+        factory = _algorithms[algorithm.lower()]
+    except KeyError:
+        raise ValueError(f"Unsupported hash algorithm: {algorithm}. Available algorithms: {', '.join(available_algorithms())}.")
+    return factory()
+
+def hash_file(file_path, algorithm=DEFAULT_ALGORITHM, buffer_size=BUFFER_SIZE, mmap_threshold=MMAP_THRESHOLD):
+    """
+    Calculates the hex digest of a file's content.
+
+    Small and medium files are read with readinto() into a single reusable buffer,
+    so no bytes object is allocated per chunk. Files of at least mmap_threshold
+    bytes are memory mapped and handed to the hash object in one call.
+
+    :param file_path: The path to the file.
+    :param algorithm: The name of a registered algorithm.
+    :param buffer_size: The size of the read buffer.
+    :param mmap_threshold: The minimum file size hashed through mmap.
+    :return: The hex digest of the file content.
+    """
+    hasher = get_hasher(algorithm)
+    with open(file_path, "rb", buffering=0) as f:
+        size = os.fstat(f.fileno()).st_size
+        stats.add('files_hashed')
+        if size and size >= mmap_threshold:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                hasher.update(mapped)
+            stats.add('bytes_read', size)
+            return hasher.hexdigest()
+
+        buffer = bytearray(buffer_size)
+        view = memoryview(buffer)
+        while True:
+            read = f.readinto(buffer)
+            if not read:
+                break
+            stats.add('bytes_read', read)
+            hasher.update(view[:read])
+    return hasher.hexdigest()
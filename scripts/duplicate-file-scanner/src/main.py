@@ -2,10 +2,15 @@ import sys
 import os
 from database import DatabaseManager
 from scanner import FileScanner
+from watcher import ChangeWatcher
 from report_generator import ReportGenerator
-from utils import info, debug, error, set_debug_mode
+from progress import ProgressReporter
+from utils import info, debug, error, configure_logging, set_debug_mode, shutdown_logging
+import stats
 
 def main():
+    configure_logging()
+
     # Load configuration
     import yaml
     with open("config.yaml", "r") as config_file:
@@ -14,8 +19,13 @@ def main():
     target_folder = config.get("target_folder")
     include_subdirectories = config.get("include_subdirectories", True)
     report_format = config.get("report_format", "csv")
+    hash_algorithm = config.get("hash_algorithm", "md5")
+    duplicate_threshold = config.get("duplicate_threshold")
+    near_duplicate_max_size_mb = config.get("near_duplicate_max_size_mb", 256)
     set_debug_mode(config.get("debug", True))
     exclude_files = config.get("exclude_files", [])
+    watch = config.get("watch", False)
+    watch_interval_seconds = config.get("watch_interval_seconds", 2)
 
     if not target_folder:
         print("Error: Target folder is not specified in config.yaml.")
@@ -23,18 +33,23 @@ def main():
 
     # Normalize and check the path
     target_folder = os.path.abspath(target_folder.strip())
-    debug(f"Target folder is '{target_folder}'")  # Debugging line
+    debug("Target folder is '%s'", target_folder)
     if not os.path.exists(target_folder):
-        error(f"Target folder {target_folder} does not exist.")
+        error("Target folder %s does not exist.", target_folder)
         sys.exit(1)
 
     db_manager: DatabaseManager = None  # Initialize db_manager to None
+    scan_running = False  # Whether a scan session was started and not finished yet
 
     try:
         
         # Step 1: Initialize the database
         info("Initializing database...")
-        db_manager = DatabaseManager()
+        db_manager = DatabaseManager(
+            hash_algorithm=hash_algorithm,
+            near_duplicate_threshold=duplicate_threshold,
+            near_duplicate_max_size=near_duplicate_max_size_mb * 1024 * 1024
+        )
         db_manager.create_table()  # Ensure the database table is created
         info("Initializing database...done.")
 
@@ -47,11 +62,39 @@ def main():
         info("Initializing file scanner...")
         scanner = FileScanner(target_folder, include_subdirectories, exclude_files)
         info("Initializing file scanner...done.")
-        info(f"Target folder: {target_folder}")
-        info(f"Include subdirectories: {include_subdirectories}")
+        info("Target folder: %s", target_folder)
+        info("Include subdirectories: %s", include_subdirectories)
+        info("Hash algorithm: %s", hash_algorithm)
+        info("Near duplicate threshold: %s", duplicate_threshold)
 
         # Step 4: Scan the target folder and update database with individual entries along with exact match and potential match hashes
-        scanner.scan(lambda file_path, metadata: db_manager.insert_file(file_path, metadata))
+        # A scan interrupted by an error or Ctrl+C is resumed by the next run, skipping the
+        # directories it completed
+        session_id, resumed = db_manager.start_scan_session(target_folder)
+        scan_running = True
+        completed_directories = db_manager.get_completed_directories()
+        if resumed:
+            info("Resuming scan %d: %d directories already completed.", session_id, len(completed_directories))
+        else:
+            info("Starting scan %d.", session_id)
+        # Progress lines replace per-file output; the ETA assumes the tree has about as
+        # many files as were indexed by the previous scan
+        stats.reset()
+        progress = ProgressReporter(expected_files=db_manager.count_files(target_folder, include_subdirectories) or None)
+
+        def index_file(file_path, metadata):
+            db_manager.insert_file(file_path, metadata)
+            progress.update()
+
+        scanner.scan(index_file, completed_directories, db_manager.mark_directory_completed)
+        progress.finish()
+
+        # Drop the files of earlier scans that this scan did not find
+        db_manager.finish_scan_session(include_subdirectories)
+        scan_running = False
+
+        # Drop cached digests of files that were deleted or modified since they were hashed
+        db_manager.vacuum_hash_cache()
 
         # Step 5: Generate the report
         info("Generating report...")
@@ -59,16 +102,35 @@ def main():
             report_generator.generate_csv_report("report.csv")
             info("CSV report generated: report.csv")
         else:
-            error(f"Unsupported report format: {report_format}. Supported formats are: csv.")
+            error("Unsupported report format: %s. Supported formats are: csv.", report_format)
+
+        info("Scan statistics:")
+        for line in stats.summary_lines():
+            info("  %s", line)
+
+        # Step 6: Keep the index up to date with changes until interrupted, then rewrite the report
+        if watch:
+            watcher = ChangeWatcher(db_manager, target_folder, include_subdirectories, exclude_files,
+                                    interval=watch_interval_seconds)
+            try:
+                watcher.run()
+            except KeyboardInterrupt:
+                info("Watch interrupted.")
+            if report_format == "csv":
+                report_generator.generate_csv_report("report.csv")
+                info("CSV report generated: report.csv")
 
         info("Process completed successfully.")
 
     except Exception as e:
-        error(f"An error occurred: {e}")
+        error("An error occurred: %s", e)
+        if scan_running:
+            error("Run again to resume the scan where it stopped.")
         sys.exit(1)
     finally:
         if db_manager != None:
             db_manager.close()
+        shutdown_logging()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
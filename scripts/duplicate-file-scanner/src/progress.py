@@ -0,0 +1,61 @@
+import time
+import stats
+from utils import info
+
+class ProgressReporter:
+    """
+    Logs a progress line at a fixed interval during a scan, with the files scanned,
+    the file and read rates and, when the expected number of files is known, an ETA.
+
+    The counts are taken from the scanner statistics (see stats), so update() only
+    has to be called once per file and costs a clock read between reports.
+    """
+
+    def __init__(self, expected_files=None, interval=10.0, clock=time.monotonic):
+        """
+        :param expected_files: The number of files the scan is expected to find (e.g. the
+            size of the index after the previous scan), or None if unknown.
+        :param interval: The number of seconds between progress lines.
+        :param clock: The clock used to time the scan.
+        """
+        self.expected_files = expected_files
+        self.interval = interval
+        self.clock = clock
+        self.start = clock()
+        self._next_report = self.start + interval
+
+    def update(self):
+        """
+        Logs a progress line if the interval has elapsed since the last one.
+        """
+        now = self.clock()
+        if now < self._next_report:
+            return
+        self._next_report = now + self.interval
+        self._report(now, "Scanned")
+
+    def finish(self):
+        """
+        Logs the totals of the scan.
+        """
+        self._report(self.clock(), "Finished scanning")
+
+    def _report(self, now, prefix):
+        counters = stats.snapshot()['counters']
+        files = counters.get('files_scanned', 0)
+        bytes_read = counters.get('bytes_read', 0)
+        elapsed = max(now - self.start, 1e-9)
+        files_per_second = files / elapsed
+        eta = ""
+        if self.expected_files and files_per_second > 0 and files < self.expected_files:
+            eta = f", ETA {format_duration((self.expected_files - files) / files_per_second)}"
+        info("%s %d files in %s (%.0f files/s, %.1f MiB/s)%s", prefix, files, format_duration(elapsed),
+             files_per_second, bytes_read / elapsed / (1024 * 1024), eta)
+
+def format_duration(seconds):
+    """
+    Formats a number of seconds as H:MM:SS.
+    """
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}"
@@ -1,80 +1,68 @@
 import csv
+from itertools import groupby
+from operator import itemgetter
+import stats
 from database import DatabaseManager
-from utils import debug
+from utils import info
 
 class ReportGenerator:
+    FIELDNAMES = ['Relative Full Path', 'Filename', 'Duplicate Type', 'Duplicate File Path', 'Duplicate Filename']
+
     def __init__(self, db_manager: DatabaseManager):
         self.db_manager = db_manager
 
     def generate_csv_report(self, output_file):
         """
-        Generates a CSV report of exact and potential duplicates.
-
-        :param output_file: The path to the output CSV file.
-        """
-        exact_duplicates = self.db_manager.get_exact_duplicates()
-        potential_duplicates = self.db_manager.get_potential_duplicates()
-
-        with open(output_file, mode='w', newline='') as csvfile:
-            fieldnames = ['Relative Full Path', 'Filename', 'Duplicate Type', 'Duplicate File Path', 'Duplicate Filename']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+        Generates a CSV report of exact, potential and near duplicates.
 
-            writer.writeheader()
+        Records are consumed in the hash order returned by the database, so each
+        duplicate group is materialized on its own and written before the next
+        one is read. Time and memory are linear in the number of duplicate rows
+        (plus the pairs written for each group).
 
-            # Process exact duplicates
-            for record in exact_duplicates:
-                filename = record['filename']
-                path = record['path']
-                hash_value = record['hash']
+        The time spent is recorded as the 'report' phase (see stats).
 
-                debug(f"Looking for exact duplicate of {filename} at {path} with hash {hash_value}")
-
-                # Find duplicates with the same hash
-                for drecord in exact_duplicates:
-                    dfilename = drecord['filename']
-                    dpath = drecord['path']
-                    dhash_value = drecord['hash']
+        :param output_file: The path to the output CSV file.
+        """
+        with stats.phase('report'), open(output_file, mode='w', newline='') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(self.FIELDNAMES)
 
-                    if dhash_value == hash_value and dpath != path:
-                        debug(f"Potential duplicate found: {dhash_value} == {hash_value} ? {dhash_value == hash_value} at {dpath}")
-                        writer.writerow({
-                            'Relative Full Path': path,
-                            'Filename': filename,
-                            'Duplicate Type': 'POTENTIAL',
-                            'Duplicate File Path': dpath,
-                            'Duplicate Filename': dfilename
-                        })
-                duplicates = [r for r in exact_duplicates if r['hash'] == hash_value and r['path'] != path]
-                for duplicate in duplicates:
-                    writer.writerow({
-                        'Relative Full Path': path,
-                        'Filename': filename,
-                        'Duplicate Type': 'EXACT',
-                        'Duplicate File Path': duplicate['path'],
-                        'Duplicate Filename': duplicate['filename']
-                    })
+            exact_rows = self._write_groups(writer, self.db_manager.get_exact_duplicates(), 'EXACT')
+            info("Wrote %d exact duplicate rows.", exact_rows)
 
-            # Process potential duplicates
-            for record in potential_duplicates:
-                filename = record['filename']
-                path = record['path']
-                hash_value = record['hash']
+            potential_rows = self._write_groups(writer, self.db_manager.get_potential_duplicates(), 'POTENTIAL')
+            info("Wrote %d potential duplicate rows.", potential_rows)
 
-                debug(f"Looking for potential duplicate of {filename} at {path} with hash {hash_value}")
+            near_rows = 0
+            for pair in self.db_manager.get_near_duplicates():
+                writer.writerow((pair['path'], pair['filename'], 'NEAR', pair['duplicate_path'], pair['duplicate_filename']))
+                writer.writerow((pair['duplicate_path'], pair['duplicate_filename'], 'NEAR', pair['path'], pair['filename']))
+                near_rows += 2
+            info("Wrote %d near duplicate rows.", near_rows)
+            stats.add('report_rows', exact_rows + potential_rows + near_rows)
 
-                # Find duplicates with the same hash
-                duplicates = [r for r in potential_duplicates if r['hash'] == hash_value and r['path'] != path]
-                for drecord in potential_duplicates:
-                    dfilename = drecord['filename']
-                    dpath = drecord['path']
-                    dhash_value = drecord['hash']
+    @staticmethod
+    def _write_groups(writer, records, duplicate_type):
+        """
+        Writes one row per (file, duplicate) pair for every group of records sharing a hash.
 
-                    if dhash_value == hash_value and dpath != path:
-                        debug(f"Potential duplicate found: {dhash_value} == {hash_value} ? {dhash_value == hash_value} at {dpath}")
-                        writer.writerow({
-                            'Relative Full Path': path,
-                            'Filename': filename,
-                            'Duplicate Type': 'POTENTIAL',
-                            'Duplicate File Path': dpath,
-                            'Duplicate Filename': dfilename
-                        })
+        :param writer: The csv writer to write rows to.
+        :param records: An iterable of duplicate records ordered by hash.
+        :param duplicate_type: The value written to the 'Duplicate Type' column.
+        :return: The number of rows written.
+        """
+        rows_written = 0
+        for _, group in groupby(records, key=itemgetter('hash')):
+            members = [(record['path'], record['filename']) for record in group]
+            if len(members) < 2:
+                continue
+            rows = [
+                (path, filename, duplicate_type, dpath, dfilename)
+                for path, filename in members
+                for dpath, dfilename in members
+                if dpath != path
+            ]
+            writer.writerows(rows)
+            rows_written += len(rows)
+        return rows_written
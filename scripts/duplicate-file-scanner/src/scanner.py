@@ -1,5 +1,7 @@
 import os
-from utils import read_file_metadata, debug
+import time
+import stats
+from utils import read_file_metadata, debug, warning
 
 class FileScanner:
     def __init__(self, target_folder, include_subdirectories=True, exclude_files: []=None):
@@ -11,38 +13,71 @@ class FileScanner:
         """
         Processes a file and invokes the callback with the file path and metadata.
 
+        A file that cannot be read (e.g. deleted during the scan or not accessible) is
+        logged and skipped rather than aborting the scan.
+
         :param file_path: The path to the file.
         :param callback: A function that takes a file path and metadata as arguments.
+        :return: False if the file could not be read, True otherwise.
         """
         # Read the file metadata
         if os.path.basename(file_path) in self.exclude_files:
-            debug(f"Skipping excluded file '{file_path}'")
-            return
-        
-        # Read the file metadata
-        metadata = read_file_metadata(file_path)
+            debug("Skipping excluded file '%s'", file_path)
+            stats.add('files_excluded')
+            return True
 
-        # check if file_path is a file
-        if os.path.isfile(file_path):
-            # Invoke the callback with the file path and metadata
-            callback(file_path, metadata)
-        else:
-            debug(f"Skipping non-file '{file_path}'")
+        try:
+            # Read the file metadata
+            metadata = read_file_metadata(file_path)
+            stats.add('files_scanned')
 
-    def scan(self, callback):
+            # check if file_path is a file
+            stats.add('stat_calls')
+            if os.path.isfile(file_path):
+                # Invoke the callback with the file path and metadata
+                with stats.phase('index'):
+                    callback(file_path, metadata)
+            else:
+                debug("Skipping non-file '%s'", file_path)
+        except OSError as e:
+            warning("Skipping unreadable file '%s': %s", file_path, e)
+            stats.add('files_failed')
+            return False
+        return True
+
+    def scan(self, callback, completed_directories=(), directory_callback=None):
         """
         Scans the target folder and invokes the callback for each file.
 
+        Time spent in the callback is recorded as the 'index' phase and the rest of
+        the walk (directory listing and stat calls) as the 'scan' phase (see stats).
+
         :param callback: A function that takes a file path and metadata as arguments.
+        :param completed_directories: Directories whose files are skipped, e.g. the ones
+            completed before a resumed scan was interrupted. Their subdirectories are still scanned.
+        :param directory_callback: A function invoked with the path of each directory once all
+            of its files were processed, unless one of them could not be read.
         """
-        if self.include_subdirectories:
-            # If including subdirectories, walk through the directory tree
-            for root, _, files in os.walk(self.target_folder):
+        start = time.perf_counter()
+        index_seconds = stats.snapshot()['phases'].get('index', 0.0)
+        try:
+            if self.include_subdirectories:
+                # If including subdirectories, walk through the directory tree
+                directories = ((root, files) for root, _, files in os.walk(self.target_folder))
+            else:
+                # If not including subdirectories, list only the files in the target folder
+                directories = [(self.target_folder, os.listdir(self.target_folder))]
+            for root, files in directories:
+                if root in completed_directories:
+                    stats.add('directories_skipped')
+                    continue
+                stats.add('directories_scanned')
+                completed = True
                 for file in files:
                     file_path = os.path.join(root, file)
-                    self.process_file(file_path, callback)
-        else:
-            # If not including subdirectories, list only the files in the target folder
-            for file in os.listdir(self.target_folder):
-                file_path = os.path.join(self.target_folder, file)
-                self.process_file(file_path, callback)
+                    completed = self.process_file(file_path, callback) and completed
+                if completed and directory_callback is not None:
+                    directory_callback(root)
+        finally:
+            index_seconds = stats.snapshot()['phases'].get('index', 0.0) - index_seconds
+            stats.add_time('scan', time.perf_counter() - start - index_seconds)
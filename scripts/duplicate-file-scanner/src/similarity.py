@@ -0,0 +1,172 @@
+import hashlib
+import mmap
+import numpy as np
+import stats
+
+# Number of MinHash permutations per sketch
+NUM_PERM = 128
+
+# Content-defined chunking: window of the rolling hash and the chunk size bounds.
+# A boundary is cut where the low AVG_CHUNK_BITS bits of the window hash are zero,
+# giving chunks of about 4 KiB on average.
+WINDOW_SIZE = 32
+AVG_CHUNK_BITS = 12
+MIN_CHUNK_SIZE = 1024
+MAX_CHUNK_SIZE = 64 * 1024
+
+# Files smaller than this have too few chunks for a meaningful similarity estimate
+MIN_FILE_SIZE = 8 * 1024
+
+# Bytes processed per vectorized chunking step
+BLOCK_SIZE = 4 * 1024 * 1024
+
+_rng = np.random.default_rng(0x5EED)
+# Random 64-bit value per byte value, summed over the window ("gear" hash)
+_GEAR = _rng.integers(0, np.iinfo(np.uint64).max, size=256, dtype=np.uint64, endpoint=True)
+# One seed per MinHash permutation
+_SEEDS = _rng.integers(0, np.iinfo(np.uint64).max, size=NUM_PERM, dtype=np.uint64, endpoint=True)
+
+def content_defined_chunks(data):
+    """
+    Splits data into content-defined chunks.
+
+    Boundaries depend only on the bytes in a small sliding window, so an insertion
+    or deletion shifts the boundaries around the edit only, and the remaining
+    chunks of an edited copy stay identical to the original's.
+
+    :param data: A bytes-like object (bytes, memoryview, mmap).
+    :return: A list of (start, end) offsets.
+    """
+    size = len(data)
+    if size == 0:
+        return []
+    mask = np.uint64((1 << AVG_CHUNK_BITS) - 1)
+    candidates = []
+    for block_start in range(0, size, BLOCK_SIZE):
+        # Include the preceding window so hashes are continuous across blocks
+        window_start = max(0, block_start - WINDOW_SIZE)
+        block = np.frombuffer(data[window_start:block_start + BLOCK_SIZE], dtype=np.uint8)
+        if len(block) < WINDOW_SIZE:
+            continue
+        sums = np.cumsum(_GEAR[block])
+        window_sums = sums[WINDOW_SIZE - 1:].copy()
+        window_sums[1:] -= sums[:-WINDOW_SIZE]
+        # Offset of the first byte after each window
+        ends = np.nonzero((window_sums & mask) == 0)[0] + window_start + WINDOW_SIZE
+        candidates.extend(ends[ends > block_start].tolist())
+
+    chunks = []
+    start = 0
+    for end in candidates:
+        while end - start > MAX_CHUNK_SIZE:
+            chunks.append((start, start + MAX_CHUNK_SIZE))
+            start += MAX_CHUNK_SIZE
+        if end - start >= MIN_CHUNK_SIZE:
+            chunks.append((start, end))
+            start = end
+    while size - start > MAX_CHUNK_SIZE:
+        chunks.append((start, start + MAX_CHUNK_SIZE))
+        start += MAX_CHUNK_SIZE
+    if start < size:
+        chunks.append((start, size))
+    return chunks
+
+def _mix64(values):
+    """
+    splitmix64 finalizer, applied element-wise (uint64 arithmetic wraps around).
+    """
+    values = values ^ (values >> np.uint64(30))
+    values = values * np.uint64(0xBF58476D1CE4E5B9)
+    values = values ^ (values >> np.uint64(27))
+    values = values * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+def minhash_signature(data):
+    """
+    Computes the MinHash signature of the set of content-defined chunks of data.
+
+    The fraction of equal positions in two signatures estimates the Jaccard
+    similarity of the two chunk sets.
+
+    :param data: A bytes-like object.
+    :return: A numpy uint64 array of NUM_PERM values.
+    """
+    with memoryview(data) as view:
+        fingerprints = np.unique(np.fromiter(
+            (int.from_bytes(hashlib.blake2b(view[start:end], digest_size=8).digest(), 'little')
+             for start, end in content_defined_chunks(data)),
+            dtype=np.uint64
+        ))
+    signature = np.full(NUM_PERM, np.iinfo(np.uint64).max, dtype=np.uint64)
+    # Bound the (permutations x chunks) matrix for files with many chunks
+    for offset in range(0, len(fingerprints), 8192):
+        block = fingerprints[offset:offset + 8192]
+        hashed = _mix64(block[np.newaxis, :] ^ _SEEDS[:, np.newaxis])
+        np.minimum(signature, hashed.min(axis=1), out=signature)
+    return signature
+
+def file_signature(file_path):
+    """
+    Computes the MinHash signature of a file's content.
+
+    :param file_path: The path to the file.
+    :return: A numpy uint64 array of NUM_PERM values.
+    """
+    with open(file_path, 'rb') as f:
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                stats.add('files_sketched')
+                stats.add('bytes_read', len(mapped))
+                return minhash_signature(mapped)
+        except ValueError:
+            # Empty files cannot be mapped
+            return minhash_signature(b'')
+
+def signature_to_bytes(signature):
+    return signature.astype('<u8').tobytes()
+
+def signature_from_bytes(blob):
+    return np.frombuffer(blob, dtype='<u8')
+
+def estimate_similarity(signature_a, signature_b):
+    """
+    Estimates the Jaccard similarity of two signatures.
+    """
+    return float(np.mean(signature_a == signature_b))
+
+def lsh_parameters(threshold, num_perm=NUM_PERM):
+    """
+    Chooses the LSH banding (bands, rows) for a similarity threshold.
+
+    Two sketches share at least one band bucket with probability
+    1 - (1 - s^rows)^bands, which rises steeply around (1/bands)^(1/rows).
+    The banding whose turning point is the highest one not above the threshold
+    is chosen, keeping false negatives low; candidates are verified afterwards.
+
+    :param threshold: The Jaccard similarity threshold (0 < threshold <= 1).
+    :param num_perm: The number of permutations in a signature.
+    :return: A tuple (bands, rows).
+    """
+    if not 0 < threshold <= 1:
+        raise ValueError(f"Similarity threshold must be in (0, 1], got {threshold}.")
+    best = (num_perm, 1)
+    best_turning_point = 0.0
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        turning_point = (1 / bands) ** (1 / rows)
+        if best_turning_point < turning_point <= threshold:
+            best, best_turning_point = (bands, rows), turning_point
+    return best
+
+def band_buckets(signature, bands, rows):
+    """
+    Hashes each band of a signature to a bucket id.
+
+    :return: A list of (band, bucket) tuples, the bucket being a signed 64-bit integer.
+    """
+    data = signature_to_bytes(signature)
+    width = rows * 8
+    return [
+        (band, int.from_bytes(hashlib.blake2b(data[band * width:(band + 1) * width], digest_size=8).digest(), 'little', signed=True))
+        for band in range(bands)
+    ]
@@ -0,0 +1,67 @@
+import time
+from contextlib import contextmanager
+
+# Seconds spent in each phase of the run: 'scan' (directory walk and stat calls),
+# 'index' (reading, hashing and writing file records) and 'report'
+_phases = {}
+# Counters updated by the scanner, the database manager and the hashing functions
+_counters = {}
+
+def reset():
+    """
+    Clears the phase timers and counters, e.g. before a new scan.
+    """
+    _phases.clear()
+    _counters.clear()
+
+def add(name, value=1):
+    """
+    Adds value to a counter.
+
+    :param name: The counter name, e.g. 'files_scanned' or 'bytes_read'.
+    :param value: The amount to add.
+    """
+    _counters[name] = _counters.get(name, 0) + value
+
+def add_time(phase_name, seconds):
+    """
+    Adds seconds to a phase timer.
+    """
+    _phases[phase_name] = _phases.get(phase_name, 0.0) + seconds
+
+@contextmanager
+def phase(phase_name):
+    """
+    Times the enclosed block as part of a phase. A phase entered several times accumulates.
+
+    :param phase_name: The phase name, e.g. 'scan', 'index' or 'report'.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_time(phase_name, time.perf_counter() - start)
+
+def snapshot():
+    """
+    Returns the phase timers and counters.
+
+    :return: A dictionary with 'phases' (seconds per phase) and 'counters'.
+    """
+    return {'phases': dict(_phases), 'counters': dict(_counters)}
+
+def summary_lines():
+    """
+    Formats the phase timers and counters, with per-second rates for the main counters.
+
+    :return: A list of lines.
+    """
+    lines = [f"{name}: {seconds:.2f}s" for name, seconds in _phases.items()]
+    rates = (('files_scanned', 'scan', 'files'), ('files_indexed', 'index', 'files'),
+             ('bytes_read', 'index', 'bytes'), ('db_writes', 'index', 'rows written'))
+    for counter, phase_name, unit in rates:
+        seconds = _phases.get(phase_name)
+        if counter in _counters and seconds:
+            lines.append(f"{counter}: {_counters[counter]} ({_counters[counter] / seconds:.0f} {unit}/s over {phase_name})")
+    lines.extend(f"{name}: {value}" for name, value in _counters.items() if name not in {rate[0] for rate in rates})
+    return lines
@@ -1,7 +1,63 @@
-import hashlib
+import atexit
+import logging
+import logging.handlers
 import os
+import queue
+import sys
+import stats
+from hashing import DEFAULT_ALGORITHM, hash_file
 
-debug_enabled = True
+# All scanner output goes through this logger. Messages take %-style arguments that
+# are only formatted when the level is enabled, so debug calls in hot loops cost a
+# level check when debug mode is off.
+logger = logging.getLogger("duplicate_file_scanner")
+
+_listener = None
+
+class _StdoutHandler(logging.StreamHandler):
+    """
+    Writes to the current sys.stdout, which may be replaced after logging is configured
+    (e.g. by test runners capturing output).
+    """
+    @property
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+def configure_logging(level=logging.DEBUG, log_file=None):
+    """
+    Routes log records through a queue to a background thread that writes them to
+    stdout (and optionally a file), so the scan never waits on console output.
+
+    :param level: The minimum level logged, e.g. logging.INFO.
+    :param log_file: An optional file the records are also appended to.
+    """
+    global _listener
+    shutdown_logging()
+    formatter = logging.Formatter("%(levelname)s: %(message)s")
+    handlers = [_StdoutHandler()]
+    if log_file:
+        handlers.append(logging.FileHandler(log_file))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    log_queue = queue.SimpleQueue()
+    logger.handlers[:] = [logging.handlers.QueueHandler(log_queue)]
+    logger.propagate = False
+    logger.setLevel(level)
+    _listener = logging.handlers.QueueListener(log_queue, *handlers)
+    _listener.start()
+
+def shutdown_logging():
+    """
+    Writes out the queued log records and stops the background thread.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
 
 def set_debug_mode(enabled):
     """
@@ -9,68 +65,103 @@ def set_debug_mode(enabled):
 
     :param enabled: Boolean value to enable or disable debug mode.
     """
-    global debug_enabled
-    debug_enabled = enabled
-    if debug_enabled:
+    logger.setLevel(logging.DEBUG if enabled else logging.INFO)
+    if enabled:
         info("Debug mode enabled.")
     else:
         info("Debug mode disabled.")
 
-def info(message):
+def is_debug_enabled():
+    """
+    Returns True if debug messages are logged; guards debug output that is costly to build.
+    """
+    return logger.isEnabledFor(logging.DEBUG)
+
+def info(message, *args):
     """
-    Prints informational messages to the console.
+    Logs an informational message.
 
-    :param message: The message to print.
+    :param message: The message, optionally with %-style placeholders.
+    :param args: The values of the placeholders, formatted only if the message is logged.
     """
-    print(f"INFO: {message}")
-def warning(message):
+    logger.info(message, *args)
+
+def warning(message, *args):
     """
-    Prints warning messages to the console.
-    :param message: The message to print.
+    Logs a warning message.
+
+    :param message: The message, optionally with %-style placeholders.
+    :param args: The values of the placeholders.
     """
-    print(f"WARNING: {message}")
+    logger.warning(message, *args)
 
-def error(message):
+def error(message, *args):
     """
-    Prints error messages to the console.
-    :param message: The message to print.
+    Logs an error message.
+
+    :param message: The message, optionally with %-style placeholders.
+    :param args: The values of the placeholders.
     """
-    print(f"ERROR: {message}")
+    logger.error(message, *args)
 
-def debug(message):
+def debug(message, *args):
     """
-    Prints debug messages to the console.
+    Logs a debug message. Pass the values as args rather than an f-string, so nothing
+    is formatted when debug mode is off.
+
+    :param message: The message, optionally with %-style placeholders.
+    :param args: The values of the placeholders, formatted only if debug mode is on.
+    """
+    logger.debug(message, *args)
+
+# configure_logging() is called by main; until then records propagate to the root logger
+atexit.register(shutdown_logging)
 
-    :param message: The message to print.
+def calculate_file_hash(file_path, algorithm=DEFAULT_ALGORITHM):
     """
-    if debug_enabled:
-        print(f"DEBUG: {message}")
+    Calculates the hex digest of a file's content.
 
-def calculate_file_hash(file_path):
-    hash_md5 = hashlib.md5()
-    with open(file_path, "rb") as f:
-        for chunk in iter(lambda: f.read(4096), b""):
-            hash_md5.update(chunk)
-    return hash_md5.hexdigest()
+    :param file_path: The path to the file.
+    :param algorithm: The hashing algorithm (see hashing.available_algorithms()).
+    :return: The hex digest of the file content.
+    """
+    return hash_file(file_path, algorithm)
 
 def read_file_metadata(file_path):
+    """
+    Reads the file metadata with a single stat call.
+
+    Besides the size and timestamps, the device, inode and nanosecond modification
+    time are returned; together with the size they identify a file version across
+    renames and moves (see DatabaseManager's hash cache).
+
+    :param file_path: The path to the file.
+    :return: A dictionary of file metadata.
+    """
+    stat = os.stat(file_path)
+    stats.add('stat_calls')
     return {
-        "size": os.path.getsize(file_path),
-        "modified_time": os.path.getmtime(file_path),
-        "created_time": os.path.getctime(file_path),
+        "size": stat.st_size,
+        "modified_time": stat.st_mtime,
+        "created_time": stat.st_ctime,
         "filename": os.path.basename(file_path),
+        "device": stat.st_dev,
+        "inode": stat.st_ino,
+        "modified_time_ns": stat.st_mtime_ns,
     }
 
 def extract_first_n_bytes(file_path, n=10):
-    if _is_valid_file(file_path):
+    if is_valid_file(file_path):
         # Read the first n bytes of the file
         with open(file_path, "rb") as f:
-            return f.read(n)
+            data = f.read(n)
+        stats.add('bytes_read', len(data))
+        return data
     else:
         filename = os.path.basename(file_path)
         return filename.encode('utf-8')
     
-def _is_valid_file(file_path):
+def is_valid_file(file_path):
     """
     Checks if the file is valid for processing.
 
@@ -78,6 +169,7 @@ def _is_valid_file(file_path):
     :return: True if the file is valid, False otherwise.
     """
     # Ensure the file is a regular file and not a Google Drive placeholder
+    stats.add('stat_calls')
     if not os.path.isfile(file_path):
         return False
     # Skip Google Drive placeholders (e.g., .gdoc, .gsheet, etc.)
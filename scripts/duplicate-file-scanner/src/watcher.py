@@ -0,0 +1,287 @@
+import os
+import threading
+import time
+import stats
+from utils import read_file_metadata, debug, info
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # Optional dependency; without it the target folder is polled
+    FileSystemEventHandler = object
+    Observer = None
+
+HASH_COLUMNS = ('exact_match_hash', 'potential_match_hash')
+
+class Changes:
+    """
+    The paths changed since the last batch was applied. Repeated events for a path are
+    coalesced, so a file written in several steps is indexed once per batch.
+    """
+
+    def __init__(self):
+        self.upserted = set()
+        self.deleted = set()
+        self.deleted_directories = set()
+
+    def upsert(self, path):
+        self.deleted.discard(path)
+        self.upserted.add(path)
+
+    def delete(self, path):
+        self.upserted.discard(path)
+        self.deleted.add(path)
+
+    def delete_directory(self, path):
+        prefix = os.path.join(path, '')
+        self.upserted = {upserted for upserted in self.upserted if not upserted.startswith(prefix)}
+        self.deleted_directories.add(path)
+
+    def __bool__(self):
+        return bool(self.upserted or self.deleted or self.deleted_directories)
+
+class _PathFilter:
+    """
+    Selects the paths a scan of the target folder would index.
+    """
+
+    def __init__(self, target_folder, include_subdirectories, exclude_files):
+        self.target_folder = target_folder
+        self.include_subdirectories = include_subdirectories
+        self.exclude_files = exclude_files
+
+    def __call__(self, path):
+        if os.path.basename(path) in self.exclude_files:
+            return False
+        return self.include_subdirectories or os.path.dirname(path) == self.target_folder
+
+    def walk(self, directory):
+        """
+        Yields the selected files under a directory.
+        """
+        for root, _, files in os.walk(directory):
+            for file in files:
+                path = os.path.join(root, file)
+                if self(path):
+                    yield path
+            if not self.include_subdirectories:
+                break
+
+class _EventHandler(FileSystemEventHandler):
+    """
+    Records watchdog events as changes; called from the observer thread.
+    """
+
+    def __init__(self, path_filter):
+        self.path_filter = path_filter
+        self.lock = threading.Lock()
+        self.changes = Changes()
+
+    def _created(self, path, is_directory):
+        if is_directory:
+            for file_path in self.path_filter.walk(path):
+                self.changes.upsert(file_path)
+        elif self.path_filter(path):
+            self.changes.upsert(path)
+
+    def _deleted(self, path, is_directory):
+        if is_directory:
+            self.changes.delete_directory(path)
+        else:
+            self.changes.delete(path)
+
+    def on_created(self, event):
+        with self.lock:
+            self._created(os.fsdecode(event.src_path), event.is_directory)
+
+    def on_modified(self, event):
+        # Directory modifications only reflect entries created or deleted in them
+        if not event.is_directory:
+            with self.lock:
+                self._created(os.fsdecode(event.src_path), False)
+
+    def on_deleted(self, event):
+        with self.lock:
+            self._deleted(os.fsdecode(event.src_path), event.is_directory)
+
+    def on_moved(self, event):
+        with self.lock:
+            self._deleted(os.fsdecode(event.src_path), event.is_directory)
+            self._created(os.fsdecode(event.dest_path), event.is_directory)
+
+    def drain(self):
+        with self.lock:
+            changes, self.changes = self.changes, Changes()
+        return changes
+
+class _WatchdogSource:
+    """
+    Receives filesystem events (inotify, FSEvents or ReadDirectoryChangesW) through watchdog.
+    """
+    name = "watchdog"
+
+    def __init__(self, path_filter):
+        self.handler = _EventHandler(path_filter)
+        self.observer = Observer()
+        self.observer.schedule(self.handler, path_filter.target_folder, recursive=path_filter.include_subdirectories)
+
+    def start(self):
+        self.observer.start()
+
+    def drain(self):
+        return self.handler.drain()
+
+    def stop(self):
+        self.observer.stop()
+        self.observer.join()
+
+class _PollingSource:
+    """
+    Finds changes by comparing the size, inode and modification time of every file with
+    the previous poll. Used when watchdog is not installed; each poll stats the whole tree.
+    """
+    name = "polling"
+
+    def __init__(self, path_filter):
+        self.path_filter = path_filter
+        self.snapshot = {}
+
+    def _take_snapshot(self):
+        snapshot = {}
+        for path in self.path_filter.walk(self.path_filter.target_folder):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            snapshot[path] = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        stats.add('stat_calls', len(snapshot))
+        return snapshot
+
+    def start(self):
+        self.snapshot = self._take_snapshot()
+
+    def drain(self):
+        snapshot = self._take_snapshot()
+        changes = Changes()
+        for path, version in snapshot.items():
+            if self.snapshot.get(path) != version:
+                changes.upsert(path)
+        for path in self.snapshot.keys() - snapshot.keys():
+            changes.delete(path)
+        self.snapshot = snapshot
+        return changes
+
+    def stop(self):
+        pass
+
+class ChangeWatcher:
+    """
+    Keeps the index up to date with the target folder after a scan, applying only the
+    created, modified, moved and deleted files, and recomputing only the duplicate
+    groups whose members changed.
+    """
+
+    def __init__(self, db_manager, target_folder, include_subdirectories=True, exclude_files=None,
+                 interval=2.0, use_polling=False):
+        """
+        :param db_manager: The DatabaseManager of the index.
+        :param target_folder: The absolute path of the watched folder.
+        :param include_subdirectories: Whether files in subdirectories are indexed.
+        :param exclude_files: File names that are not indexed.
+        :param interval: The number of seconds between batches of changes.
+        :param use_polling: Poll the folder even if watchdog is installed.
+        """
+        self.db_manager = db_manager
+        self.interval = interval
+        path_filter = _PathFilter(target_folder, include_subdirectories, exclude_files or [])
+        if Observer is not None and not use_polling:
+            self.source = _WatchdogSource(path_filter)
+        else:
+            self.source = _PollingSource(path_filter)
+
+    def run(self, stop_event=None):
+        """
+        Applies the changes every interval until stop_event is set (or Ctrl+C).
+
+        :param stop_event: An optional threading.Event that stops the watcher.
+        """
+        stop_event = stop_event or threading.Event()
+        self.start()
+        try:
+            while not stop_event.wait(self.interval):
+                self.poll()
+        finally:
+            self.stop()
+
+    def start(self):
+        """
+        Starts collecting changes.
+        """
+        info("Watching for changes (%s)...", self.source.name)
+        self.source.start()
+
+    def stop(self):
+        """
+        Stops collecting changes; changes not applied yet are discarded.
+        """
+        self.source.stop()
+        info("Watching for changes...done.")
+
+    def poll(self):
+        """
+        Applies the changes collected since the last call, if any.
+
+        :return: The affected duplicate groups (see apply_changes).
+        """
+        changes = self.source.drain()
+        return self.apply_changes(changes) if changes else {}
+
+    def apply_changes(self, changes):
+        """
+        Applies changes to the index with the DatabaseManager upsert and delete methods.
+
+        :param changes: The Changes to apply.
+        :return: A dictionary mapping 'exact_match_hash' and 'potential_match_hash' to the
+            affected groups, i.e. the groups a changed file left or joined, as returned by
+            DatabaseManager.get_duplicate_groups.
+        """
+        start = time.perf_counter()
+        affected = []
+        for directory in changes.deleted_directories:
+            affected.extend(self.db_manager.delete_directory(directory))
+        for path in changes.deleted:
+            affected.append(self.db_manager.delete_file(path))
+        for path in changes.upserted:
+            affected.append(self.db_manager.get_file_hashes(path))
+            try:
+                metadata = read_file_metadata(path)
+                if not os.path.isfile(path):
+                    continue
+                self.db_manager.insert_file(path, metadata)
+            except OSError as e:
+                # Deleted or replaced again before the batch was applied
+                debug("Dropping '%s' from the index: %s", path, e)
+                self.db_manager.delete_file(path)
+                continue
+            affected.append(self.db_manager.get_file_hashes(path))
+        stats.add('files_changed', len(changes.upserted) + len(changes.deleted))
+
+        groups = {}
+        for index, hash_column in enumerate(HASH_COLUMNS):
+            hashes = {file_hashes[index] for file_hashes in affected if file_hashes is not None}
+            groups[hash_column] = self.db_manager.get_duplicate_groups(hash_column, hashes)
+        info("Applied %d changed and %d deleted files (%d deleted directories) in %.2fs.",
+             len(changes.upserted), len(changes.deleted), len(changes.deleted_directories),
+             time.perf_counter() - start)
+        self._log_groups(groups)
+        return groups
+
+    @staticmethod
+    def _log_groups(groups):
+        for hash_column, column_groups in groups.items():
+            duplicate_type = 'Exact' if hash_column == 'exact_match_hash' else 'Potential'
+            for hash_value, paths in column_groups.items():
+                if len(paths) > 1:
+                    info("%s duplicate group %s: %s", duplicate_type, hash_value[:12], ", ".join(paths))
+                else:
+                    debug("%s duplicate group %s has no duplicates left", duplicate_type, hash_value[:12])
@@ -1,54 +1,184 @@
+import hashlib
+import os
+import sys
+import shutil
+import tempfile
+import types
 import unittest
-from src.database import DatabaseManager
+from unittest import mock
+
+# Add the src directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+import database
+from database import DatabaseManager
+from utils import read_file_metadata
 
 class TestDatabaseManager(unittest.TestCase):
 
     def setUp(self):
-        self.db_manager = DatabaseManager('test_index.db')
+        self.db_manager = DatabaseManager(':memory:')
         self.db_manager.create_table()
 
     def tearDown(self):
         self.db_manager.close()
-        import os
-        if os.path.exists('test_index.db'):
-            os.remove('test_index.db')
-
-    def test_insert_file_data(self):
-        file_data = {
-            'file_path': 'test_file.txt',
-            'file_hash': 'abc123',
-            'file_size': 1024
-        }
-        self.db_manager.insert_file_data(file_data)
-        result = self.db_manager.retrieve_duplicates('abc123')
-        self.assertEqual(len(result), 1)
-        self.assertEqual(result[0]['file_path'], 'test_file.txt')
+
+    def _insert(self, path, filename, size, created_time=1.0):
+        # Paths do not exist on disk, so the filename stands in for the first bytes
+        self.db_manager.insert_file(path, {
+            'filename': filename,
+            'size': size,
+            'created_time': created_time,
+        })
+
+    def test_create_table_creates_hash_indexes(self):
+        indexes = {row[1] for row in self.db_manager.connection.execute("PRAGMA index_list(files)")}
+        self.assertIn('idx_files_exact_match_hash', indexes)
+        self.assertIn('idx_files_potential_match_hash', indexes)
+        self.assertIn('idx_files_file_size', indexes)
+
+    def test_insert_file_updates_existing_path(self):
+        self._insert('a/test_file.txt', 'test_file.txt', 1024)
+        self._insert('a/test_file.txt', 'test_file.txt', 2048)
+        rows = self.db_manager.connection.execute("SELECT file_size FROM files").fetchall()
+        self.assertEqual(rows, [(2048,)])
 
     def test_retrieve_duplicates(self):
-        file_data_1 = {
-            'file_path': 'test_file_1.txt',
-            'file_hash': 'abc123',
-            'file_size': 1024
-        }
-        file_data_2 = {
-            'file_path': 'test_file_2.txt',
-            'file_hash': 'abc123',
-            'file_size': 2048
-        }
-        self.db_manager.insert_file_data(file_data_1)
-        self.db_manager.insert_file_data(file_data_2)
-        duplicates = self.db_manager.retrieve_duplicates('abc123')
+        self._insert('a/test_file.txt', 'test_file.txt', 1024)
+        self._insert('b/test_file.txt', 'test_file.txt', 1024)
+        duplicates = self.db_manager.get_exact_duplicates()
+        self.assertIsInstance(duplicates, types.GeneratorType)
+        duplicates = list(duplicates)
         self.assertEqual(len(duplicates), 2)
+        self.assertEqual({record['path'] for record in duplicates}, {'a/test_file.txt', 'b/test_file.txt'})
+        self.assertEqual(duplicates[0]['hash'], duplicates[1]['hash'])
+
+    def test_duplicates_are_ordered_by_hash(self):
+        for group in range(5):
+            for copy in range(2):
+                self._insert(f'dir_{copy}/file_{group}.txt', f'file_{group}.txt', 100 + group)
+        hashes = [record['hash'] for record in self.db_manager.get_potential_duplicates()]
+        self.assertEqual(len(hashes), 10)
+        self.assertEqual(hashes, sorted(hashes))
+
+    def test_content_hash_is_reused_after_rename(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        original = os.path.join(tmp_dir, 'video.mp4')
+        renamed = os.path.join(tmp_dir, 'holiday.mp4')
+        with open(original, 'wb') as f:
+            f.write(b'x' * 10000)
+
+        with mock.patch.object(database, 'calculate_file_hash', wraps=database.calculate_file_hash) as hasher:
+            self.db_manager.insert_file(original, read_file_metadata(original))
+            os.rename(original, renamed)
+            self.db_manager.insert_file(renamed, read_file_metadata(renamed))
+            self.assertEqual(hasher.call_count, 1)
+
+        hashes = self.db_manager.connection.execute("SELECT exact_match_hash FROM files").fetchall()
+        self.assertEqual(len(hashes), 2)
+        self.assertEqual(hashes[0], hashes[1])
+        paths = self.db_manager.connection.execute("SELECT path FROM hash_cache").fetchall()
+        self.assertEqual(paths, [(renamed,)])
+
+    def test_hash_cache_is_per_algorithm(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        path = os.path.join(tmp_dir, 'archive.zip')
+        with open(path, 'wb') as f:
+            f.write(b'zip content')
+        self.db_manager.insert_file(path, read_file_metadata(path))
+
+        self.db_manager.hash_algorithm = 'sha256'
+        self.db_manager.insert_file(path, read_file_metadata(path))
+        row = self.db_manager.connection.execute("SELECT digest, algorithm FROM hash_cache").fetchone()
+        self.assertEqual(row, (hashlib.sha256(b'zip content').hexdigest(), 'sha256'))
+
+    def test_unsupported_hash_algorithm(self):
+        with self.assertRaises(ValueError):
+            DatabaseManager(':memory:', hash_algorithm='unknown')
+
+    def test_checksum_is_refused_as_hash_algorithm(self):
+        with self.assertRaisesRegex(ValueError, 'non-cryptographic'):
+            DatabaseManager(':memory:', hash_algorithm='crc32')
+
+    def test_identical_content_is_an_exact_duplicate(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        for name in ('a.txt', 'b.txt'):
+            path = os.path.join(tmp_dir, name)
+            with open(path, 'wb') as f:
+                f.write(b'same content')
+            self.db_manager.insert_file(path, read_file_metadata(path))
+        self.assertEqual(len(list(self.db_manager.get_exact_duplicates())), 2)
+
+    def test_vacuum_hash_cache_evicts_deleted_and_modified_files(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        kept, deleted, modified = (os.path.join(tmp_dir, name) for name in ('kept', 'deleted', 'modified'))
+        for path in (kept, deleted, modified):
+            with open(path, 'wb') as f:
+                f.write(b'content')
+            self.db_manager.insert_file(path, read_file_metadata(path))
+
+        os.remove(deleted)
+        with open(modified, 'ab') as f:
+            f.write(b' and more')
+
+        self.assertEqual(self.db_manager.vacuum_hash_cache(), 2)
+        paths = self.db_manager.connection.execute("SELECT path FROM hash_cache").fetchall()
+        self.assertEqual(paths, [(kept,)])
+
+    def test_scan_session_is_resumed_until_finished(self):
+        session_id, resumed = self.db_manager.start_scan_session('/data')
+        self.assertFalse(resumed)
+        self.db_manager.mark_directory_completed('/data/a')
+        self.assertEqual(self.db_manager.start_scan_session('/data'), (session_id, True))
+        self.assertEqual(self.db_manager.get_completed_directories(), {'/data/a'})
+
+        self.db_manager.finish_scan_session()
+        next_session_id, resumed = self.db_manager.start_scan_session('/data')
+        self.assertFalse(resumed)
+        self.assertGreater(next_session_id, session_id)
+        self.assertEqual(self.db_manager.get_completed_directories(), set())
+
+    def test_finish_scan_session_removes_files_of_earlier_scans(self):
+        self.db_manager.start_scan_session('/data')
+        self._insert('/data/a/kept.txt', 'kept.txt', 1024)
+        self._insert('/data/a/deleted.txt', 'deleted.txt', 1024)
+        self._insert('/other/file.txt', 'file.txt', 1024)
+        self.assertEqual(self.db_manager.finish_scan_session(), 0)
+
+        self.db_manager.start_scan_session('/data')
+        self._insert('/data/a/kept.txt', 'kept.txt', 1024)
+        self.assertEqual(self.db_manager.finish_scan_session(), 1)
+        paths = self.db_manager.connection.execute("SELECT relative_full_path FROM files ORDER BY 1").fetchall()
+        # Files outside the scanned folder are kept
+        self.assertEqual(paths, [('/data/a/kept.txt',), ('/other/file.txt',)])
+
+    def test_finish_scan_session_without_subdirectories_keeps_nested_files(self):
+        self.db_manager.start_scan_session('/data')
+        self._insert('/data/deleted.txt', 'deleted.txt', 1024)
+        self._insert('/data/a/nested.txt', 'nested.txt', 1024)
+        self.db_manager.finish_scan_session()
+
+        # A non-recursive scan does not see the nested file, so it must not remove it
+        self.db_manager.start_scan_session('/data')
+        self.assertEqual(self.db_manager.finish_scan_session(include_subdirectories=False), 1)
+        paths = self.db_manager.connection.execute("SELECT relative_full_path FROM files").fetchall()
+        self.assertEqual(paths, [('/data/a/nested.txt',)])
+
+    def test_count_files_under_folder(self):
+        self._insert('/data/file1.txt', 'file1.txt', 1024)
+        self._insert('/data/a/file2.txt', 'file2.txt', 1024)
+        self._insert('/database/file3.txt', 'file3.txt', 1024)
+        self.assertEqual(self.db_manager.count_files('/data'), 2)
+        self.assertEqual(self.db_manager.count_files('/data', include_subdirectories=False), 1)
 
     def test_no_duplicates(self):
-        file_data = {
-            'file_path': 'unique_file.txt',
-            'file_hash': 'xyz789',
-            'file_size': 512
-        }
-        self.db_manager.insert_file_data(file_data)
-        result = self.db_manager.retrieve_duplicates('abc123')
-        self.assertEqual(len(result), 0)
+        self._insert('a/unique_file.txt', 'unique_file.txt', 512)
+        self.assertEqual(list(self.db_manager.get_exact_duplicates()), [])
+        self.assertEqual(list(self.db_manager.get_potential_duplicates()), [])
 
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
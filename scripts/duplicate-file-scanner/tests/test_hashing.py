@@ -0,0 +1,63 @@
+import hashlib
+import os
+import sys
+import tempfile
+import unittest
+import zlib
+
+# Add the src directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+import hashing
+from hashing import available_algorithms, get_hasher, hash_file, is_cryptographic, register_algorithm
+
+class TestHashing(unittest.TestCase):
+
+    def setUp(self):
+        self.content = os.urandom(300 * 1024 + 17)
+        fd, self.file_path = tempfile.mkstemp()
+        with os.fdopen(fd, 'wb') as f:
+            f.write(self.content)
+
+    def tearDown(self):
+        os.remove(self.file_path)
+
+    def test_hash_file_matches_hashlib(self):
+        for algorithm in ('md5', 'sha1', 'sha256', 'blake2b'):
+            expected = hashlib.new(algorithm, self.content).hexdigest()
+            # Multiple reads into a small reusable buffer
+            self.assertEqual(hash_file(self.file_path, algorithm, buffer_size=4096), expected)
+            # Memory mapped
+            self.assertEqual(hash_file(self.file_path, algorithm, mmap_threshold=1), expected)
+
+    def test_crc32(self):
+        expected = f"{zlib.crc32(self.content):08x}"
+        self.assertIn('crc32', available_algorithms())
+        self.assertEqual(hash_file(self.file_path, 'crc32', buffer_size=4096), expected)
+        self.assertEqual(hash_file(self.file_path, 'crc32', mmap_threshold=1), expected)
+
+    def test_empty_file(self):
+        with open(self.file_path, 'wb'):
+            pass
+        self.assertEqual(hash_file(self.file_path, 'sha256', mmap_threshold=0), hashlib.sha256(b'').hexdigest())
+
+    def test_algorithm_names_are_case_insensitive(self):
+        self.assertEqual(hash_file(self.file_path, 'SHA256'), hashlib.sha256(self.content).hexdigest())
+
+    def test_unknown_algorithm(self):
+        with self.assertRaises(ValueError):
+            get_hasher('unknown')
+
+    def test_register_algorithm(self):
+        register_algorithm('test_sha512', hashlib.sha512)
+        self.addCleanup(hashing._algorithms.pop, 'test_sha512')
+        self.assertEqual(hash_file(self.file_path, 'test_sha512'), hashlib.sha512(self.content).hexdigest())
+        self.assertTrue(is_cryptographic('test_sha512'))
+
+    def test_checksums_are_not_cryptographic(self):
+        self.assertTrue(is_cryptographic('sha256'))
+        self.assertFalse(is_cryptographic('crc32'))
+        self.assertFalse(is_cryptographic('CRC32'))
+
+if __name__ == '__main__':
+    unittest.main()
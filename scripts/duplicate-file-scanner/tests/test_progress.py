@@ -0,0 +1,58 @@
+import os
+import sys
+import unittest
+
+# Add the src directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+import stats
+import utils
+from progress import ProgressReporter, format_duration
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+class TestProgressReporter(unittest.TestCase):
+
+    def setUp(self):
+        stats.reset()
+        self.clock = FakeClock()
+
+    def test_reports_once_per_interval(self):
+        progress = ProgressReporter(interval=10, clock=self.clock)
+        with self.assertLogs(utils.logger) as logs:
+            for _ in range(5):
+                stats.add('files_scanned')
+                self.clock.now += 3
+                progress.update()
+        # Reports at 12s; the next one is due at 22s
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn("Scanned 4 files in 0:00:12", logs.output[0])
+
+    def test_reports_rates_and_eta(self):
+        progress = ProgressReporter(expected_files=300, interval=10, clock=self.clock)
+        stats.add('files_scanned', 100)
+        stats.add('bytes_read', 20 * 1024 * 1024)
+        self.clock.now += 10
+        with self.assertLogs(utils.logger) as logs:
+            progress.update()
+        self.assertIn("(10 files/s, 2.0 MiB/s), ETA 0:00:20", logs.output[0])
+
+    def test_finish_reports_totals_without_eta(self):
+        progress = ProgressReporter(expected_files=50, interval=10, clock=self.clock)
+        stats.add('files_scanned', 60)
+        self.clock.now += 3
+        with self.assertLogs(utils.logger) as logs:
+            progress.finish()
+        self.assertIn("Finished scanning 60 files in 0:00:03", logs.output[0])
+        self.assertNotIn("ETA", logs.output[0])
+
+    def test_format_duration(self):
+        self.assertEqual(format_duration(3725.4), "1:02:05")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,33 +1,75 @@
 import unittest
 import os
+import sys
 import csv
-from src.report_generator import ReportGenerator
+
+# Add the src directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from database import DatabaseManager
+from report_generator import ReportGenerator
 
 class TestReportGenerator(unittest.TestCase):
 
     def setUp(self):
-        self.report_generator = ReportGenerator()
-        self.test_data = [
-            {'file_path': 'path/to/file1.txt', 'duplicate_type': 'exact'},
-            {'file_path': 'path/to/file2.txt', 'duplicate_type': 'potential'},
-        ]
+        self.db_manager = DatabaseManager(':memory:')
+        self.db_manager.create_table()
+        self.report_generator = ReportGenerator(self.db_manager)
         self.output_csv = 'test_report.csv'
 
+    def _insert(self, path, filename, size, created_time=1.0):
+        # Paths do not exist on disk, so the filename stands in for the first bytes
+        self.db_manager.insert_file(path, {
+            'filename': filename,
+            'size': size,
+            'created_time': created_time,
+        })
+
+    def _read_rows(self):
+        with open(self.output_csv, mode='r', newline='') as file:
+            return list(csv.DictReader(file))
+
     def test_generate_csv_report(self):
-        self.report_generator.generate_csv_report(self.test_data, self.output_csv)
+        self._insert('a/photo.jpg', 'photo.jpg', 1024)
+        self._insert('b/photo.jpg', 'photo.jpg', 1024)
+        self._insert('c/photo.jpg', 'photo.jpg', 1024)
+        self._insert('a/unique.txt', 'unique.txt', 10)
+
+        self.report_generator.generate_csv_report(self.output_csv)
         self.assertTrue(os.path.exists(self.output_csv))
 
-        with open(self.output_csv, mode='r') as file:
-            reader = csv.DictReader(file)
-            rows = list(reader)
-            self.assertEqual(len(rows), len(self.test_data))
-            for i, row in enumerate(rows):
-                self.assertEqual(row['file_path'], self.test_data[i]['file_path'])
-                self.assertEqual(row['duplicate_type'], self.test_data[i]['duplicate_type'])
+        rows = self._read_rows()
+        exact = [row for row in rows if row['Duplicate Type'] == 'EXACT']
+        potential = [row for row in rows if row['Duplicate Type'] == 'POTENTIAL']
+        # Every ordered pair within the group of three, once per duplicate type
+        self.assertEqual(len(exact), 6)
+        self.assertEqual(len(potential), 6)
+        for row in rows:
+            self.assertNotEqual(row['Relative Full Path'], row['Duplicate File Path'])
+            self.assertNotEqual(row['Relative Full Path'], 'a/unique.txt')
+
+    def test_potential_only_duplicates(self):
+        # Same size and first bytes, but different creation time: potential, not exact
+        self._insert('a/report.pdf', 'report.pdf', 2048, created_time=1.0)
+        self._insert('b/report.pdf', 'report.pdf', 2048, created_time=2.0)
+
+        self.report_generator.generate_csv_report(self.output_csv)
+
+        rows = self._read_rows()
+        self.assertEqual([row['Duplicate Type'] for row in rows], ['POTENTIAL', 'POTENTIAL'])
+
+    def test_no_duplicates(self):
+        self._insert('a/one.txt', 'one.txt', 1)
+        self._insert('a/two.txt', 'two.txt', 2)
+
+        self.report_generator.generate_csv_report(self.output_csv)
+
+        self.assertEqual(self._read_rows(), [])
 
     def tearDown(self):
+        self.db_manager.close()
         if os.path.exists(self.output_csv):
             os.remove(self.output_csv)
 
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
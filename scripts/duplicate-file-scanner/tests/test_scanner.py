@@ -1,59 +1,125 @@
 import os
+import sys
+import shutil
+import tempfile
 import unittest
-from src.scanner import FileScanner
+
+# Add the src directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+import stats
+from database import DatabaseManager
+from scanner import FileScanner
 
 class TestFileScanner(unittest.TestCase):
 
     def setUp(self):
-        self.scanner = FileScanner()
+        self.test_dir = tempfile.mkdtemp()
+        stats.reset()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _write(self, relative_path, content):
+        path = os.path.join(self.test_dir, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
+
+    def _scan(self, **kwargs):
+        scanned = {}
+        FileScanner(self.test_dir, **kwargs).scan(lambda path, metadata: scanned.setdefault(path, metadata))
+        return scanned
 
     def test_scan_empty_directory(self):
-        empty_dir = 'test_empty_dir'
-        os.makedirs(empty_dir, exist_ok=True)
-        result = self.scanner.scan(empty_dir)
-        self.assertEqual(result, [])
-        os.rmdir(empty_dir)
+        self.assertEqual(self._scan(), {})
 
     def test_scan_directory_with_files(self):
-        test_dir = 'test_dir'
-        os.makedirs(test_dir, exist_ok=True)
-        with open(os.path.join(test_dir, 'file1.txt'), 'w') as f:
-            f.write('Hello World')
-        with open(os.path.join(test_dir, 'file2.txt'), 'w') as f:
-            f.write('Hello World')
-        result = self.scanner.scan(test_dir)
-        self.assertGreater(len(result), 0)
-        os.remove(os.path.join(test_dir, 'file1.txt'))
-        os.remove(os.path.join(test_dir, 'file2.txt'))
-        os.rmdir(test_dir)
+        file1 = self._write('file1.txt', 'Hello World')
+        file2 = self._write(os.path.join('sub', 'file2.txt'), 'Hello World!')
+        scanned = self._scan()
+        self.assertEqual(set(scanned), {file1, file2})
+        self.assertEqual(scanned[file2]['filename'], 'file2.txt')
+        self.assertEqual(scanned[file2]['size'], 12)
+
+    def test_scan_without_subdirectories(self):
+        file1 = self._write('file1.txt', 'Hello World')
+        self._write(os.path.join('sub', 'file2.txt'), 'Hello World')
+        self.assertEqual(set(self._scan(include_subdirectories=False)), {file1})
+
+    def test_scan_skips_excluded_files(self):
+        file1 = self._write('file1.txt', 'Hello World')
+        self._write(os.path.join('sub', '.DS_Store'), 'metadata')
+        self.assertEqual(set(self._scan(exclude_files=['.DS_Store'])), {file1})
+        self.assertEqual(stats.snapshot()['counters']['files_excluded'], 1)
 
     def test_identify_exact_duplicates(self):
-        test_dir = 'test_duplicate_dir'
-        os.makedirs(test_dir, exist_ok=True)
-        with open(os.path.join(test_dir, 'file1.txt'), 'w') as f:
-            f.write('Duplicate Content')
-        with open(os.path.join(test_dir, 'file2.txt'), 'w') as f:
-            f.write('Duplicate Content')
-        result = self.scanner.scan(test_dir)
-        duplicates = self.scanner.find_duplicates(result)
-        self.assertEqual(len(duplicates), 1)
-        os.remove(os.path.join(test_dir, 'file1.txt'))
-        os.remove(os.path.join(test_dir, 'file2.txt'))
-        os.rmdir(test_dir)
-
-    def test_identify_potential_duplicates(self):
-        test_dir = 'test_potential_duplicate_dir'
-        os.makedirs(test_dir, exist_ok=True)
-        with open(os.path.join(test_dir, 'file1.txt'), 'w') as f:
-            f.write('Hello World')
-        with open(os.path.join(test_dir, 'file2.txt'), 'w') as f:
-            f.write('Hello World!')
-        result = self.scanner.scan(test_dir)
-        potential_duplicates = self.scanner.find_potential_duplicates(result)
-        self.assertGreater(len(potential_duplicates), 0)
-        os.remove(os.path.join(test_dir, 'file1.txt'))
-        os.remove(os.path.join(test_dir, 'file2.txt'))
-        os.rmdir(test_dir)
+        file1 = self._write('file1.txt', 'Duplicate Content')
+        file2 = self._write(os.path.join('sub', 'file2.txt'), 'Duplicate Content')
+        self._write('file3.txt', 'Other Content')
+        db_manager = DatabaseManager(':memory:')
+        db_manager.create_table()
+        try:
+            FileScanner(self.test_dir).scan(db_manager.insert_file)
+            duplicates = list(db_manager.get_exact_duplicates())
+        finally:
+            db_manager.close()
+        self.assertEqual({record['path'] for record in duplicates}, {file1, file2})
+        self.assertEqual(len({record['hash'] for record in duplicates}), 1)
+
+    def test_scan_records_phases_and_counters(self):
+        self._write('file1.txt', 'Duplicate Content')
+        self._write(os.path.join('sub', 'file2.txt'), 'Duplicate Content')
+        db_manager = DatabaseManager(':memory:')
+        db_manager.create_table()
+        try:
+            FileScanner(self.test_dir).scan(db_manager.insert_file)
+            FileScanner(self.test_dir).scan(db_manager.insert_file)
+        finally:
+            db_manager.close()
+        snapshot = stats.snapshot()
+        counters = snapshot['counters']
+        self.assertEqual(counters['files_scanned'], 4)
+        self.assertEqual(counters['files_indexed'], 4)
+        self.assertEqual(counters['directories_scanned'], 4)
+        # The second scan is served from the hash cache
+        self.assertEqual(counters['files_hashed'], 2)
+        self.assertEqual(counters['hash_cache_misses'], 2)
+        self.assertEqual(counters['hash_cache_hits'], 2)
+        self.assertEqual(counters['db_commits'], 4)
+        self.assertGreater(counters['bytes_read'], 0)
+        self.assertIn('scan', snapshot['phases'])
+        self.assertIn('index', snapshot['phases'])
+        self.assertTrue(any(line.startswith('files_indexed: 4 (') for line in stats.summary_lines()))
+
+    def test_scan_skips_completed_directories(self):
+        self._write('file1.txt', 'Hello World')
+        file2 = self._write(os.path.join('sub', 'file2.txt'), 'Hello World')
+        completed = []
+        scanned = {}
+        FileScanner(self.test_dir).scan(lambda path, metadata: scanned.setdefault(path, metadata),
+                                        completed_directories={self.test_dir}, directory_callback=completed.append)
+        self.assertEqual(set(scanned), {file2})
+        self.assertEqual(completed, [os.path.join(self.test_dir, 'sub')])
+        self.assertEqual(stats.snapshot()['counters']['directories_skipped'], 1)
+
+    def test_scan_continues_after_unreadable_file(self):
+        file1 = self._write('file1.txt', 'Hello World')
+        file2 = self._write(os.path.join('sub', 'file2.txt'), 'Hello World')
+        completed = []
+        scanned = []
+
+        def callback(path, metadata):
+            if path == file1:
+                raise PermissionError(13, 'Permission denied', path)
+            scanned.append(path)
+
+        FileScanner(self.test_dir).scan(callback, directory_callback=completed.append)
+        self.assertEqual(scanned, [file2])
+        # The directory with the unreadable file is retried by a resumed scan
+        self.assertEqual(completed, [os.path.join(self.test_dir, 'sub')])
+        self.assertEqual(stats.snapshot()['counters']['files_failed'], 1)
 
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -0,0 +1,108 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# Add the src directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+import similarity
+from database import DatabaseManager
+from utils import read_file_metadata
+
+class TestSimilarity(unittest.TestCase):
+
+    def setUp(self):
+        self.content = os.urandom(256 * 1024)
+
+    def test_chunks_cover_data(self):
+        chunks = similarity.content_defined_chunks(self.content)
+        self.assertEqual(chunks[0][0], 0)
+        self.assertEqual(chunks[-1][1], len(self.content))
+        for (_, end), (start, _) in zip(chunks, chunks[1:]):
+            self.assertEqual(end, start)
+        for start, end in chunks[:-1]:
+            self.assertGreaterEqual(end - start, similarity.MIN_CHUNK_SIZE)
+            self.assertLessEqual(end - start, similarity.MAX_CHUNK_SIZE)
+
+    def test_chunks_are_independent_of_block_size(self):
+        expected = similarity.content_defined_chunks(self.content)
+        original_block_size = similarity.BLOCK_SIZE
+        try:
+            similarity.BLOCK_SIZE = 10000
+            self.assertEqual(similarity.content_defined_chunks(self.content), expected)
+        finally:
+            similarity.BLOCK_SIZE = original_block_size
+
+    def test_edited_copy_is_similar(self):
+        middle = len(self.content) // 2
+        edited = self.content[:middle] + b'inserted bytes' + self.content[middle:]
+        score = similarity.estimate_similarity(
+            similarity.minhash_signature(self.content), similarity.minhash_signature(edited)
+        )
+        self.assertGreater(score, 0.8)
+
+    def test_unrelated_content_is_not_similar(self):
+        score = similarity.estimate_similarity(
+            similarity.minhash_signature(self.content), similarity.minhash_signature(os.urandom(len(self.content)))
+        )
+        self.assertLess(score, 0.1)
+
+    def test_lsh_parameters(self):
+        bands, rows = similarity.lsh_parameters(0.9)
+        self.assertLessEqual(bands * rows, similarity.NUM_PERM)
+        self.assertLessEqual((1 / bands) ** (1 / rows), 0.9)
+        self.assertGreater((1 / bands) ** (1 / rows), 0.85)
+        with self.assertRaises(ValueError):
+            similarity.lsh_parameters(0)
+
+class TestNearDuplicates(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_manager = DatabaseManager(':memory:', near_duplicate_threshold=0.8)
+        self.db_manager.create_table()
+
+    def tearDown(self):
+        self.db_manager.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def _write(self, name, content):
+        path = os.path.join(self.tmp_dir, name)
+        with open(path, 'wb') as f:
+            f.write(content)
+        self.db_manager.insert_file(path, read_file_metadata(path))
+        return path
+
+    def test_near_duplicates(self):
+        content = os.urandom(128 * 1024)
+        original = self._write('original.doc', content)
+        edited = self._write('edited.doc', content[:1000] + b'a small edit' + content[1000:])
+        self._write('copy.doc', content)
+        self._write('unrelated.doc', os.urandom(128 * 1024))
+
+        pairs = {(pair['path'], pair['duplicate_path']) for pair in self.db_manager.get_near_duplicates()}
+        copy = os.path.join(self.tmp_dir, 'copy.doc')
+        # The exact copy is reported as an exact duplicate only
+        self.assertEqual(pairs, {tuple(sorted((original, edited))), tuple(sorted((copy, edited)))})
+
+    def test_file_shrunk_below_min_size_is_no_longer_a_near_duplicate(self):
+        content = os.urandom(200 * 1024)
+        self._write('original.doc', content)
+        self._write('edited.doc', content[:1000] + b'a small edit' + content[1000:])
+        self.assertEqual(len(list(self.db_manager.get_near_duplicates())), 1)
+
+        self._write('edited.doc', b'tiny')
+        self.assertEqual(list(self.db_manager.get_near_duplicates()), [])
+        sketched = self.db_manager.connection.execute('SELECT path FROM file_sketches').fetchall()
+        self.assertEqual(sketched, [(os.path.join(self.tmp_dir, 'original.doc'),)])
+
+    def test_disabled_without_threshold(self):
+        db_manager = DatabaseManager(':memory:')
+        db_manager.create_table()
+        self.assertEqual(list(db_manager.get_near_duplicates()), [])
+        db_manager.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import logging
+import os
+import sys
+import unittest
+
+# Add the src directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+import utils
+
+class CountingValue:
+    def __init__(self):
+        self.formatted = 0
+
+    def __str__(self):
+        self.formatted += 1
+        return "value"
+
+class TestLogging(unittest.TestCase):
+
+    def tearDown(self):
+        utils.set_debug_mode(True)
+
+    def test_debug_is_not_formatted_when_disabled(self):
+        utils.set_debug_mode(False)
+        value = CountingValue()
+        utils.debug("Processing %s", value)
+        self.assertFalse(utils.is_debug_enabled())
+        self.assertEqual(value.formatted, 0)
+
+    def test_messages_are_formatted_when_logged(self):
+        utils.set_debug_mode(True)
+        with self.assertLogs(utils.logger, level=logging.DEBUG) as logs:
+            utils.debug("Processing %s", "file.txt")
+            utils.info("Found %d duplicates", 3)
+        self.assertEqual(logs.output, [
+            "DEBUG:duplicate_file_scanner:Processing file.txt",
+            "INFO:duplicate_file_scanner:Found 3 duplicates",
+        ])
+
+    def test_messages_without_args_are_not_formatted(self):
+        with self.assertLogs(utils.logger, level=logging.INFO) as logs:
+            utils.info("100% done")
+        self.assertEqual(logs.records[0].getMessage(), "100% done")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import os
+import sys
+import shutil
+import tempfile
+import types
+import unittest
+
+# Add the src directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from database import DatabaseManager
+from scanner import FileScanner
+from watcher import ChangeWatcher, Changes, _EventHandler, _PathFilter
+
+class TestChangeWatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.db_manager = DatabaseManager(':memory:')
+        self.db_manager.create_table()
+
+    def tearDown(self):
+        self.db_manager.close()
+        shutil.rmtree(self.test_dir)
+
+    def _write(self, relative_path, content):
+        path = os.path.join(self.test_dir, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
+
+    def _start_watcher(self):
+        FileScanner(self.test_dir).scan(self.db_manager.insert_file)
+        watcher = ChangeWatcher(self.db_manager, self.test_dir, exclude_files=['desktop.ini'], use_polling=True)
+        watcher.start()
+        self.addCleanup(watcher.stop)
+        return watcher
+
+    def _indexed_paths(self):
+        return {row[0] for row in self.db_manager.connection.execute('SELECT relative_full_path FROM files')}
+
+    def test_poll_without_changes(self):
+        self._write('file1.txt', 'content')
+        watcher = self._start_watcher()
+        self.assertEqual(watcher.poll(), {})
+
+    def test_created_file_joins_duplicate_group(self):
+        file1 = self._write('file1.txt', 'content')
+        watcher = self._start_watcher()
+        file2 = self._write(os.path.join('sub', 'file2.txt'), 'content')
+        self._write('desktop.ini', 'excluded')
+
+        groups = watcher.poll()['exact_match_hash']
+        self.assertEqual(list(groups.values()), [sorted([file1, file2])])
+        self.assertEqual(self._indexed_paths(), {file1, file2})
+
+    def test_modified_and_deleted_files_leave_their_groups(self):
+        file1 = self._write('file1.txt', 'content')
+        file2 = self._write('file2.txt', 'content')
+        file3 = self._write('file3.txt', 'content')
+        watcher = self._start_watcher()
+        old_hash = self.db_manager.get_file_hashes(file1)[0]
+        self._write('file1.txt', 'modified content')
+        os.remove(file2)
+
+        groups = watcher.poll()['exact_match_hash']
+        new_hash = self.db_manager.get_file_hashes(file1)[0]
+        # The old group is recomputed without either file; the new one only holds file1
+        self.assertEqual(groups, {old_hash: [file3], new_hash: [file1]})
+        self.assertEqual(self._indexed_paths(), {file1, file3})
+
+    def test_event_handler_coalesces_events(self):
+        handler = _EventHandler(_PathFilter(self.test_dir, True, ['desktop.ini']))
+        moved = self._write(os.path.join('moved', 'file.txt'), 'content')
+
+        def event(src_path, is_directory=False, dest_path=None):
+            return types.SimpleNamespace(src_path=src_path, dest_path=dest_path, is_directory=is_directory)
+
+        handler.on_created(event(os.path.join(self.test_dir, 'new.txt')))
+        handler.on_modified(event(os.path.join(self.test_dir, 'new.txt')))
+        handler.on_created(event(os.path.join(self.test_dir, 'desktop.ini')))
+        handler.on_deleted(event(os.path.join(self.test_dir, 'gone.txt')))
+        handler.on_moved(event(os.path.join(self.test_dir, 'old'), True, os.path.dirname(moved)))
+
+        changes = handler.drain()
+        self.assertEqual(changes.upserted, {os.path.join(self.test_dir, 'new.txt'), moved})
+        self.assertEqual(changes.deleted, {os.path.join(self.test_dir, 'gone.txt')})
+        self.assertEqual(changes.deleted_directories, {os.path.join(self.test_dir, 'old')})
+        self.assertFalse(handler.drain())
+
+    def test_deleted_directory_is_removed_from_index(self):
+        file1 = self._write('file1.txt', 'content')
+        self._write(os.path.join('sub', 'file2.txt'), 'content')
+        FileScanner(self.test_dir).scan(self.db_manager.insert_file)
+        watcher = ChangeWatcher(self.db_manager, self.test_dir, use_polling=True)
+        changes = Changes()
+        changes.delete_directory(os.path.join(self.test_dir, 'sub'))
+
+        groups = watcher.apply_changes(changes)['exact_match_hash']
+        self.assertEqual(list(groups.values()), [[file1]])
+        self.assertEqual(self._indexed_paths(), {file1})
+
+if __name__ == '__main__':
+    unittest.main()
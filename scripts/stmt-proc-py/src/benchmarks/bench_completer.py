@@ -0,0 +1,51 @@
+"""
+Benchmark of classification completion: the indexed ClassificationIndex against the
+linear scan that lowered every classification on each keystroke.
+
+Run from src:
+
+    python benchmarks/bench_completer.py [number_of_classifications]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from classifier.classification_completer import ClassificationIndex, CustomTransactionCompleter
+
+WORDS = ["Travel", "Food", "Shopping", "Health", "Transfer", "Investment", "Income", "Expense", "Bank",
+         "Fuel", "Train", "Hotel", "Snacks", "Clothes", "Dental", "Fees", "Salary", "Dividend", "SIP", "Rent"]
+# Prefixes of a typed query, one per keystroke
+QUERIES = [query[:length] for query in ("expense|travel|fu", "food|sna", "sip", "ransfer|a") for length in range(len(query) + 1)]
+
+
+def linear_search(classifications, user_input):
+    return [classification for classification in classifications if user_input.lower() in classification.lower()]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    rng = random.Random(42)
+    names = {f"{rng.choice(WORDS)}|{rng.choice(WORDS)} {i % 97}|{rng.choice(WORDS)} {i}" for i in range(count)}
+    usage_counts = {name: rng.randint(0, 500) for name in names}
+
+    start = time.perf_counter()
+    index = ClassificationIndex(names, usage_counts)
+    print(f"{len(index)} classifications indexed in {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    names = sorted(names)
+    for label, search in (
+        ("linear scan", lambda query: linear_search(names, query)),
+        ("index", lambda query: index.search(query, CustomTransactionCompleter.MAX_COMPLETIONS)),
+    ):
+        start = time.perf_counter()
+        for query in QUERIES:
+            search(query)
+        per_keystroke = (time.perf_counter() - start) / len(QUERIES)
+        print(f"{label}: {per_keystroke * 1000:.3f}ms per keystroke")
+
+
+if __name__ == "__main__":
+    main()
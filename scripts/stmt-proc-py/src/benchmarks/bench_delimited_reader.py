@@ -0,0 +1,43 @@
+"""
+Benchmark of the streaming delimited statement processor: parse time and peak Python
+memory (tracemalloc) for statements of increasing length. Peak memory should stay
+about flat, bounded by the chunk size. Run from src:
+
+    python benchmarks/bench_delimited_reader.py [rows ...]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from benchmarks.statement_generator import write_hdfc_sa_delimited
+from processors.hdfc_bank_acct_csv_processor import HdfcBankAcctCsvStatementProcessor
+from store.txn_store import TxnStore
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [20000, 100000, 400000]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for rows in sizes:
+            file_path = os.path.join(tmp_dir, f"500100_{rows}.csv")
+            write_hdfc_sa_delimited(file_path, rows)
+            txn_store = TxnStore(os.path.join(tmp_dir, f"transaction_{rows}.db"), os.path.join(tmp_dir, f"transactions_{rows}.csv"))
+            # Exporting the consolidated CSV loads the whole table; only ingest is measured here
+            txn_store.export_transactions = lambda: None
+            processor = HdfcBankAcctCsvStatementProcessor(txn_store)
+
+            tracemalloc.start()
+            start = time.perf_counter()
+            processor.parse_statement(file_path)
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            txn_store.close()
+            print(f"{rows} rows: {elapsed:.2f}s ({rows / elapsed:.0f} rows/s), peak memory {peak / 1024 / 1024:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark of classification per distinct feature string against per transaction:
+AutoClassifier prediction (TF-IDF + random forest) and Classifier clustering
+(TF-IDF + DBSCAN on the pairwise distance matrix).
+
+Uses the transactions of an existing transaction.db when its path is given, otherwise
+synthetic statements with repeating payees. Run from src:
+
+    python benchmarks/bench_distinct_classification.py [path_to_transaction.db]
+"""
+import os
+import sys
+import tempfile
+import time
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from benchmarks.statement_generator import hdfc_sa_transactions
+from classifier.auto_classifier import AutoClassifier
+from classifier.classifier import Classifier
+from store.txn_store import TxnStore
+
+# The per-transaction distance matrix is quadratic in memory
+MAX_CLUSTER_ROWS = 6000
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if len(sys.argv) > 1:
+            txn_store = TxnStore(sys.argv[1], os.path.join(tmp_dir, "transactions.csv"))
+        else:
+            txn_store = TxnStore(":memory:", os.path.join(tmp_dir, "transactions.csv"))
+            txn_store.store_transactions(hdfc_sa_transactions(50000))
+        df = txn_store.get_transactions()
+
+        auto_classifier = AutoClassifier(txn_store)
+        df = auto_classifier._prepare_raw_data(df)
+        print(f"{len(df)} transactions, {df['raw_data'].nunique()} distinct feature strings")
+
+        from sklearn.pipeline import Pipeline
+        from sklearn.compose import ColumnTransformer
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.multioutput import MultiOutputClassifier
+
+        # Train on the first word of the narration, standing in for the classification
+        X = df[['raw_data']]
+        y = pd.factorize(df['raw_data'].str.split().str[0])[0].reshape(-1, 1)
+        auto_classifier.pipeline = Pipeline([
+            ('preprocessor', ColumnTransformer(transformers=[('text', TfidfVectorizer(), 'raw_data')])),
+            ('clf', MultiOutputClassifier(RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=-1)))
+        ]).fit(X.head(5000), y[:5000])
+        per_row, per_row_seconds = timed(auto_classifier.pipeline.predict, X)
+        distinct, distinct_seconds = timed(auto_classifier._predict_distinct, X)
+        assert (per_row == distinct).all()
+        print(f"prediction: per transaction {per_row_seconds:.2f}s, per distinct string {distinct_seconds:.2f}s "
+              f"({per_row_seconds / distinct_seconds:.1f}x)")
+
+        classifier = Classifier(txn_store)
+        raw_data = df['raw_data'].head(MAX_CLUSTER_ROWS)
+        _, per_row_seconds = timed(lambda: classifier._cluster_transactions(classifier._vectorize_transactions(raw_data.tolist())))
+        _, distinct_seconds = timed(classifier._cluster_distinct, raw_data)
+        print(f"clustering {len(raw_data)} transactions ({raw_data.nunique()} distinct): per transaction {per_row_seconds:.2f}s, "
+              f"per distinct string {distinct_seconds:.2f}s ({per_row_seconds / distinct_seconds:.1f}x)")
+        txn_store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark of statement parsing: the former full-sheet read against the bounded read
+(probe for the header row, then only the used columns of the transaction rows).
+
+Generates multi-year synthetic HDFC statements as .xlsx workbooks and checks both
+readings produce the same raw data, so row ids are unchanged. Run from src:
+
+    python benchmarks/bench_excel_reader.py [rows]
+"""
+import os
+import sys
+import tempfile
+import time
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from benchmarks.statement_generator import hdfc_cc_frame, hdfc_sa_frame, write_statement
+from processors.excel_reader import excel_engine, find_header_row, read_probe, read_transaction_rows
+
+
+def legacy_sa_raw_data(file_path):
+    df = pd.read_excel(file_path, header=None)
+    header_row_index = df[df[0] == "Date"].index[0]
+    df.columns = df.iloc[header_row_index]
+    df = df.loc[header_row_index + 2:].reset_index(drop=True)
+    raw_data = []
+    for _, row in df.iterrows():
+        if pd.isna(row["Date"]):
+            break
+        raw_data.append(f"{row['Date']}|{row['Narration']}|{row['Chq./Ref.No.']}|{row['Withdrawal Amt.']}|{row['Deposit Amt.']}|{row['Closing Balance']}")
+    return raw_data
+
+
+def bounded_sa_raw_data(file_path):
+    probe = read_probe(file_path)
+    header_row_index = find_header_row(probe, 0, "Date")
+    df = read_transaction_rows(file_path, header_row_index + 2, {0: "d", 1: "n", 2: "c", 4: "w", 5: "p", 6: "b"}, "d")
+    return [f"{row.d}|{row.n}|{row.c}|{row.w}|{row.p}|{row.b}" for row in df.itertuples()]
+
+
+def legacy_cc_raw_data(file_path):
+    df = pd.read_excel(file_path, header=None)
+    header_row_index = df[df.iloc[:, 1] == "Transaction type"].index[0]
+    df = df.iloc[header_row_index + 1:].reset_index(drop=True)
+    raw_data = []
+    for _, row in df.iterrows():
+        if pd.isna(row[17]):
+            break
+        raw_data.append(f"{row[17]}|{row[21]}|{row[48]}|{row[54]}")
+    return raw_data
+
+
+def bounded_cc_raw_data(file_path):
+    probe = read_probe(file_path)
+    header_row_index = find_header_row(probe, 1, "Transaction type")
+    df = read_transaction_rows(file_path, header_row_index + 1, {17: "d", 21: "n", 48: "a", 54: "c"}, "d")
+    return [f"{row.d}|{row.n}|{row.a}|{row.c}" for row in df.itertuples()]
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    print(f"Excel engine: {excel_engine() or 'pandas default'}, {rows} transactions per statement")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name, frame, legacy, bounded in (
+            ("hdfc-sa", hdfc_sa_frame(rows), legacy_sa_raw_data, bounded_sa_raw_data),
+            ("hdfc-cc", hdfc_cc_frame(rows), legacy_cc_raw_data, bounded_cc_raw_data),
+        ):
+            file_path = os.path.join(tmp_dir, f"{name}.xlsx")
+            write_statement(frame, file_path)
+            legacy_rows, legacy_seconds = timed(legacy, file_path)
+            bounded_rows, bounded_seconds = timed(bounded, file_path)
+            assert legacy_rows == bounded_rows, f"{name}: raw data differs"
+            print(f"{name}: full read {legacy_seconds:.2f}s, bounded read {bounded_seconds:.2f}s "
+                  f"({legacy_seconds / bounded_seconds:.1f}x), {len(bounded_rows)} rows")
+
+
+if __name__ == "__main__":
+    main()
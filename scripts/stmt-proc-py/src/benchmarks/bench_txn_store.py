@@ -0,0 +1,40 @@
+"""
+Benchmark of the transaction store layouts: insert throughput and database size for
+each key mode, with raw_data inline or compressed and narrations inline or interned. Run from src:
+
+    python benchmarks/bench_txn_store.py [rows]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from benchmarks.statement_generator import hdfc_sa_transactions
+from store.txn_store import KeyMode, TxnStore
+
+BATCH_SIZE = 10000
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    transactions = hdfc_sa_transactions(rows)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for key_mode in KeyMode.ALL:
+            for compress, intern in ((False, False), (True, False), (False, True), (True, True)):
+                db_file = os.path.join(tmp_dir, f"{key_mode}_{compress}_{intern}.db")
+                txn_store = TxnStore(db_file, os.path.join(tmp_dir, "transactions.csv"), key_mode=key_mode,
+                                     compress_raw_data=compress, intern_narrations=intern)
+                start = time.perf_counter()
+                for offset in range(0, rows, BATCH_SIZE):
+                    txn_store.store_transactions(transactions[offset:offset + BATCH_SIZE])
+                elapsed = time.perf_counter() - start
+                txn_store.close()
+                size = os.path.getsize(db_file)
+                print(f"key_mode={key_mode:5} compress_raw_data={compress!s:5} intern_narrations={intern!s:5}: "
+                      f"{rows / elapsed:8.0f} rows/s, {size / 1024 / 1024:6.1f} MiB ({size / rows:.0f} bytes/row)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Benchmark harness for the stmt-proc-py pipeline.
+
+For each ledger size it generates synthetic data with the narration repetition of real statements
+(see statement_generator) and times:
+    ingest.hdfc-sa       parsing an HDFC savings account .xlsx statement into a new store
+    ingest.hdfc-cc       parsing an HDFC credit card .xlsx statement into a new store
+    ingest.hdfc-sa-csv   parsing an HDFC savings account delimited statement into a new store
+    export               TxnStore.export_transactions of the ledger
+    cluster              Classifier clustering of up to CLUSTER_ROWS unlabelled debit transactions
+    train                AutoClassifier.train on the labelled half of the ledger
+    predict              AutoClassifier prediction of the unlabelled half, batch by batch
+    import               AutoClassifier.import_classification_from_csv of up to IMPORT_ROWS rows
+
+Results (seconds, rows, rows per second and peak RSS, plus the instrumented stages underneath)
+are appended to a JSON history, and each stage is compared with the previous run of the same size.
+Generating the input files is not timed. Run from src:
+
+    python benchmarks/run_benchmarks.py [--sizes 10000,100000,1000000] [--history FILE] [--label TEXT]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+import pandas as pd
+from main import process_file
+from benchmarks.statement_generator import (
+    hdfc_cc_frame, hdfc_sa_frame, ledger_transactions, write_hdfc_sa_delimited, write_statement
+)
+from store.txn_store import TxnStore
+from utils import instrumentation
+
+DEFAULT_SIZES = [10000, 100000]
+DEFAULT_HISTORY = os.path.join(os.path.dirname(__file__), "history.json")
+
+# The clustering distance matrix is quadratic in the number of distinct strings
+CLUSTER_ROWS = 10000
+# Classification import updates one transaction at a time
+IMPORT_ROWS = 2000
+# A stage this much slower than in the previous run is reported as a regression,
+# unless both runs are too short for the difference to be more than noise
+REGRESSION_RATIO = 1.2
+MIN_COMPARED_SECONDS = 0.5
+
+
+@contextmanager
+def bench_stage(results, name, rows):
+    """Time a benchmark stage and record it in results."""
+    start = time.perf_counter()
+    yield
+    seconds = time.perf_counter() - start
+    results[name] = {
+        "seconds": round(seconds, 3),
+        "rows": rows,
+        "rows_per_second": round(rows / seconds, 1) if seconds > 0 else None,
+        "peak_rss_mb": instrumentation.peak_rss_mb(),
+    }
+    print(f"  {name}: {seconds:.2f}s for {rows} rows")
+
+
+def bench_ingest(results, tmp_dir, rows):
+    inputs = {
+        "hdfc-sa": ("500100_sa.xlsx", lambda path: write_statement(hdfc_sa_frame(rows), path)),
+        "hdfc-cc": ("4321_cc.xlsx", lambda path: write_statement(hdfc_cc_frame(rows), path)),
+        "hdfc-sa-csv": ("500100_sa.csv", lambda path: write_hdfc_sa_delimited(path, rows)),
+    }
+    for statement_type, (file_name, write) in inputs.items():
+        file_path = os.path.join(tmp_dir, file_name)
+        write(file_path)
+        txn_store = TxnStore(os.path.join(tmp_dir, f"{statement_type}.db"), os.path.join(tmp_dir, f"{statement_type}.csv"))
+        with bench_stage(results, f"ingest.{statement_type}", rows):
+            process_file(file_path, txn_store, statement_type)
+        txn_store.close()
+
+
+def bench_classification(results, tmp_dir, rows):
+    # Classifier modules import scikit-learn
+    from classifier.auto_classifier import AutoClassifier
+    from classifier.classifier import Classifier
+
+    txn_store = TxnStore(os.path.join(tmp_dir, "ledger.db"), os.path.join(tmp_dir, "ledger.csv"))
+    txn_store.store_transactions(ledger_transactions(rows))
+
+    with bench_stage(results, "export", rows):
+        txn_store.export_transactions()
+
+    classifier = Classifier(txn_store)
+    # The first unlabelled transactions in ledger order; the store's batches are sorted by narration
+    df = txn_store.get_transactions()
+    unlabelled = df[df['txn_type'] == ''].head(CLUSTER_ROWS)
+    del df
+    raw_data = classifier._prepare_raw_data(unlabelled[unlabelled['credit_indicator'] != 'Yes'])['raw_data']
+    with bench_stage(results, "cluster", len(raw_data)):
+        classifier._cluster_distinct(raw_data)
+
+    auto_classifier = AutoClassifier(txn_store)
+    labelled = txn_store.get_labelled_transactions()
+    with bench_stage(results, "train", len(labelled)):
+        auto_classifier.train()
+
+    with bench_stage(results, "predict", rows - len(labelled)):
+        for _ in auto_classifier.iter_classify():
+            pass
+
+    import_file = os.path.join(tmp_dir, "import.csv")
+    labelled.head(IMPORT_ROWS).assign(state="ACCEPTED").to_csv(import_file, index=False)
+    with bench_stage(results, "import", min(IMPORT_ROWS, len(labelled))):
+        auto_classifier.import_classification_from_csv(import_file)
+    txn_store.close()
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, history):
+    """Print each stage against the last run of the same size in the history."""
+    for size, stages in results.items():
+        previous = next((run["sizes"][size] for run in reversed(history) if size in run["sizes"]), None)
+        if previous is None:
+            continue
+        for name, result in stages["stages"].items():
+            before = previous["stages"].get(name)
+            if not before or not before["seconds"]:
+                continue
+            ratio = result["seconds"] / before["seconds"]
+            significant = max(result["seconds"], before["seconds"]) >= MIN_COMPARED_SECONDS
+            flag = "  REGRESSION" if ratio > REGRESSION_RATIO and significant else ""
+            print(f"{size} {name}: {before['seconds']:.2f}s -> {result['seconds']:.2f}s ({ratio:.2f}x){flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the stmt-proc-py pipeline stages.")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in DEFAULT_SIZES),
+                        help="Comma-separated ledger sizes (rows)")
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help="JSON file the results are appended to")
+    parser.add_argument("--label", default="", help="Free-text label stored with the run")
+    args = parser.parse_args()
+
+    results = {}
+    for rows in (int(size) for size in args.sizes.split(",")):
+        print(f"Benchmarking {rows} rows...")
+        instrumentation.reset()
+        stages = {}
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            bench_ingest(stages, tmp_dir, rows)
+            bench_classification(stages, tmp_dir, rows)
+        results[str(rows)] = {"stages": stages, "instrumentation": instrumentation.report()}
+
+    history = []
+    if os.path.exists(args.history):
+        with open(args.history) as file:
+            history = json.load(file)
+    compare(results, history)
+    history.append({
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": git_commit(),
+        "label": args.label,
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "sizes": results,
+    })
+    with open(args.history, "w") as file:
+        json.dump(history, file, indent=2)
+    print(f"Results appended to {args.history}")
+
+
+if __name__ == "__main__":
+    main()
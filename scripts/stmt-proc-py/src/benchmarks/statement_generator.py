@@ -0,0 +1,155 @@
+"""
+statement_generator.py
+Writes synthetic HDFC statements laid out like the bank's exports: title rows, the header row,
+the transaction rows, then an empty row and the statement summary.
+"""
+import random
+from datetime import date, timedelta
+import pandas as pd
+
+NARRATIONS = [
+    "UPI-GROCERY MART-PAYTM-{n}",
+    "UPI-FUEL STATION-OKAXIS-{n}",
+    "NEFT CR-SALARY-ACME CORP-{n}",
+    "ATW-{n}-ATM WITHDRAWAL",
+    "POS {n} ONLINE SHOPPING",
+    "ACH D- INSURANCE PREMIUM-{n}",
+    "IMPS-{n}-RENT PAYMENT",
+]
+
+# Classification of each narration template, for synthetic ledgers
+CLASSIFICATIONS = [
+    ("Expense", "Food", "Groceries"),
+    ("Expense", "Travel", "Fuel"),
+    ("Income", "Salary", "Salary"),
+    ("Expense", "Cash", "ATM"),
+    ("Expense", "Shopping", "Online"),
+    ("Expense", "Insurance", "Premium"),
+    ("Expense", "Home", "Rent"),
+]
+
+# Number of distinct payees
+PAYEES = 5000
+
+SA_DELIMITED_HEADER = ["Date", "Narration", "Value Dat", "Debit Amount", "Credit Amount", "Chq/Ref Number", "Closing Balance"]
+
+SA_HEADER = ["Date", "Narration", "Chq./Ref.No.", "Value Dt", "Withdrawal Amt.", "Deposit Amt.", "Closing Balance"]
+
+# Width of the credit card export and the positions of the used columns
+CC_WIDTH = 60
+CC_DATE, CC_NARRATION, CC_AMOUNT, CC_DEBIT_CREDIT = 17, 21, 48, 54
+
+
+def _transactions(rows, seed=0):
+    """Yield (date, narration, amount, is_credit) tuples, spread over several years."""
+    rng = random.Random(seed)
+    day = date(2019, 4, 1)
+    for n in range(rows):
+        day += timedelta(days=rng.random() < 0.3)
+        # Payees repeat with a Zipf-like (heavy head, long tail) frequency, as in real statements
+        payee = min(int(rng.paretovariate(0.7)), PAYEES)
+        narration = NARRATIONS[payee % len(NARRATIONS)].format(n=payee)
+        # Amounts of a payee vary around a typical amount
+        amount = round(rng.lognormvariate(5 + payee % 5, 0.5), rng.choice([0, 2]))
+        yield day, narration, amount, rng.random() < 0.1
+
+
+def hdfc_sa_frame(rows, seed=0):
+    """Return the sheet of a synthetic HDFC savings account statement as a header-less frame."""
+    sheet = [["HDFC BANK Ltd."] + [None] * 6] + [[f"Account detail {i}"] + [None] * 6 for i in range(19)]
+    sheet.append(SA_HEADER)
+    sheet.append(["*" * 8] * 7)
+    balance = 100000.0
+    for n, (day, narration, amount, is_credit) in enumerate(_transactions(rows, seed)):
+        balance += amount if is_credit else -amount
+        sheet.append([
+            day.strftime("%d/%m/%y"), narration, f"{n:016d}", day.strftime("%d/%m/%y"),
+            None if is_credit else amount, amount if is_credit else None, round(balance, 2),
+        ])
+    sheet.append([None] * 7)
+    sheet.append(["STATEMENT SUMMARY :-"] + [None] * 6)
+    sheet.append(["Opening Balance", "Dr Count", "Cr Count", "Debits", "Credits", "Closing Bal", None])
+    return pd.DataFrame(sheet)
+
+
+def hdfc_cc_frame(rows, seed=0):
+    """Return the sheet of a synthetic HDFC credit card statement as a header-less frame."""
+    header = [None] * CC_WIDTH
+    header[1] = "Transaction type"
+    header[CC_DATE], header[CC_NARRATION], header[CC_AMOUNT], header[CC_DEBIT_CREDIT] = (
+        "Date", "Description", "AMT", "Debit / Credit")
+    sheet = [["Credit Card Statement"] + [None] * (CC_WIDTH - 1), header]
+    for day, narration, amount, is_credit in _transactions(rows, seed):
+        row = [None] * CC_WIDTH
+        row[1] = "Domestic"
+        row[CC_DATE] = day.strftime("%d/%m/%Y 00:00:00")
+        row[CC_NARRATION] = narration
+        row[CC_AMOUNT] = amount
+        row[CC_DEBIT_CREDIT] = "Cr" if is_credit else ""
+        sheet.append(row)
+    sheet.append([None] * CC_WIDTH)
+    sheet.append(["Reward points summary"] + [None] * (CC_WIDTH - 1))
+    return pd.DataFrame(sheet)
+
+
+def write_statement(frame, file_path):
+    """Write a header-less statement frame to an .xlsx workbook."""
+    frame.to_excel(file_path, header=False, index=False)
+
+
+def write_hdfc_sa_delimited(file_path, rows, seed=0):
+    """
+    Write a synthetic HDFC savings account statement in the bank's delimited format,
+    with the cells padded to fixed widths. Rows are written as they are generated.
+    """
+    widths = [10, 60, 10, 18, 18, 18, 18]
+
+    def line(cells):
+        return ",".join(f"{cell:<{width}}" for cell, width in zip(cells, widths)) + "\n"
+
+    balance = 100000.0
+    with open(file_path, "w") as f:
+        f.write("\n")
+        f.write(line(SA_DELIMITED_HEADER))
+        for n, (day, narration, amount, is_credit) in enumerate(_transactions(rows, seed)):
+            balance += amount if is_credit else -amount
+            f.write(line([
+                day.strftime("%d/%m/%y"), narration, day.strftime("%d/%m/%y"),
+                "0.00" if is_credit else f"{amount:.2f}", f"{amount:.2f}" if is_credit else "0.00",
+                f"{n:016d}", f"{balance:.2f}",
+            ]))
+
+
+def hdfc_sa_transactions(rows, seed=0):
+    """Return transaction records as the hdfc-sa processor passes them to TxnStore.store_transactions."""
+    transactions = []
+    balance = 100000.0
+    for n, (day, narration, amount, is_credit) in enumerate(_transactions(rows, seed)):
+        balance = round(balance + (amount if is_credit else -amount), 2)
+        withdrawal, deposit = (float("nan"), amount) if is_credit else (amount, float("nan"))
+        transactions.append({
+            "txn-source": "500100",
+            "txn-date": day.strftime("%Y-%m-%d"),
+            "narration": narration,
+            "txn-amount": amount,
+            "credit-indicator": "Yes" if is_credit else "",
+            "txn-type": "",
+            "category": "",
+            "sub-category": "",
+            "raw-data": f"{day.strftime('%d/%m/%y')}|{narration}|{n:016d}|{withdrawal}|{deposit}|{balance}",
+        })
+    return transactions
+
+
+def ledger_transactions(rows, labelled_fraction=0.5, seed=0):
+    """
+    Return transaction records of a synthetic ledger: the first labelled_fraction of the rows
+    carry the classification of their narration template, the others are unlabelled.
+    """
+    prefixes = [template.split("{n}")[0] for template in NARRATIONS]
+    labelled_rows = int(rows * labelled_fraction)
+    transactions = hdfc_sa_transactions(rows, seed)
+    for transaction in transactions[:labelled_rows]:
+        template = next(i for i, prefix in enumerate(prefixes) if transaction["narration"].startswith(prefix))
+        transaction["txn-type"], transaction["category"], transaction["sub-category"] = CLASSIFICATIONS[template]
+    return transactions
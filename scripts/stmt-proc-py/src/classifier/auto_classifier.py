@@ -1,16 +1,25 @@
 import sys
-import pandas as pd
+import itertools
+import json
 import numpy as np
-from sklearn.model_selection import train_test_split
-from sklearn.pipeline import Pipeline
-from sklearn.compose import ColumnTransformer
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.preprocessing import StandardScaler, LabelEncoder
-from sklearn.multioutput import MultiOutputClassifier
+import pandas as pd
 from store.txn_store import TxnStore, TxnState
-from prompt_toolkit import prompt
-from classifier.classification_completer import CustomTransactionCompleter
+from classifier.rules import ClassificationRules
+from utils.instrumentation import count, stage, timed
+
+# Predictions at least this probable are accepted by auto_accept
+DEFAULT_MIN_CONFIDENCE = 0.9
+
+# Transactions read from the store and predicted at a time when classifying all of them
+PREDICT_BATCH_SIZE = 5000
+
+# Bounds (inclusive) of the amount and day-of-month ranges used as features
+AMOUNT_RANGES = [
+    (1, 100), (101, 500), (501, 1000), (1001, 5000), (5001, 10000),
+    (10001, 25000), (25001, 50000), (50001, 100000), (100001, 500000),
+    (500001, 1000000)
+]
+DATE_RANGES = [(1, 7), (8, 14), (15, 21), (22, 31)]
 
 class AutoClassifier:
     """
@@ -18,25 +27,39 @@ class AutoClassifier:
     It uses a multi-output classifier to predict transaction type, category, and sub-category.
     """
 
-    def __init__(self, txn_store: TxnStore = None):
+    def __init__(self, txn_store: TxnStore = None, config_file='./config.json'):
         """
         Initialize the AutoClassifier.
+        Narration rules are loaded from the file of the 'classifier_rules_file' configuration key
+        (default: './classifier_rules.csv'); see ClassificationRules.
         """
-        self.classification_encoder = LabelEncoder()
+        self.classification_encoder = None  # Fitted by train()
         self.pipeline = None
         self.txn_store = txn_store    
+        try:
+            with open(config_file, 'r') as file:
+                config = json.load(file)
+        except FileNotFoundError:
+            config = {}
+        self.rules = ClassificationRules.load(config.get('classifier_rules_file', './classifier_rules.csv'))
+        self.metadata_file = config.get('classifier_metadata_file', './classifier_metadata.csv')
 
     def train(self):
         """
         Train the classifier on the provided DataFrame.
         The DataFrame should contain labeled transaction data.
         """
-
-        # Load transactions from the store
-        df = self.txn_store.get_transactions()
-
-        # Separate training data with labels
-        train_df = df[df['txn_type'] != ''].copy()
+        # scikit-learn is only imported by the operations that train a model
+        from sklearn.model_selection import train_test_split
+        from sklearn.pipeline import Pipeline
+        from sklearn.compose import ColumnTransformer
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.preprocessing import LabelEncoder
+        from sklearn.multioutput import MultiOutputClassifier
+
+        # Load the transactions with labels from the store
+        train_df = self.txn_store.get_labelled_transactions()
 
         print(f"Number of training transactions: {len(train_df)}")
 
@@ -45,6 +68,7 @@ class AutoClassifier:
         train_df = self._prepare_raw_data(train_df)
 
         # Encode classification labels
+        self.classification_encoder = LabelEncoder()
         train_df['classification'] = train_df['txn_type'] + '|' + train_df['category'] + '|' + train_df['sub_category']
         train_df['classification_enc'] = self.classification_encoder.fit_transform(train_df['classification'])
 
@@ -69,10 +93,12 @@ class AutoClassifier:
 
         # Train the model
         #self.pipeline.fit(X_train, y_train)
-        self.pipeline.fit(train_df[feature_names], y)
+        with stage("auto_classifier.train") as s:
+            self.pipeline.fit(train_df[feature_names], y)
+            s.rows = len(train_df)
 
         # Evaluate the model on validation set
-        val_preds = self.pipeline.predict(X_val)
+        val_preds = self._predict_distinct(X_val)
         val_preds = np.array(val_preds).reshape(-1, 1)  # Reshape to match the target shape
 
         val_accuracy = np.mean(np.all(val_preds == y_val, axis=1))
@@ -84,39 +110,183 @@ class AutoClassifier:
         This method retrieves transactions from the store, prepares the data,
         and applies the trained model to predict missing classifications.
 
-        It returns a DataFrame with the predicted classifications.
+        Transactions matching a narration rule are classified by the rule; only the others
+        go through the model.
+
+        It returns a DataFrame with the predicted classifications, 'classified_by'
+        ('rule' or 'model') and 'confidence' (the predicted class probability, 1.0 for rules)
+        for each transaction.
+        Args:
+            batch_size (int): The number of transactions to classify, or -1 for all of them.
+                Use iter_classify to process all of them with bounded memory.
         Raises:
             ValueError: If the classifier has not been trained yet.
         """
-        if self.pipeline is None:
-            raise ValueError("The classifier has not been trained yet.")
-
-        # Load transactions from the store
-        df = self.txn_store.get_transactions()
-
-        # Filter for transactions without classification
         if batch_size < 0:
-            classify_df = df[df['txn_type'] == ''].copy()  # All transactions for classification    
+            batches = list(self.iter_classify())
         else:
-            classify_df = df[df['txn_type'] == ''].copy().head(batch_size)  # Limit to 1000 transactions for classification
+            batches = list(itertools.islice(self.iter_classify(batch_size), 1))
+        if not batches:
+            return pd.DataFrame()
+        return pd.concat(batches, ignore_index=True)
 
+    def iter_classify(self, batch_size=PREDICT_BATCH_SIZE):
+        """
+        Predict the classifications of the transactions without labels, batch by batch.
+        Transactions are read from the store in batches of batch_size rows ordered by narration,
+        so only one batch and its predictions are held in memory at a time.
+        Yields:
+            pandas.DataFrame: A batch of transactions with the columns added by classify.
+        Raises:
+            ValueError: If the classifier has not been trained yet.
+        """
+        if self.pipeline is None:
+            raise ValueError("The classifier has not been trained yet.")
+        for batch in self.txn_store.iter_unlabelled_transactions(batch_size):
+            yield self._classify_batch(batch)
+
+    def _classify_batch(self, classify_df):
+        """
+        Classify a batch of transactions, by narration rule or else by the model.
+        Args:
+            classify_df (pandas.DataFrame): Transactions as returned by the store.
+        Returns:
+            pandas.DataFrame: The transactions with 'classification', 'classified_by' and 'confidence'.
+        """
         print(f"Number of transactions to classify: {len(classify_df)}")
 
         # Prepare raw data
         print("Preparing raw data for prediction...")
         classify_df = self._prepare_raw_data(classify_df)
 
-        # Prepare test features
-        X_test = classify_df[['raw_data']]
+        # Apply the narration rules first
+        with stage("auto_classifier.rules") as s:
+            classify_df['classification'] = self.rules.classify(classify_df['narration'])
+            s.rows = len(classify_df)
+        classify_df['classified_by'] = 'rule'
+        classify_df['confidence'] = 1.0
+        residue = classify_df['classification'].isna()
+        print(f"Transactions classified by rules: {len(classify_df) - residue.sum()}, left for the model: {residue.sum()}")
 
-        # Generate predictions
-        preds = self.pipeline.predict(X_test)
+        if residue.any():
+            # Prepare test features
+            X_test = classify_df.loc[residue, ['raw_data']]
 
-        # Convert numeric predictions back to original labels
-        classify_df['classification'] = self.classification_encoder.inverse_transform(preds[:, 0])
+            # Generate predictions, once per distinct feature string
+            preds, confidence = self._predict_proba_distinct(X_test)
+
+            # Convert numeric predictions back to original labels
+            classify_df.loc[residue, 'classification'] = self.classification_encoder.inverse_transform(preds[:, 0])
+            classify_df.loc[residue, 'classified_by'] = 'model'
+            classify_df.loc[residue, 'confidence'] = confidence
 
         return classify_df
 
+    def _predict_distinct(self, X):
+        """
+        Predict with the trained pipeline once per distinct feature string.
+
+        Transactions with the same narration, direction, amount range and date range share
+        their feature string and so their prediction; only the distinct strings are
+        vectorized and passed through the forest, and the predictions are mapped back.
+
+        Args:
+            X (pandas.DataFrame): The features, with a 'raw_data' column.
+        Returns:
+            numpy.ndarray: The predictions, one row per row of X.
+        """
+        codes, uniques = pd.factorize(X['raw_data'], use_na_sentinel=False)
+        if len(uniques) == 0:
+            return self.pipeline.predict(X)
+        with stage("auto_classifier.predict") as s:
+            preds = self.pipeline.predict(pd.DataFrame({'raw_data': uniques}))
+            s.rows = len(X)
+        count("auto_classifier.distinct_strings", len(uniques))
+        return preds[codes]
+
+    def _predict_proba_distinct(self, X):
+        """
+        Predict with the trained pipeline once per distinct feature string, with the probability
+        of each predicted class.
+        Args:
+            X (pandas.DataFrame): The features, with a 'raw_data' column.
+        Returns:
+            tuple: The predictions (one row per row of X, as _predict_distinct) and the probability
+                of each prediction.
+        """
+        codes, uniques = pd.factorize(X['raw_data'], use_na_sentinel=False)
+        # One probability matrix per output; the classification is the only output
+        estimator = self.pipeline.named_steps['clf'].estimators_[0]
+        with stage("auto_classifier.predict") as s:
+            proba = self.pipeline.predict_proba(pd.DataFrame({'raw_data': uniques}))[0]
+            s.rows = len(X)
+        count("auto_classifier.distinct_strings", len(uniques))
+        best = proba.argmax(axis=1)
+        preds = estimator.classes_[best].reshape(-1, 1)
+        return preds[codes], proba[np.arange(len(best)), best][codes]
+
+    def auto_accept(self, min_confidence=DEFAULT_MIN_CONFIDENCE, review_file=None, batch_size=PREDICT_BATCH_SIZE):
+        """
+        Classify all unlabelled transactions without user interaction.
+        Predictions with a confidence of at least min_confidence are accepted; the others are not
+        stored, so the transactions stay unlabelled (they are neither used for training nor skipped
+        by later runs), and, if review_file is given, are written to it in the format read by
+        import_classification_from_csv.
+        Transactions are predicted batch by batch; the accepted ones are written to the store in a
+        single bulk update after the last batch.
+        Args:
+            min_confidence (float): The minimum predicted class probability to accept a prediction.
+            review_file (str): The CSV file for the predictions left for review.
+            batch_size (int): The number of transactions predicted at a time.
+        Returns:
+            tuple: The number of accepted transactions and of transactions left for review.
+        """
+        print("Performing in-memory training...")
+        self.train()
+        print("Training completed successfully. Classifying transactions...")
+
+        total_accepted = total_review = 0
+        # The accepted classifications are written once all batches were read: writing (and committing)
+        # while the cursor of iter_unlabelled_transactions is still open would change the rows it reads.
+        accepted_raw_data, accepted_classifications = [], []
+        for classify_df in self.iter_classify(batch_size):
+            if classify_df.empty:
+                continue
+            classify_df[['txn_type', 'category', 'sub_category']] = classify_df['classification'].str.split('|', n=2, expand=True)
+            valid = classify_df['sub_category'].notna()
+            if not valid.all():
+                print(f"Skipping {(~valid).sum()} transactions with an invalid classification format.")
+                classify_df = classify_df[valid].copy()
+
+            accepted = classify_df['confidence'] >= min_confidence
+            classify_df['state'] = TxnState.PENDING_REVIEW
+            accepted_df = classify_df[accepted]
+            accepted_raw_data.extend(accepted_df['raw_data_orig'])
+            accepted_classifications.extend(accepted_df[['txn_type', 'category', 'sub_category']].itertuples(index=False, name=None))
+
+            review_df = classify_df[~accepted]
+            if review_file is not None and not review_df.empty:
+                # Batches come in narration order, so the file is sorted by narration
+                self._append_to_csv(review_df[[
+                    'txn_source', 'txn_date', 'narration', 'txn_amount', 'credit_indicator',
+                    'txn_type', 'category', 'sub_category', 'raw_data_orig', 'state', 'confidence'
+                ]].rename(columns={'raw_data_orig': 'raw_data'}), review_file, header=total_review == 0)
+            total_accepted += int(accepted.sum())
+            total_review += len(review_df)
+
+        if accepted_raw_data:
+            self.txn_store.update_classifications(accepted_raw_data, accepted_classifications, TxnState.ACCEPTED)
+        if total_review and review_file is not None:
+            print(f"Transactions left for review exported to {review_file}")
+        print(f"Accepted {total_accepted} transactions with a confidence of at least {min_confidence}, "
+              f"{total_review} left for review.")
+        return total_accepted, total_review
+
+    @staticmethod
+    def _append_to_csv(df, output_file, header):
+        """Write df to output_file, replacing the file when header is True and appending to it otherwise."""
+        df.to_csv(output_file, mode='w' if header else 'a', header=header, index=False)
+
     def apply_classification(self):
         """
         Apply the classification process interactively.
@@ -124,6 +294,16 @@ class AutoClassifier:
         It will prompt the user to accept or reject classifications in batches of 10 transactions.
 
         """
+        # Interactive only; keeps prompt_toolkit out of the non-interactive operations
+        from prompt_toolkit import prompt
+        from classifier.classification_completer import ClassificationIndex, CustomTransactionCompleter
+        from classifier.classifier_metadata import ClassifierMetadata
+
+        # Built once; the index is reused for every manual classification prompt
+        completer = CustomTransactionCompleter(
+            ClassificationIndex.from_sources(ClassifierMetadata.load(self.metadata_file), self.txn_store)
+        )
+
         while True:
             # Perform ML model training
             print("Performing in-memory training...")
@@ -189,7 +369,7 @@ class AutoClassifier:
                     print(f"\nRecord {seq}:")
                     print(f"{row['raw_data']} | {row['txn_source']} | {row['txn_date']} | {row['narration']} | {row['txn_amount']} | {row['credit_indicator']} | {row['classification']}")
                     # manual_class = input("Enter manual classification as 'txn_type|category|sub_category', or press ENTER to skip: ").strip()
-                    manual_class = prompt("Enter manual classification as 'txn_type|category|sub_category', or press ENTER to skip: ", completer=CustomTransactionCompleter()).strip()
+                    manual_class = prompt("Enter manual classification as 'txn_type|category|sub_category', or press ENTER to skip: ", completer=completer).strip()
                     if manual_class:
                         parts = manual_class.split('|')
                         if len(parts) == 3:
@@ -214,14 +394,17 @@ class AutoClassifier:
                     break
                 i += batch_size
 
-    def export_classification_to_csv(self, output_file):
+    def export_classification_to_csv(self, output_file, batch_size=PREDICT_BATCH_SIZE):
         """
         Export the classified transactions to a CSV file.
         This method retrieves the transactions from the store, prepares the data,
         and saves it to the specified output file.
+        The predictions are made and appended to the file batch by batch, so memory is bounded
+        by batch_size rather than by the number of unlabelled transactions.
 
         Args:
             output_file (str): The path to the output CSV file.
+            batch_size (int): The number of transactions predicted at a time.
         """
         # Perform ML model training
         print("Performing in-memory training...")
@@ -230,43 +413,37 @@ class AutoClassifier:
         self.train()
         print("Training completed successfully. Classifying transactions...")
 
-        # Classify transactions
-        classify_df = self.classify(-1) # Use -1 to classify all transactions without limit
-        # If no transactions to classify, exit
-        if classify_df.empty:
-            print("No transactions to classify. Exiting.")
-            return
-
-        # sort classify_df by narration
-        classify_df.sort_values(by='narration', inplace=True)
-
-        # Loop through the classified DataFrame and update txn_type, category, sub_category in the data frame based on classification
-        for idx, row in classify_df.iterrows():
-            parts = row['classification'].split('|')
-            if len(parts) == 3:
-                txn_type, category, sub_category = parts
-                classify_df.at[idx, 'txn_type'] = txn_type
-                classify_df.at[idx, 'category'] = category
-                classify_df.at[idx, 'sub_category'] = sub_category
-                classify_df.at[idx, 'state'] = TxnState.PENDING_REVIEW
-            else:
-                print(f"Invalid classification format for row {idx}: {row['classification']}")
-
-        # output data - txn_source, txn_date, narration, txn_amount, credit_indicator, txn_type, category, sub_category, raw_data, state
-        # Load transactions from the store
-        train_df = self.txn_store.get_transactions()
-
-        # Separate training data with labels
-        train_df = train_df[train_df['state'] != TxnState.PENDING_CLASSIFICATION].copy()
-
-        # Combine train_df and classify_df, then select required columns
-        df_csv = pd.concat([train_df, classify_df], ignore_index=True)[[
+        columns = [
             'txn_source', 'txn_date', 'narration', 'txn_amount', 'credit_indicator',
             'txn_type', 'category', 'sub_category', 'raw_data', 'state'
-        ]]
+        ]
 
-        # df_csv = classify_df[['txn_source', 'txn_date', 'narration', 'txn_amount', 'credit_indicator', 'txn_type', 'category', 'sub_category', 'raw_data', 'state']].copy()
-        df_csv.to_csv(output_file, index=False)
+        # output data - txn_source, txn_date, narration, txn_amount, credit_indicator, txn_type, category, sub_category, raw_data, state
+        # Transactions already classified come first, streamed from the store
+        header = True
+        for train_df in self.txn_store.iter_transactions_not_in_state(TxnState.PENDING_CLASSIFICATION, batch_size):
+            self._append_to_csv(train_df[columns], output_file, header=header)
+            header = False
+
+        # Then the predictions, classified and written batch by batch (in narration order)
+        total_classified = 0
+        for classify_df in self.iter_classify(batch_size):
+            if classify_df.empty:
+                continue
+            # Update txn_type, category, sub_category in the data frame based on classification
+            parts = classify_df['classification'].str.split('|', n=2, expand=True).reindex(columns=range(3))
+            valid = parts[2].notna()
+            for idx, classification in classify_df.loc[~valid, 'classification'].items():
+                print(f"Invalid classification format for row {idx}: {classification}")
+            classify_df.loc[valid, ['txn_type', 'category', 'sub_category']] = parts[valid].values
+            classify_df.loc[valid, 'state'] = TxnState.PENDING_REVIEW
+            classify_df['raw_data'] = classify_df['raw_data_orig']
+            self._append_to_csv(classify_df[columns], output_file, header=header)
+            header = False
+            total_classified += len(classify_df)
+
+        if total_classified == 0:
+            print("No transactions to classify.")
         print(f"Classified transactions exported to {output_file}")
     
     def import_classification_from_csv(self, csv_file):
@@ -308,6 +485,7 @@ class AutoClassifier:
         
         print(f"Classifications imported from {csv_file}")
 
+    @timed("auto_classifier.prepare")
     def _prepare_raw_data(self, df):
         """
         Prepare and enrich the input DataFrame by generating new features for transaction classification.
@@ -337,33 +515,29 @@ class AutoClassifier:
                     amount = int(amount)  # Attempt to convert to integer
                 except (ValueError, TypeError):
                     return "unknown"  # Handle invalid or missing amounts
-            ranges = [
-                (1, 100), (101, 500), (501, 1000), (1001, 5000), (5001, 10000),
-                (10001, 25000), (25001, 50000), (50001, 100000), (100001, 500000),
-                (500001, 1000000)
-            ]
-            for lower, upper in ranges:
+            for lower, upper in AMOUNT_RANGES:
                 if lower <= amount <= upper:
                     return f"{lower}-{upper}"
             return "1000001+"
 
-        def get_date_range(day):
-            ranges = [(1, 7), (8, 14), (15, 21), (22, 31)]
-            for lower, upper in ranges:
-                if lower <= day <= upper:
-                    return f"{lower}-{upper}"
-            return "unknown"
+        def label_ranges(values, ranges, default):
+            # Vectorized equivalent of get_amount_range for numeric values; NaN falls to the default
+            conditions = [(values >= lower) & (values <= upper) for lower, upper in ranges]
+            return np.select(conditions, [f"{lower}-{upper}" for lower, upper in ranges], default=default)
 
-        df['amount_range'] = df['txn_amount'].apply(get_amount_range)
+        if pd.api.types.is_numeric_dtype(df['txn_amount']):
+            df['amount_range'] = label_ranges(df['txn_amount'], AMOUNT_RANGES, "1000001+")
+        else:
+            df['amount_range'] = df['txn_amount'].apply(get_amount_range)
 
         # Ensure txn_date is in datetime format
         df['txn_date'] = pd.to_datetime(df['txn_date'], format='%Y-%m-%d', errors='coerce')
-        df['date_range'] = df['txn_date'].dt.day.apply(get_date_range)
+        df['date_range'] = label_ranges(df['txn_date'].dt.day, DATE_RANGES, "unknown")
 
         # Backup original raw_data
         df['raw_data_orig'] = df['raw_data']
 
-        df['credit_debit'] = df['credit_indicator'].apply(lambda x: 'Credit' if x == 'Yes' else 'Debit')
+        df['credit_debit'] = np.where(df['credit_indicator'] == 'Yes', 'Credit', 'Debit')
 
         # Replace '-' and '_' with space in narration before combining
         df['narration_clean'] = df['narration'].astype(str).str.replace(r'[-_]', ' ', regex=True)
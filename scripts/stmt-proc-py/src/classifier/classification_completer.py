@@ -111,12 +111,108 @@ classifications = [
     "Expense|Maintenance|ActivaI"
 ]
 
+# Length of the substrings indexed for matching
+GRAM_SIZE = 3
+
+class ClassificationIndex:
+    """
+    Case-insensitive substring index over 'txn_type|category|sub_category' classifications.
+
+    Every classification is lowered once and each of its substrings of up to GRAM_SIZE characters
+    maps to the classifications containing it, in ranking order. A longer query is only compared
+    with the classifications of its rarest trigram.
+    Matches are ranked by prefix match first, then by usage count, then alphabetically.
+    """
+
+    def __init__(self, classifications, usage_counts=None):
+        """
+        Args:
+            classifications (iterable): The classification strings.
+            usage_counts (dict): The number of transactions per classification string.
+        """
+        usage_counts = usage_counts or {}
+        names = set(classifications) | set(usage_counts)
+        # Candidate ids follow the ranking of an empty query, so postings are kept in ranking order
+        self._names = sorted(names, key=lambda name: (-usage_counts.get(name, 0), name))
+        self._lowered = [name.lower() for name in self._names]
+        self._grams = {}
+        self._prefixes = {}
+        for candidate_id, lowered in enumerate(self._lowered):
+            grams = {lowered[start:start + size] for size in range(1, GRAM_SIZE + 1) for start in range(len(lowered) - size + 1)}
+            for gram in grams:
+                self._grams.setdefault(gram, []).append(candidate_id)
+            for size in range(1, min(GRAM_SIZE, len(lowered)) + 1):
+                self._prefixes.setdefault(lowered[:size], []).append(candidate_id)
+
+    @classmethod
+    def from_sources(cls, classifier_metadata=None, txn_store=None):
+        """
+        Build the index from the classifier metadata and the classifications used in the store.
+        The predefined classifications are used when neither source has any.
+        Args:
+            classifier_metadata (ClassifierMetadata): The known classification triples.
+            txn_store (TxnStore): The store to count classification usage in.
+        """
+        triples = set(classifier_metadata) if classifier_metadata is not None else set()
+        usage_counts = {}
+        if txn_store is not None:
+            for triple, count in txn_store.get_classification_counts().items():
+                usage_counts['|'.join(triple)] = count
+        names = ['|'.join(triple) for triple in triples if all(triple)]
+        if not names and not usage_counts:
+            names = classifications
+        return cls(names, usage_counts)
+
+    def __len__(self):
+        return len(self._names)
+
+    def search(self, text, limit=None):
+        """
+        Find the classifications containing text, ignoring case.
+        Args:
+            text (str): The text typed so far.
+            limit (int): The maximum number of matches, or None for all.
+        Returns:
+            list: The matching classifications, best first.
+        """
+        query = text.lower()
+        if not query:
+            return self._names[:limit]
+        if len(query) <= GRAM_SIZE:
+            matches = self._grams.get(query, [])
+            prefix_matches = self._prefixes.get(query, [])
+        else:
+            rarest = min(
+                (self._grams.get(query[start:start + GRAM_SIZE], []) for start in range(len(query) - GRAM_SIZE + 1)),
+                key=len
+            )
+            matches = [candidate_id for candidate_id in rarest if query in self._lowered[candidate_id]]
+            prefix_matches = [candidate_id for candidate_id in matches if self._lowered[candidate_id].startswith(query)]
+
+        ranked = prefix_matches[:limit]
+        if limit is None or len(ranked) < limit:
+            prefix_ids = set(prefix_matches)
+            for candidate_id in matches:
+                if candidate_id not in prefix_ids:
+                    ranked.append(candidate_id)
+                    if len(ranked) == limit:
+                        break
+        return [self._names[candidate_id] for candidate_id in ranked]
+
 class CustomTransactionCompleter(Completer):
+    # Maximum number of completions shown for a keystroke
+    MAX_COMPLETIONS = 50
+
+    def __init__(self, index=None):
+        """
+        Args:
+            index (ClassificationIndex): The classifications to complete; the predefined ones by default.
+        """
+        self.index = index if index is not None else ClassificationIndex(classifications)
+
     def get_completions(self, document, complete_event):
         # text_before_cursor contains what the user has typed so far.
         user_input = document.text_before_cursor
-        for classification in classifications:
-            # Check if the typed input appears anywhere in the transaction (case-insensitive).
-            if user_input.lower() in classification.lower():
-                # start_position defines how much of current text should be replaced.
-                yield Completion(classification, start_position=-len(user_input))
+        for classification in self.index.search(user_input, self.MAX_COMPLETIONS):
+            # start_position defines how much of current text should be replaced.
+            yield Completion(classification, start_position=-len(user_input))
@@ -1,11 +1,9 @@
 import csv
 import pandas as pd
-import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.cluster import DBSCAN
 import json
 from utils.helpers import parse_date_util
+from classifier.classifier_metadata import ClassifierMetadata
+from utils.instrumentation import count, timed
 
 class Classifier:
     """Class to classify transactions based on similarity and user input."""
@@ -18,7 +16,7 @@ class Classifier:
         self.classifier_metadata = self._load_classifier_metadata()
         print(f"Classifier metadata loaded with {len(self.classifier_metadata)} entries.")
         print(f"Loaded distinct categories: {len(self._get_distinct_categories())} and distinct sub-categories: {len(self._get_distinct_sub_categories())}")
-        self.vectorizer = TfidfVectorizer()
+        self.vectorizer = None  # Created on first use; importing scikit-learn is slow
 
     def _load_config(self, config_file):
         """Load configuration from a JSON file."""
@@ -32,52 +30,26 @@ class Classifier:
         The method attempts to load a CSV file specified by the configuration key
         'classifier_metadata_file' (default: './classifier_metadata.csv'). The file must contain
         three columns: 'txn_type', 'category', and 'sub_category'. If the file is missing or does not
-        contain the required columns, an empty DataFrame with these columns is returned.
+        contain the required columns, the metadata starts empty.
 
         Returns:
-            pd.DataFrame: DataFrame containing classifier metadata with columns
-                  ['txn_type', 'category', 'sub_category'].
+            ClassifierMetadata: The indexed classifier metadata.
         """
         metadata_file = self.config.get('classifier_metadata_file', './classifier_metadata.csv')
-        try:
-            df = pd.read_csv(metadata_file, delimiter='|')
-            print(f"Columns in metadata file: {df.columns.tolist()}")
-            if not all(col in df.columns for col in ['txn_type', 'category', 'sub_category']):
-                raise ValueError("Metadata file must contain txn_type, category, and sub_category columns.")
-            return df
-        except FileNotFoundError:
-            print(f"Metadata file {metadata_file} not found. Please check the path.")
-            return pd.DataFrame(columns=['txn_type', 'category', 'sub_category'])
-        except Exception as e:
-            print(f"Error loading metadata file: {e}")
-            return pd.DataFrame(columns=['txn_type', 'category', 'sub_category'])
+        return ClassifierMetadata.load(metadata_file)
         
     def _save_classifier_metadata(self):
         """
-        Saves the classifier metadata to a CSV file specified in the configuration.
-
-        The method retrieves the file path from the configuration using the key
-        'classifier_metadata_file'. If the key is not present, it defaults to
-        './classifier_metadata.csv'. The classifier metadata is then written to this
-        CSV file without including the DataFrame index. If an error occurs during
-        the save operation, an error message is printed.
-
-        Raises:
-            Prints an error message if saving the metadata file fails.
+        Appends the classifier metadata entries added in this session to the metadata file
+        specified in the configuration (key 'classifier_metadata_file').
         """
-        metadata_file = self.config.get('classifier_metadata_file', './classifier_metadata.csv')
-        try:
-            self.classifier_metadata.to_csv(metadata_file, index=False)
-            print(f"Classifier metadata saved to {metadata_file}.")
-        except Exception as e:
-            print(f"Error saving metadata file: {e}")
+        self.classifier_metadata.flush()
 
     def _add_classifier_metadata(self, txn_type, category, sub_category):
         """
         Adds a new classifier metadata entry if it does not already exist.
 
-        Checks if a combination of txn_type, category, and sub_category is already present
-        in the classifier_metadata DataFrame. If not, appends the new entry and saves the updated metadata.
+        New entries are written to the metadata file by _save_classifier_metadata, once per session.
 
         Args:
             txn_type (str): The transaction type to add.
@@ -87,28 +59,16 @@ class Classifier:
         Returns:
             None
         """
-        new_entry = pd.DataFrame({
-            'txn_type': [txn_type],
-            'category': [category],
-            'sub_category': [sub_category]
-        })
-        # Check if the entry already exists
-        if not self.classifier_metadata[(self.classifier_metadata['txn_type'] == txn_type) &
-                                        (self.classifier_metadata['category'] == category) &
-                                        (self.classifier_metadata['sub_category'] == sub_category)].empty:
-            #print("Entry already exists in classifier metadata.")
-            return
-        self.classifier_metadata = pd.concat([self.classifier_metadata, new_entry], ignore_index=True)
-        self._save_classifier_metadata()
+        self.classifier_metadata.add(txn_type, category, sub_category)
     
     def _get_distinct_sub_categories(self):
         """
-        Returns a list of unique sub-categories from the 'sub_category' column in the classifier metadata, excluding any missing values.
+        Returns a list of unique sub-categories from the classifier metadata, excluding any missing values.
 
         Returns:
             list: A list of unique sub-category values.
         """
-        return sorted(self.classifier_metadata['sub_category'].dropna().unique().tolist())
+        return self.classifier_metadata.sub_categories()
     
     def _get_distinct_categories_for_sub_category(self, sub_category):
         """
@@ -125,20 +85,20 @@ class Classifier:
         if sub_category is None:
             return self._get_distinct_categories()
         
-        if sub_category not in self.classifier_metadata['sub_category'].dropna().unique():
+        if not self.classifier_metadata.has_sub_category(sub_category):
             print(f"Sub-category '{sub_category}' not found in metadata.")
             return self._get_distinct_categories()
         
-        return self.classifier_metadata[self.classifier_metadata['sub_category'] == sub_category]['category'].dropna().unique().tolist()
+        return self.classifier_metadata.categories_for_sub_category(sub_category)
     
     def _get_distinct_categories(self):
         """
         Returns a list of unique, non-null category values from the classifier metadata.
 
         Returns:
-            list: A list containing the distinct category values present in the 'category' column of the classifier metadata.
+            list: A list containing the distinct category values present in the classifier metadata.
         """
-        return sorted(self.classifier_metadata['category'].dropna().unique().tolist())
+        return self.classifier_metadata.categories()
     
     def _get_txn_type(self, category):
         """
@@ -151,32 +111,48 @@ class Classifier:
             str or None: The first transaction type associated with the given category,
                  or None if no match is found.
         """
-        txn_types = self.classifier_metadata[self.classifier_metadata['category'] == category]['txn_type'].dropna().unique().tolist()
-        return txn_types[0] if txn_types else None
+        return self.classifier_metadata.txn_type_for_category(category)
     
     def _get_distinct_txn_types(self):
         """
         Returns a list of unique, non-null transaction types from the classifier metadata.
 
         Returns:
-            list: A list containing the distinct transaction types present in the 'txn_type' column
-                  of the classifier metadata, with any missing values excluded.
+            list: A list containing the distinct transaction types present in the classifier metadata,
+                  with any missing values excluded.
         """
-        return self.classifier_metadata['txn_type'].dropna().unique().tolist()
+        return self.classifier_metadata.txn_types()
 
-    def _vectorize_transactions(self, raw_data_list):
+    @timed("classifier.vectorize")
+    def _vectorize_transactions(self, raw_data_list, counts=None):
         """
         Transforms a list of raw transaction data into TF-IDF feature vectors.
 
         Args:
             raw_data_list (list of str): List containing raw transaction data as strings.
+            counts (numpy.ndarray): Number of transactions each string stands for, when raw_data_list
+                holds distinct strings. The document frequencies are weighted by these counts, so the
+                vectors equal those obtained by vectorizing every transaction.
 
         Returns:
             scipy.sparse.csr_matrix: TF-IDF feature matrix representing the input transactions.
         """
-        return self.vectorizer.fit_transform(raw_data_list)
-
-    def _cluster_transactions(self, tfidf_matrix):
+        if self.vectorizer is None:
+            from sklearn.feature_extraction.text import TfidfVectorizer
+            self.vectorizer = TfidfVectorizer()
+        tfidf_matrix = self.vectorizer.fit_transform(raw_data_list)
+        if counts is None:
+            return tfidf_matrix
+
+        import numpy as np
+        # Weighted document frequency of each term, then the smoothed idf as TfidfVectorizer computes it
+        rows = np.repeat(np.arange(tfidf_matrix.shape[0]), np.diff(tfidf_matrix.indptr))
+        document_frequency = np.bincount(tfidf_matrix.indices, weights=counts[rows], minlength=tfidf_matrix.shape[1])
+        self.vectorizer.idf_ = np.log((1 + counts.sum()) / (1 + document_frequency)) + 1
+        return self.vectorizer.transform(raw_data_list)
+
+    @timed("classifier.cluster")
+    def _cluster_transactions(self, tfidf_matrix, sample_weight=None):
         """
         Clusters transactions based on their TF-IDF representations using the DBSCAN algorithm.
 
@@ -187,17 +163,47 @@ class Classifier:
 
         Args:
             tfidf_matrix (numpy.ndarray): A 2D array representing the TF-IDF features of transactions.
+            sample_weight (numpy.ndarray): Number of transactions each row stands for, when the rows
+                are distinct feature strings.
 
         Returns:
             numpy.ndarray: An array of cluster labels assigned to each transaction. Transactions
             labeled as -1 are considered noise (not assigned to any cluster).
         """
+        import numpy as np
+        from sklearn.metrics.pairwise import cosine_similarity
+        from sklearn.cluster import DBSCAN
+
         threshold = self.config.get('similarity_threshold', 0.7)
         distance_matrix = 1 - cosine_similarity(tfidf_matrix)
         # Ensure no negative values in the distance matrix
         distance_matrix = np.clip(distance_matrix, 0, None)
         clustering = DBSCAN(eps=1 - threshold, min_samples=2, metric='precomputed')
-        return clustering.fit_predict(distance_matrix)
+        return clustering.fit_predict(distance_matrix, sample_weight=sample_weight)
+
+    def _cluster_distinct(self, raw_data):
+        """
+        Clusters transactions by their distinct feature strings.
+
+        Identical strings are collapsed first, so vectorization and the (quadratic) distance
+        matrix cover the distinct strings only; each string is weighted by its number of
+        transactions and the cluster labels are mapped back to the transactions.
+
+        Args:
+            raw_data (pandas.Series): The feature string of each transaction.
+
+        Returns:
+            numpy.ndarray: The cluster label of each transaction (-1 for noise).
+        """
+        import numpy as np
+
+        codes, uniques = pd.factorize(raw_data, use_na_sentinel=False)
+        counts = np.bincount(codes)
+        count("classifier.transactions", len(raw_data))
+        count("classifier.distinct_strings", len(uniques))
+        print(f"Vectorizing {len(uniques)} distinct feature strings for {len(raw_data)} transactions...")
+        tfidf_matrix = self._vectorize_transactions(list(uniques), counts)
+        return self._cluster_transactions(tfidf_matrix, counts)[codes]
 
     def _prepare_raw_data(self, df):
         """
@@ -286,9 +292,8 @@ class Classifier:
         # Vectorize and cluster credit transactions
         print("Vectorizing credit transactions...")
         if not df_credit.empty:
-            tfidf_matrix_credit = self._vectorize_transactions(df_credit['raw_data'].tolist())
             print("Clustering credit transactions...")
-            clusters_credit = self._cluster_transactions(tfidf_matrix_credit)
+            clusters_credit = self._cluster_distinct(df_credit['raw_data'])
             df_credit['cluster'] = clusters_credit
             # Offset cluster ids to avoid overlap with debit clusters
             max_credit_cluster = clusters_credit.max() if len(clusters_credit) > 0 else -1
@@ -298,9 +303,8 @@ class Classifier:
         # Vectorize and cluster debit transactions
         print("Vectorizing debit transactions...")
         if not df_debit.empty:
-            tfidf_matrix_debit = self._vectorize_transactions(df_debit['raw_data'].tolist())
             print("Clustering debit transactions...")
-            clusters_debit = self._cluster_transactions(tfidf_matrix_debit)
+            clusters_debit = self._cluster_distinct(df_debit['raw_data'])
             # Offset debit cluster ids by max_credit_cluster + 1 (except for noise -1)
             offset = (max_credit_cluster + 1) if df_credit.shape[0] > 0 else 0
             clusters_debit_offset = [
@@ -313,163 +317,167 @@ class Classifier:
         # Merge credit and debit DataFrames
         df = pd.concat([df_credit, df_debit], ignore_index=True)
 
-        # Process each cluster
-        for cluster_id in set(df['cluster']):
-            if cluster_id == -1:
-                continue  # Skip noise points
+        try:
+            # Process each cluster
+            for cluster_id in set(df['cluster']):
+                if cluster_id == -1:
+                    continue  # Skip noise points
 
-            cluster_df = df[df['cluster'] == cluster_id]
+                cluster_df = df[df['cluster'] == cluster_id]
             
-            # check if the cluster has at least 1 transaction with no associated txn_type or category or sub_category
-            if cluster_df.empty:
-                print(f"Cluster {cluster_id} is empty. Skipping...")
-                continue
-
-            print(f"\nCluster {cluster_id}: {len(cluster_df)} transactions")
-
-            # Display sample transactions
-            print("\nFirst 10 transactions in this cluster:")
-            print(cluster_df[['txn_source', 'credit_indicator', 'txn_date', 'txn_amount', 'narration', 'txn_type', 'category', 'sub_category']].head(10).to_string(index=False))  # Show 10 samples
-
-            # Only proceed if at least one record is missing a classification (null or empty string)
-            if not (
-                cluster_df['txn_type'].isna().any() or (cluster_df['txn_type'] == '').any() or
-                cluster_df['category'].isna().any() or (cluster_df['category'] == '').any() or
-                cluster_df['sub_category'].isna().any() or (cluster_df['sub_category'] == '').any()
-            ):
-                print(f"Cluster {cluster_id} already has classifications. Skipping...")
-                continue
-
-            # Fetch unique existing classifications from the current cluster
-            existing_types = self._get_distinct_txn_types()
-            existing_categories = self._get_distinct_categories()
-            existing_sub_categories = self._get_distinct_sub_categories()
-
-            category = None
-            sub_category = None
-            txn_type = None
-
-            # Display list of sub-categories
-            while True:
-                if existing_sub_categories:
-                    print("\nExisting sub-categories:")
-                    # Print 10 sub-categories per row, separated by tabs
-                    for i in range(0, len(existing_sub_categories), 10):
-                        row = existing_sub_categories[i:i+10]
-                        print("\t".join([f"{i+j+1}. {sub_category}" for j, sub_category in enumerate(row)]))
-                    sub_category_input = input("Select a sub-category (or enter a new one): ")
-
-                    # Remove leading and trailing whitespace
-                    sub_category_input = sub_category_input.strip()
-
-                    if sub_category_input.isdigit():
-                        index = int(sub_category_input) - 1
-                        if 0 <= index < len(existing_sub_categories):
-                            sub_category = existing_sub_categories[index]
+                # check if the cluster has at least 1 transaction with no associated txn_type or category or sub_category
+                if cluster_df.empty:
+                    print(f"Cluster {cluster_id} is empty. Skipping...")
+                    continue
+
+                print(f"\nCluster {cluster_id}: {len(cluster_df)} transactions")
+
+                # Display sample transactions
+                print("\nFirst 10 transactions in this cluster:")
+                print(cluster_df[['txn_source', 'credit_indicator', 'txn_date', 'txn_amount', 'narration', 'txn_type', 'category', 'sub_category']].head(10).to_string(index=False))  # Show 10 samples
+
+                # Only proceed if at least one record is missing a classification (null or empty string)
+                if not (
+                    cluster_df['txn_type'].isna().any() or (cluster_df['txn_type'] == '').any() or
+                    cluster_df['category'].isna().any() or (cluster_df['category'] == '').any() or
+                    cluster_df['sub_category'].isna().any() or (cluster_df['sub_category'] == '').any()
+                ):
+                    print(f"Cluster {cluster_id} already has classifications. Skipping...")
+                    continue
+
+                # Fetch unique existing classifications from the current cluster
+                existing_types = self._get_distinct_txn_types()
+                existing_categories = self._get_distinct_categories()
+                existing_sub_categories = self._get_distinct_sub_categories()
+
+                category = None
+                sub_category = None
+                txn_type = None
+
+                # Display list of sub-categories
+                while True:
+                    if existing_sub_categories:
+                        print("\nExisting sub-categories:")
+                        # Print 10 sub-categories per row, separated by tabs
+                        for i in range(0, len(existing_sub_categories), 10):
+                            row = existing_sub_categories[i:i+10]
+                            print("\t".join([f"{i+j+1}. {sub_category}" for j, sub_category in enumerate(row)]))
+                        sub_category_input = input("Select a sub-category (or enter a new one): ")
+
+                        # Remove leading and trailing whitespace
+                        sub_category_input = sub_category_input.strip()
+
+                        if sub_category_input.isdigit():
+                            index = int(sub_category_input) - 1
+                            if 0 <= index < len(existing_sub_categories):
+                                sub_category = existing_sub_categories[index]
+                                break
+                            else:
+                                print("Invalid sub-category selection. Please enter a valid index or a new sub-category name.")
+                                continue
+                        elif sub_category_input:
+                            sub_category = sub_category_input
                             break
                         else:
-                            print("Invalid sub-category selection. Please enter a valid index or a new sub-category name.")
+                            print("Please enter a sub-category.")
                             continue
-                    elif sub_category_input:
-                        sub_category = sub_category_input
-                        break
-                    else:
-                        print("Please enter a sub-category.")
-                        continue
-                else:
-                    sub_category_input = input("Enter a new sub-category: ").strip()
-                    if sub_category_input:
-                        sub_category = sub_category_input
-                        break
                     else:
-                        print("Please enter a sub-category.")
-                        continue
+                        sub_category_input = input("Enter a new sub-category: ").strip()
+                        if sub_category_input:
+                            sub_category = sub_category_input
+                            break
+                        else:
+                            print("Please enter a sub-category.")
+                            continue
             
-            # Fetch existing classifications based on the selected sub-category
-            available_categories = self._get_distinct_categories_for_sub_category(sub_category)
+                # Fetch existing classifications based on the selected sub-category
+                available_categories = self._get_distinct_categories_for_sub_category(sub_category)
             
-            # Display list of categories
-            while True:
-                if available_categories:
-                    # Append all existing categories to available_categories if not already present
-                    for cat in existing_categories:
-                        if cat not in available_categories:
-                            available_categories.append(cat)
-                    print("\nExisting categories:")
-                    # Print 10 categories per row, separated by tabs
-                    for i in range(0, len(available_categories), 10):
-                        row = available_categories[i:i+10]
-                        print("\t".join([f"{i+j+1}. {category}" for j, category in enumerate(row)]))
-                    category_input = input("Select a category (or enter a new one): ").strip()
-                    if category_input.isdigit():
-                        index = int(category_input) - 1
-                        if 0 <= index < len(available_categories):
-                            category = available_categories[index]
+                # Display list of categories
+                while True:
+                    if available_categories:
+                        # Append all existing categories to available_categories if not already present
+                        for cat in existing_categories:
+                            if cat not in available_categories:
+                                available_categories.append(cat)
+                        print("\nExisting categories:")
+                        # Print 10 categories per row, separated by tabs
+                        for i in range(0, len(available_categories), 10):
+                            row = available_categories[i:i+10]
+                            print("\t".join([f"{i+j+1}. {category}" for j, category in enumerate(row)]))
+                        category_input = input("Select a category (or enter a new one): ").strip()
+                        if category_input.isdigit():
+                            index = int(category_input) - 1
+                            if 0 <= index < len(available_categories):
+                                category = available_categories[index]
+                                break
+                            else:
+                                print("Invalid category selection. Please enter a valid index or a new category name.")
+                                continue
+                        elif category_input:
+                            category = category_input
                             break
                         else:
-                            print("Invalid category selection. Please enter a valid index or a new category name.")
+                            print("Please enter a category.")
                             continue
-                    elif category_input:
-                        category = category_input
-                        break
                     else:
-                        print("Please enter a category.")
-                        continue
-                else:
-                    print("\nExisting categories:")
-                    # Print 10 categories per row, separated by tabs
-                    for i in range(0, len(existing_categories), 10):
-                        row = existing_categories[i:i+10]
-                        print("\t".join([f"{i+j+1}. {category}" for j, category in enumerate(row)]))
-                    category_input = input("Select a category (or enter a new one): ").strip()
-                    if category_input.isdigit():
-                        index = int(category_input) - 1
-                        if 0 <= index < len(existing_categories):
-                            category = existing_categories[index]
+                        print("\nExisting categories:")
+                        # Print 10 categories per row, separated by tabs
+                        for i in range(0, len(existing_categories), 10):
+                            row = existing_categories[i:i+10]
+                            print("\t".join([f"{i+j+1}. {category}" for j, category in enumerate(row)]))
+                        category_input = input("Select a category (or enter a new one): ").strip()
+                        if category_input.isdigit():
+                            index = int(category_input) - 1
+                            if 0 <= index < len(existing_categories):
+                                category = existing_categories[index]
+                                break
+                            else:
+                                print("Invalid category selection. Please enter a valid index or a new category name.")
+                                continue
+                        elif category_input:
+                            category = category_input
                             break
                         else:
-                            print("Invalid category selection. Please enter a valid index or a new category name.")
+                            print("Please enter a category.")
                             continue
-                    elif category_input:
-                        category = category_input
-                        break
-                    else:
-                        print("Please enter a category.")
-                        continue
             
-            # Display list of transaction types
-            while True:
-                if category:
-                    txn_type_default = self._get_txn_type(category)
-                    if txn_type_default:
-                        print(f"\nExisting transaction type: {txn_type_default}")
-                    print(", ".join([f"{i}. {t}" for i, t in enumerate(existing_types, 1)]))
-                    txn_type_input = input(f"Press enter for {txn_type_default} (or select a transaction type): ").strip()
-                    if txn_type_input == '':
-                        txn_type = txn_type_default
-                        break
-                    elif txn_type_input.isdigit():
-                        index = int(txn_type_input) - 1
-                        if 0 <= index < len(existing_types):
-                            txn_type = existing_types[index]
+                # Display list of transaction types
+                while True:
+                    if category:
+                        txn_type_default = self._get_txn_type(category)
+                        if txn_type_default:
+                            print(f"\nExisting transaction type: {txn_type_default}")
+                        print(", ".join([f"{i}. {t}" for i, t in enumerate(existing_types, 1)]))
+                        txn_type_input = input(f"Press enter for {txn_type_default} (or select a transaction type): ").strip()
+                        if txn_type_input == '':
+                            txn_type = txn_type_default
                             break
+                        elif txn_type_input.isdigit():
+                            index = int(txn_type_input) - 1
+                            if 0 <= index < len(existing_types):
+                                txn_type = existing_types[index]
+                                break
+                            else:
+                                print("Invalid transaction type selection. Please enter a valid index or a new transaction type.")
+                                continue
                         else:
-                            print("Invalid transaction type selection. Please enter a valid index or a new transaction type.")
+                            print("New transaction type cannot be entered. Please select a valid transaction type.")
                             continue
                     else:
-                        print("New transaction type cannot be entered. Please select a valid transaction type.")
-                        continue
-                else:
-                    print("No category selected. Please select a category first.")
-                    break
+                        print("No category selected. Please select a category first.")
+                        break
 
-            self._add_classifier_metadata(txn_type, category, sub_category)
+                self._add_classifier_metadata(txn_type, category, sub_category)
 
-            # Update classifications
-            if txn_type and category and sub_category:
-                print(f"Updating classifications with type: {txn_type}, category: {category}, sub-category: {sub_category}...")
-                self.txn_store.update_transactions(cluster_df['raw_data_orig'].tolist(), txn_type, category, sub_category)
-                print("Classifications updated successfully.")
+                # Update classifications
+                if txn_type and category and sub_category:
+                    print(f"Updating classifications with type: {txn_type}, category: {category}, sub-category: {sub_category}...")
+                    self.txn_store.update_transactions(cluster_df['raw_data_orig'].tolist(), txn_type, category, sub_category)
+                    print("Classifications updated successfully.")
+        finally:
+            # New metadata entries are written once per session
+            self._save_classifier_metadata()
 
     def import_classification(self, csv_file):
         """
@@ -491,29 +499,33 @@ class Classifier:
         category_idx = int(input("Category column index: "))
         sub_category_idx = int(input("Sub-category column index: "))
 
-        with open(csv_file, newline='', encoding='utf-8') as f:
-            reader = csv.reader(f)
-            total_counter = 0
-            total_errors = 0
+        try:
+            with open(csv_file, newline='', encoding='utf-8') as f:
+                reader = csv.reader(f)
+                total_counter = 0
+                total_errors = 0
             
-            for row in reader:
-                total_counter += 1
-                date_str = row[date_idx]
-                txn_date = parse_date_util(date_str)
-                if txn_date is None:
-                    print(f"Invalid date format in row: {row}. Skipping this transaction.")
-                    continue
-                narration = row[narration_idx]
-                amnt = float(row[amnt_idx])
-                credit_indicator = 'Yes' if row[credit_ind_idx].strip().lower() == 'cr' else ''
-                txn_type = row[type_idx]
-                category = row[category_idx]
-                sub_category = row[sub_category_idx]
-                result = self.apply_classification(txn_date, narration, amnt, credit_indicator, txn_type, category, sub_category)
-                if result <= 0:
-                    total_errors += 1
+                for row in reader:
+                    total_counter += 1
+                    date_str = row[date_idx]
+                    txn_date = parse_date_util(date_str)
+                    if txn_date is None:
+                        print(f"Invalid date format in row: {row}. Skipping this transaction.")
+                        continue
+                    narration = row[narration_idx]
+                    amnt = float(row[amnt_idx])
+                    credit_indicator = 'Yes' if row[credit_ind_idx].strip().lower() == 'cr' else ''
+                    txn_type = row[type_idx]
+                    category = row[category_idx]
+                    sub_category = row[sub_category_idx]
+                    result = self.apply_classification(txn_date, narration, amnt, credit_indicator, txn_type, category, sub_category)
+                    if result <= 0:
+                        total_errors += 1
             
-            print(f"Processed {total_counter} transactions with {total_errors} errors.")
+                print(f"Processed {total_counter} transactions with {total_errors} errors.")
+        finally:
+            # Metadata of the transactions updated so far is saved even if a row fails
+            self._save_classifier_metadata()
 
     def apply_classification(self, txn_date, narration, amnt, credit_indicator, txn_type, category, sub_category):
         """
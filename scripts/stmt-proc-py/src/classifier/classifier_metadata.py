@@ -0,0 +1,135 @@
+import csv
+import os
+import pandas as pd
+
+"""
+classifier_metadata.py
+In-memory, indexed view of the known (txn_type, category, sub_category) classifications stored in
+classifier_metadata.csv.
+"""
+
+class ClassifierMetadata:
+    """
+    The known classification triples, with set and dict indexes for O(1) membership and lookups.
+
+    New triples are kept in memory and appended to the metadata file by flush(), so a session
+    that adds many triples (e.g. an import) writes the file once.
+    """
+
+    COLUMNS = ['txn_type', 'category', 'sub_category']
+    DELIMITER = '|'
+
+    def __init__(self, metadata_file, entries=()):
+        """
+        Args:
+            metadata_file (str): Path to the '|' delimited metadata file.
+            entries (iterable): (txn_type, category, sub_category) triples already stored in the file.
+        """
+        self.metadata_file = metadata_file
+        self._entries = set()
+        self._pending = []
+        # Insertion-ordered indexes (dicts used as ordered sets)
+        self._txn_types = {}
+        self._categories = {}
+        self._sub_categories = {}
+        self._categories_by_sub_category = {}
+        self._txn_type_by_category = {}
+        for entry in entries:
+            self._index(entry)
+
+    @classmethod
+    def load(cls, metadata_file):
+        """
+        Load the metadata file. The file must contain the txn_type, category and sub_category columns.
+        If the file is missing or invalid, the metadata starts empty.
+        """
+        try:
+            df = pd.read_csv(metadata_file, delimiter=cls.DELIMITER)
+            print(f"Columns in metadata file: {df.columns.tolist()}")
+            if not all(col in df.columns for col in cls.COLUMNS):
+                raise ValueError("Metadata file must contain txn_type, category, and sub_category columns.")
+            entries = df[cls.COLUMNS].astype(object).where(df[cls.COLUMNS].notna(), None).itertuples(index=False, name=None)
+            return cls(metadata_file, entries)
+        except FileNotFoundError:
+            print(f"Metadata file {metadata_file} not found. Please check the path.")
+        except Exception as e:
+            print(f"Error loading metadata file: {e}")
+        return cls(metadata_file)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def __contains__(self, entry):
+        return tuple(entry) in self._entries
+
+    def _index(self, entry):
+        """Add a triple to the indexes; return False if it was already known."""
+        entry = tuple(entry)
+        if entry in self._entries:
+            return False
+        self._entries.add(entry)
+        txn_type, category, sub_category = entry
+        if txn_type is not None:
+            self._txn_types.setdefault(txn_type)
+        if category is not None:
+            self._categories.setdefault(category)
+            if txn_type is not None:
+                self._txn_type_by_category.setdefault(category, txn_type)
+        if sub_category is not None:
+            self._sub_categories.setdefault(sub_category)
+            if category is not None:
+                self._categories_by_sub_category.setdefault(sub_category, {}).setdefault(category)
+        return True
+
+    def add(self, txn_type, category, sub_category):
+        """
+        Add a triple if it is not known yet; it is written to the metadata file by the next flush().
+        Returns:
+            bool: True if the triple was added.
+        """
+        if not self._index((txn_type, category, sub_category)):
+            return False
+        self._pending.append((txn_type, category, sub_category))
+        return True
+
+    def flush(self):
+        """Append the triples added since the last flush to the metadata file."""
+        if not self._pending:
+            return
+        try:
+            write_header = not os.path.exists(self.metadata_file) or os.path.getsize(self.metadata_file) == 0
+            with open(self.metadata_file, 'a', newline='') as file:
+                writer = csv.writer(file, delimiter=self.DELIMITER)
+                if write_header:
+                    writer.writerow(self.COLUMNS)
+                writer.writerows(self._pending)
+            print(f"Classifier metadata saved to {self.metadata_file} ({len(self._pending)} new entries).")
+            self._pending = []
+        except Exception as e:
+            print(f"Error saving metadata file: {e}")
+
+    def txn_types(self):
+        """Return the distinct transaction types, in order of first appearance."""
+        return list(self._txn_types)
+
+    def categories(self):
+        """Return the distinct categories, sorted."""
+        return sorted(self._categories)
+
+    def sub_categories(self):
+        """Return the distinct sub-categories, sorted."""
+        return sorted(self._sub_categories)
+
+    def has_sub_category(self, sub_category):
+        return sub_category in self._categories_by_sub_category or sub_category in self._sub_categories
+
+    def categories_for_sub_category(self, sub_category):
+        """Return the categories of a sub-category, in order of first appearance."""
+        return list(self._categories_by_sub_category.get(sub_category, ()))
+
+    def txn_type_for_category(self, category):
+        """Return the first transaction type of a category, or None."""
+        return self._txn_type_by_category.get(category)
@@ -0,0 +1,155 @@
+import re
+import warnings
+import pandas as pd
+
+"""
+rules.py
+Deterministic narration rules (salary credits, SIP debits, ATM withdrawals, ...) applied before the
+ML classifier, which then only sees the transactions no rule matched.
+"""
+
+class ClassificationRules:
+    """
+    Exact, prefix and regex narration rules mapped to 'txn_type|category|sub_category'.
+
+    Matching ignores case and surrounding whitespace. Exact rules are looked up in a dict; prefix
+    and regex rules are compiled into one combined regex with a named group per rule, so each
+    narration is matched with a single regex call and the rule is read from Match.lastgroup.
+    Exact rules take precedence; among the others, the first rule in file order wins.
+    Prefix rules match at the start of the narration, regex rules anywhere in it.
+    """
+
+    MATCH_TYPES = ("exact", "prefix", "regex")
+    COLUMNS = ["match_type", "pattern", "txn_type", "category", "sub_category"]
+
+    def __init__(self, rules=()):
+        """
+        Args:
+            rules (iterable): (match_type, pattern, txn_type, category, sub_category) tuples.
+        Raises:
+            ValueError: If a rule has an unknown match type, an invalid regex, or a regex that cannot be
+                combined with the others (global flags such as '(?i)', numbered backreferences such as '\\1').
+        """
+        self.exact = {}
+        self.classifications = []
+        alternatives = []
+        for match_type, pattern, txn_type, category, sub_category in rules:
+            classification = f"{txn_type}|{category}|{sub_category}"
+            if match_type == "exact":
+                self.exact.setdefault(self._normalize(pattern), classification)
+            elif match_type in ("prefix", "regex"):
+                if match_type == "prefix":
+                    expression = re.escape(self._normalize(pattern))
+                else:
+                    self._check_regex(pattern)
+                    expression = f".*?(?:{pattern})"
+                alternatives.append(f"(?P<rule_{len(self.classifications)}>{expression})")
+                self.classifications.append(classification)
+            else:
+                raise ValueError(f"Unsupported rule match type: {match_type}. Supported match types: {', '.join(self.MATCH_TYPES)}")
+        try:
+            self.pattern = re.compile("|".join(alternatives), re.IGNORECASE | re.DOTALL) if alternatives else None
+        except re.error as e:
+            # e.g. two rules defining the same group name
+            raise ValueError(f"Regex rules cannot be combined: {e}")
+
+    @staticmethod
+    def _check_regex(pattern):
+        """
+        Validate a regex rule, including the constructs that break once it is embedded in the combined regex.
+        Raises:
+            ValueError: If the regex is invalid, sets a global flag or uses a numbered backreference.
+        """
+        try:
+            re.compile(pattern)
+        except re.error as e:
+            raise ValueError(f"Invalid regex rule '{pattern}': {e}")
+        # Global flags are only allowed at the start of the combined regex (a warning before Python 3.11)
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("error", DeprecationWarning)
+                re.compile(f"(?:{pattern})")
+        except (re.error, DeprecationWarning):
+            raise ValueError(f"Invalid regex rule '{pattern}': global flags such as '(?i)' are not supported, "
+                             f"rules already ignore case; use a scoped flag such as '(?s:...)' instead")
+        if ClassificationRules._has_numbered_group_reference(pattern):
+            raise ValueError(f"Invalid regex rule '{pattern}': numbered backreferences are not supported, "
+                             f"since group numbers change in the combined regex; use a named group and '(?P=name)' instead")
+
+    @staticmethod
+    def _has_numbered_group_reference(pattern):
+        """Whether a regex refers to a group by number, with a backreference such as '\\1' or a '(?(1)...)' conditional."""
+        in_class = False
+        i = 0
+        while i < len(pattern):
+            char = pattern[i]
+            if char == "\\":
+                escaped = pattern[i + 1:i + 4]
+                # '\1'..'\99' are backreferences; '\0' and three octal digits are octal escapes
+                is_octal = escaped[:1] == "0" or (len(escaped) == 3 and all(c in "01234567" for c in escaped))
+                if not in_class and escaped[:1].isdigit() and not is_octal:
+                    return True
+                i += 2
+                continue
+            if in_class:
+                if char == "]":
+                    in_class = False
+            elif char == "[":
+                in_class = True
+                # A ']' right after '[' or '[^' is a literal
+                i += 2 if pattern[i + 1:i + 2] == "^" else 1
+                if pattern[i:i + 1] == "]":
+                    i += 1
+                continue
+            elif pattern.startswith("(?(", i) and pattern[i + 3:i + 4].isdigit():
+                return True
+            i += 1
+        return False
+
+    @classmethod
+    def load(cls, rules_file):
+        """
+        Load rules from a '|' delimited CSV file with the columns in COLUMNS.
+        Patterns containing '|' must be quoted. A missing file gives no rules.
+        """
+        try:
+            df = pd.read_csv(rules_file, delimiter='|', dtype=str, keep_default_na=False)
+        except FileNotFoundError:
+            print(f"Rules file {rules_file} not found. No classification rules loaded.")
+            return cls()
+        if not all(col in df.columns for col in cls.COLUMNS):
+            raise ValueError(f"Rules file must contain {', '.join(cls.COLUMNS)} columns.")
+        rules = cls(df[cls.COLUMNS].itertuples(index=False, name=None))
+        print(f"Loaded {len(rules)} classification rules from {rules_file}.")
+        return rules
+
+    def __len__(self):
+        return len(self.exact) + len(self.classifications)
+
+    @staticmethod
+    def _normalize(narration):
+        return narration.strip().upper()
+
+    def _classify_one(self, narration):
+        if not isinstance(narration, str):
+            return None
+        narration = self._normalize(narration)
+        classification = self.exact.get(narration)
+        if classification is None and self.pattern is not None:
+            match = self.pattern.match(narration)
+            if match:
+                classification = self.classifications[int(match.lastgroup[len("rule_"):])]
+        return classification
+
+    def classify(self, narrations):
+        """
+        Classify narrations with the rules, matching each distinct narration once.
+
+        Args:
+            narrations (pandas.Series): The narrations.
+        Returns:
+            pandas.Series: 'txn_type|category|sub_category' of the matching rule, or None, with the index of narrations.
+        """
+        codes, uniques = pd.factorize(narrations, use_na_sentinel=False)
+        classifications = pd.Series([self._classify_one(narration) for narration in uniques], dtype=object)
+        return pd.Series(classifications.to_numpy()[codes] if len(codes) else [], index=narrations.index, dtype=object)
@@ -2,38 +2,97 @@
 
 import sys
 import os
+import time
 from processors.statement_processor_provider import StatementProcessorProvider
-from store.txn_store import TxnStore
-from classifier.classifier import Classifier
-from classifier.auto_classifier import AutoClassifier
-
-def detect_statement_type(file_name):
-    """Detect statement type based on file name."""
-    if file_name.startswith("SA"):
-        return "hdfc-sa"
-    elif file_name.startswith("CC"):
-        return "hdfc-cc"
-    else:
-        raise ValueError("Unable to detect statement type from file name. Ensure the file name starts with 'SA' or 'CC'.")
+from store.txn_store import KeyMode, TxnStore
+from utils.helpers import file_content_hash
+from utils import instrumentation
+from utils.instrumentation import count, stage
+
+# Classifier modules pull in scikit-learn, numpy and prompt_toolkit; they are imported
+# inside the operations that use them so that 'process' only pays for pandas.
+
+def process_file(file_path, txn_store: TxnStore, statement_type="auto", force=False):
+    """
+    Process a single statement file.
+
+    Files whose content hash is already in the processed_files ledger are skipped
+    before the workbook is read, unless force is set.
 
-def process_file(file_path, txn_store: TxnStore):
-    """Process a single statement file."""
+    Args:
+        file_path (str): Path to the statement file.
+        txn_store (TxnStore): The transaction store.
+        statement_type (str): A registered statement type, or 'auto' to detect it from the content.
+        force (bool): Reprocess the file even if it was processed before.
+    """
     try:
         file_name = os.path.basename(file_path)
-        statement_type = detect_statement_type(file_name)
-        print(f"Detected statement type: {statement_type} for file: {file_name}")
+        file_hash = file_content_hash(file_path)
+        processed = txn_store.get_processed_file(file_hash)
+        if processed is not None and not force:
+            print(f"Skipping unchanged file {file_name}: processed as {processed['statement_type']} "
+                  f"({processed['row_count']} rows) at {processed['processed_at']}")
+            count("files.skipped")
+            return
+
+        start = time.perf_counter()
+        if statement_type == "auto":
+            with stage("parse.detect"):
+                processor, frame = StatementProcessorProvider.detect_processor(file_path, txn_store)
+            statement_type = processor.statement_type()
+            print(f"Detected statement type: {statement_type} for file: {file_name}")
+        else:
+            processor, frame = StatementProcessorProvider.get_processor(statement_type, txn_store), None
 
-        # Get the appropriate processor instance
-        processor = StatementProcessorProvider.get_processor(statement_type, txn_store)
-        processor.parse_statement(file_path)
-        print(f"Processed {statement_type} statement: {file_name}")
+        # Hand over the rows read for detection so they are not read again
+        with stage(f"parse.{statement_type}") as s:
+            row_count = processor.parse_statement(file_path, frame)
+            s.rows = row_count
+        parse_seconds = time.perf_counter() - start
+        count("files.processed")
+        txn_store.record_processed_file(file_hash, file_name, statement_type, row_count, parse_seconds)
+        print(f"Processed {statement_type} statement: {file_name} ({row_count} rows in {parse_seconds:.2f}s)")
     except ValueError as e:
         print(f"Skipping file {file_path}: {e}")
     except Exception as e:
         print(f"Error processing file {file_path}: {e}")
 
+def _pop_flag(name):
+    """Remove a flag from the command line arguments and return whether it was present."""
+    if name in sys.argv:
+        sys.argv.remove(name)
+        return True
+    return False
+
+def _pop_option(name, default=None):
+    """Remove an option and its value from the command line arguments and return the value."""
+    if name in sys.argv:
+        index = sys.argv.index(name)
+        if index + 1 >= len(sys.argv):
+            print(f"Error: {name} requires a value.")
+            sys.exit(1)
+        value = sys.argv[index + 1]
+        del sys.argv[index:index + 2]
+        return value
+    return default
+
+def _parse_min_confidence(value):
+    """Parse the --min-confidence value, a number between 0 and 1; print the usage and exit if it is not."""
+    try:
+        min_confidence = float(value)
+    except ValueError:
+        min_confidence = None
+    # NaN fails the range check
+    if min_confidence is None or not 0 <= min_confidence <= 1:
+        print(f"Error: --min-confidence must be a number between 0 and 1, got '{value}'.")
+        print("Usage: python main.py auto-accept [--min-confidence <0..1>]")
+        sys.exit(1)
+    return min_confidence
+
 def classify(txn_store: TxnStore):
     """Classify transactions using the Classifier module."""
+    from classifier.classifier import Classifier
+
     print("Initializing classifier...")
     classifier = Classifier(txn_store)
 
@@ -43,6 +102,8 @@ def classify(txn_store: TxnStore):
 
 def import_classification(txn_store: TxnStore, csv_file: str):
     """Import classification from a CSV file."""
+    from classifier.classifier import Classifier
+
     print("Importing classification...")
     classifier = Classifier(txn_store)
 
@@ -71,11 +132,26 @@ def auto_classify(txn_store: TxnStore):
     It does not return any value.
     """
 
+    from classifier.auto_classifier import AutoClassifier
+
     print("Auto-classifying transactions...")
     auto_classifier = AutoClassifier(txn_store)    
     auto_classifier.apply_classification()
     print("Auto-classification completed successfully.")
 
+def auto_accept(txn_store: TxnStore, min_confidence: float):
+    """
+    Classify all unlabelled transactions without user interaction.
+    Predictions with a confidence of at least min_confidence are accepted; the others are left for
+    review in a CSV file that can be edited and imported with 'classify-csv-import'.
+    """
+    from classifier.auto_classifier import AutoClassifier
+
+    print(f"Auto-accepting classifications with a confidence of at least {min_confidence}...")
+    auto_classifier = AutoClassifier(txn_store)
+    auto_classifier.auto_accept(min_confidence, '../export/auto-classification-review.csv')
+    print("Auto-accept completed successfully.")
+
 def auto_classify_csv_export(txn_store: TxnStore):
     """
     Export auto-classified transactions to a CSV file.
@@ -88,6 +164,8 @@ def auto_classify_csv_export(txn_store: TxnStore):
     It does not return any value.
     """
     
+    from classifier.auto_classifier import AutoClassifier
+
     print("Exporting auto-classified transactions to CSV...")
     auto_classifier = AutoClassifier(txn_store)
     auto_classifier.export_classification_to_csv('../export/auto-classification-transactions.csv')
@@ -105,19 +183,35 @@ def auto_classify_csv_import(txn_store: TxnStore):
     It does not return any value.
     """
     
+    from classifier.auto_classifier import AutoClassifier
+
     print("Importing updated auto-classified transactions from CSV...")
     auto_classifier = AutoClassifier(txn_store)
     auto_classifier.import_classification_from_csv('../import/auto-classification-transactions.csv')
     print("Updated auto-classified transactions imported successfully.")
 
-def main():
+def run_operation():
+    """Run the operation given on the command line."""
+    force = _pop_flag("--force")
+    compress_raw_data = _pop_flag("--compress-raw-data")
+    intern_narrations = _pop_flag("--intern-narrations")
+    min_confidence = _pop_option("--min-confidence")
+    if min_confidence is not None:
+        min_confidence = _parse_min_confidence(min_confidence)
+
     # Check command line arguments for operation type
     if len(sys.argv) < 2:
         print("Usage: python main.py <operation> [additional arguments]")
         print("operation: 'process' or 'classify'")
-        print("For 'process': python main.py process <statement_type> <path_to_statement_file_or_folder>")
-        print("             : statement_type possible values are 'hdfc-sa', 'hdfc-cc', 'auto' or 'folder'")
+        print("For 'process': python main.py process <statement_type> <path_to_statement_file_or_folder> [--force]")
+        print(f"             : statement_type possible values are {', '.join(repr(t) for t in StatementProcessorProvider.statement_types())}, 'auto' or 'folder'")
+        print("             : --force reprocesses files already recorded as processed")
         print("For 'classify': python main.py classify")
+        print("For 'auto-accept': python main.py auto-accept [--min-confidence <0..1>]")
+        print("For 'migrate-store': python main.py migrate-store <key_mode> [--compress-raw-data] [--intern-narrations]")
+        print(f"             : key_mode possible values are {', '.join(repr(m) for m in KeyMode.ALL)}")
+        print("Any operation: [--report <run_report.json>] writes stage timings, row counts and peak memory as JSON")
+        print("             : [--profile <run.prof>] writes cProfile statistics of the run")
         sys.exit(1)
 
     operation = sys.argv[1]
@@ -128,7 +222,7 @@ def main():
 
     if operation == "process":
         if len(sys.argv) < 4:
-            print("Usage: python main.py process <statement_type> <path_to_statement_file_or_folder>")
+            print("Usage: python main.py process <statement_type> <path_to_statement_file_or_folder> [--force]")
             sys.exit(1)
 
         statement_type = sys.argv[2]
@@ -143,25 +237,10 @@ def main():
             for file_name in os.listdir(input_path):
                 file_path = os.path.join(input_path, file_name)
                 if os.path.isfile(file_path):
-                    process_file(file_path, txn_store)
+                    process_file(file_path, txn_store, force=force)
         else:
-            # Process a single file
-            if statement_type == "auto":
-                try:
-                    file_name = os.path.basename(input_path)
-                    statement_type = detect_statement_type(file_name)
-                    print(f"Detected statement type: {statement_type}")
-                except ValueError as e:
-                    print(f"Error: {e}")
-                    sys.exit(1)
-
-            try:
-                # Get the appropriate processor instance
-                processor = StatementProcessorProvider.get_processor(statement_type, txn_store)
-                processor.parse_statement(input_path)
-                print(f"{statement_type} statement processed successfully.")
-            except Exception as e:
-                print(f"Error processing statement: {e}")
+            # Process a single file, detecting its type from the content for 'auto'
+            process_file(input_path, txn_store, statement_type, force=force)
 
     elif operation == "classify":
         classify(txn_store)
@@ -178,6 +257,10 @@ def main():
         print("Auto-classifying transactions...")
         auto_classify(txn_store)
 
+    elif operation == "auto-accept":
+        from classifier.auto_classifier import DEFAULT_MIN_CONFIDENCE
+        auto_accept(txn_store, min_confidence if min_confidence is not None else DEFAULT_MIN_CONFIDENCE)
+
     elif operation == "classify-csv-export":
         print("Exporting auto-classification transactions and in csv file...")
         auto_classify_csv_export(txn_store)
@@ -186,10 +269,39 @@ def main():
         print("Importing updated auto-classification transactions csv file...")
         auto_classify_csv_import(txn_store)
 
+    elif operation == "migrate-store":
+        if len(sys.argv) < 3:
+            print("Usage: python main.py migrate-store <key_mode> [--compress-raw-data] [--intern-narrations]")
+            sys.exit(1)
+
+        txn_store.migrate(sys.argv[2], compress_raw_data, intern_narrations)
+
     else:
         print(f"Unknown operation: {operation}")
         print("Valid operations are 'process' and 'classify'.")
         sys.exit(1)
 
+def main():
+    report_file = _pop_option("--report")
+    profile_file = _pop_option("--profile")
+
+    profiler = None
+    if profile_file is not None:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        run_operation()
+    finally:
+        instrumentation.snapshot("end")
+        if profiler is not None:
+            import pstats
+            profiler.disable()
+            profiler.dump_stats(profile_file)
+            print(f"Profile written to {profile_file}; top functions by cumulative time:")
+            pstats.Stats(profiler).sort_stats("cumulative").print_stats(20)
+        if report_file is not None:
+            instrumentation.write_report(report_file)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
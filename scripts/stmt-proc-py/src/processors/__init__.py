@@ -1,3 +1,5 @@
 from .statement_processor_provider import StatementProcessorProvider
+# Importing the processor modules registers them with the provider
 from .hdfc_bank_acct_processor import HdfcBankAcctStatementProcessor
-from .hdfc_credit_card_processor import HdfcCreditCardStatementProcessor
\ No newline at end of file
+from .hdfc_credit_card_processor import HdfcCreditCardStatementProcessor
+from .hdfc_bank_acct_csv_processor import HdfcBankAcctCsvStatementProcessor
@@ -0,0 +1,66 @@
+"""
+delimited_reader.py
+Streaming reading of delimited (CSV) statements: a small probe read to locate the header row,
+then the transaction rows in bounded chunks, so memory does not grow with the statement size.
+"""
+import csv
+import os
+from itertools import islice
+import pandas as pd
+from .excel_reader import PROBE_ROWS
+
+# Extensions of the statements read as delimited text instead of workbooks
+DELIMITED_EXTENSIONS = (".csv", ".txt")
+
+# Number of transaction rows read per chunk
+CHUNK_SIZE = 10000
+
+
+def is_delimited(file_path):
+    """Return True if the statement file is read as delimited text."""
+    return os.path.splitext(file_path)[1].lower() in DELIMITED_EXTENSIONS
+
+
+def read_probe(file_path, nrows=PROBE_ROWS):
+    """Read the first nrows rows without header, with the padding around each cell stripped."""
+    with open(file_path, newline="") as f:
+        rows = [[cell.strip() for cell in row] for row in islice(csv.reader(f), nrows)]
+    return pd.DataFrame(rows)
+
+
+def iter_transaction_chunks(file_path, start_row, columns, stop_column, chunk_size=CHUNK_SIZE):
+    """
+    Yield the transaction rows of a delimited statement in chunks of at most chunk_size rows.
+
+    Only the given column positions are loaded, as stripped strings. Reading stops at the
+    first row with an empty stop_column (a blank line or the trailing statement summary).
+
+    Args:
+        file_path (str): Path to the statement.
+        start_row (int): Index of the first transaction row.
+        columns (dict): Column position -> column name.
+        stop_column (str): Name of the column whose first empty value ends the transactions.
+        chunk_size (int): Maximum number of rows per chunk.
+    Yields:
+        pandas.DataFrame: The transaction rows with the given column names.
+    """
+    positions = sorted(columns)
+    reader = pd.read_csv(
+        file_path,
+        header=None,
+        skiprows=start_row,
+        usecols=positions,
+        dtype=str,
+        keep_default_na=False,
+        skip_blank_lines=False,
+        chunksize=chunk_size,
+    )
+    with reader:
+        for chunk in reader:
+            chunk.columns = [columns[position] for position in positions]
+            chunk = chunk.apply(lambda column: column.str.strip())
+            empty = (chunk[stop_column] == "").to_numpy()
+            if empty.any():
+                yield chunk.iloc[:empty.argmax()]
+                return
+            yield chunk
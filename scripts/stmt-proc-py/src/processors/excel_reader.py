@@ -0,0 +1,71 @@
+"""
+excel_reader.py
+Bounded reading of statement workbooks: a small probe read to locate the header row,
+then a read of only the needed columns of the transaction rows.
+"""
+import pandas as pd
+
+# Number of leading rows read to detect the statement type and locate the header row
+PROBE_ROWS = 50
+
+
+def excel_engine():
+    """Return 'calamine' when python-calamine is installed (much faster parsing), otherwise None for the pandas default."""
+    try:
+        import python_calamine  # noqa: F401
+    except ImportError:
+        return None
+    return "calamine"
+
+
+def read_probe(file_path, nrows=PROBE_ROWS):
+    """Read the first nrows rows of the first sheet, without header."""
+    return pd.read_excel(file_path, header=None, nrows=nrows, engine=excel_engine())
+
+
+def find_header_row(probe, column, value):
+    """
+    Return the index of the first probe row whose cell in the given column position equals value.
+
+    Raises:
+        ValueError: If no such row is found in the probe.
+    """
+    if probe.shape[1] <= column:
+        raise ValueError(f"Header row with '{value}' not found in the first {len(probe)} rows.")
+    matches = probe.index[probe.iloc[:, column] == value]
+    if len(matches) == 0:
+        raise ValueError(f"Header row with '{value}' not found in the first {len(probe)} rows.")
+    return matches[0]
+
+
+def read_transaction_rows(file_path, start_row, columns, stop_column):
+    """
+    Read the transaction rows of a statement.
+
+    Only the given column positions are loaded, as object dtype so cell values are kept
+    exactly as the engine returns them (they feed raw_data, from which the transaction key is computed).
+    Rows from the first one with an empty stop_column on (the trailing statement summary)
+    are dropped.
+
+    Args:
+        file_path (str): Path to the workbook.
+        start_row (int): Index of the first transaction row.
+        columns (dict): Column position -> column name.
+        stop_column (str): Name of the column whose first empty value ends the transactions.
+    Returns:
+        pandas.DataFrame: The transaction rows with the given column names.
+    """
+    positions = sorted(columns)
+    df = pd.read_excel(
+        file_path,
+        header=None,
+        skiprows=start_row,
+        usecols=positions,
+        dtype=object,
+        engine=excel_engine(),
+    )
+    df.columns = [columns[position] for position in positions]
+    empty = df[stop_column].isna().to_numpy()
+    if empty.any():
+        df = df.iloc[:empty.argmax()]
+    return df.reset_index(drop=True)
@@ -0,0 +1,120 @@
+import os
+import pandas as pd
+from .statement_processor import StatementProcessor
+from .delimited_reader import CHUNK_SIZE, iter_transaction_chunks, read_probe
+from .excel_reader import find_header_row
+from .statement_processor_provider import StatementProcessorProvider
+
+
+@StatementProcessorProvider.register("hdfc-sa-csv")
+class HdfcBankAcctCsvStatementProcessor(StatementProcessor):
+    """
+    Processor for HDFC Bank Account Statements downloaded in delimited format.
+
+    The statement is read and stored chunk by chunk, so peak memory does not depend
+    on the length of the statement.
+    """
+
+    DELIMITED = True
+
+    # Number of rows read, normalized and stored at a time
+    CHUNK_SIZE = CHUNK_SIZE
+
+    # Header name -> column name of the columns used
+    COLUMNS = {
+        "Date": "txn_date",
+        "Narration": "narration",
+        "Debit Amount": "withdrawal_amt",
+        "Credit Amount": "deposit_amt",
+        "Chq/Ref Number": "chq_ref_no",
+        "Closing Balance": "closing_balance",
+    }
+
+    def __init__(self, txn_store):
+        """Initialize with a transaction store."""
+        super().__init__(txn_store)
+
+    def statement_type(self):
+        """Return the statement type."""
+        return "hdfc-sa-csv"
+
+    @classmethod
+    def matches(cls, probe):
+        """Delimited account statements have a header row "Date", "Narration", "Value Dat", "Debit Amount", ..."""
+        if probe.shape[1] < 4:
+            return False
+        return ((probe[0] == "Date") & (probe[1] == "Narration") & (probe[3] == "Debit Amount")).any()
+
+    def read_probe(self, file_path):
+        """Read the leading rows of the delimited statement file."""
+        return read_probe(file_path)
+
+    def parse_statement(self, file_path, df=None):
+        probe = df if df is not None else self.read_probe(file_path)
+
+        # Extract txn-source from the first 6 digits of the filename
+        file_name = os.path.basename(file_path)
+        txn_source = file_name[:6]
+
+        # Find the header row where the first column value is "Date"
+        header_row_index = find_header_row(probe, 0, "Date")
+        header = probe.iloc[header_row_index].tolist()
+        columns = {header.index(name): column for name, column in self.COLUMNS.items()}
+
+        # Normalize and store each chunk as it is read
+        row_count = 0
+        for chunk in iter_transaction_chunks(file_path, header_row_index + 1, columns, "txn_date", self.CHUNK_SIZE):
+            transactions = self._normalize(chunk, txn_source)
+            self.txn_store.store_transactions(transactions)
+            row_count += len(transactions)
+            print(f"Stored {row_count} transactions from {file_name}...")
+
+        # Export the consolidated CSV file once, after the whole statement is stored
+        self.txn_store.export_transactions()
+        return row_count
+
+    def _normalize(self, chunk, txn_source):
+        """
+        Convert a chunk of delimited rows to transaction records.
+
+        Amounts are formatted in raw_data the way they are read from the XLS statements
+        (integral amounts without decimals, missing amounts as nan).
+        """
+        # Zero amounts are the unused debit or credit side
+        withdrawal = self._amounts(chunk["withdrawal_amt"])
+        withdrawal = withdrawal.where(withdrawal != 0)
+        deposit = self._amounts(chunk["deposit_amt"])
+        deposit = deposit.where(deposit != 0)
+        closing = self._amounts(chunk["closing_balance"])
+        txn_dates = pd.to_datetime(chunk["txn_date"], format="%d/%m/%y").dt.strftime("%Y-%m-%d")
+        txn_amounts = withdrawal.fillna(deposit)
+
+        transactions = []
+        for date, txn_date, narration, chq_ref_no, withdrawal_amt, deposit_amt, closing_balance, txn_amount in zip(
+                chunk["txn_date"], txn_dates, chunk["narration"], chunk["chq_ref_no"],
+                withdrawal, deposit, closing, txn_amounts):
+            raw_data = (f"{date}|{narration}|{chq_ref_no}|{self._format_amount(withdrawal_amt)}"
+                        f"|{self._format_amount(deposit_amt)}|{self._format_amount(closing_balance)}")
+            transactions.append({
+                "txn-source": txn_source,
+                "txn-date": txn_date,
+                "narration": narration,
+                "txn-amount": txn_amount,
+                "credit-indicator": "Yes" if not pd.isna(deposit_amt) else "",
+                "txn-type": "",
+                "category": "",
+                "sub-category": "",
+                "raw-data": raw_data,
+            })
+        return transactions
+
+    @staticmethod
+    def _amounts(column):
+        """Parse an amount column; empty amounts become NaN."""
+        return pd.to_numeric(column.str.replace(",", ""), errors="coerce")
+
+    @staticmethod
+    def _format_amount(amount):
+        if pd.isna(amount):
+            return "nan"
+        return str(int(amount)) if float(amount).is_integer() else str(amount)
@@ -1,12 +1,22 @@
 import pandas as pd
-import hashlib
 import os
 from .statement_processor import StatementProcessor
+from .excel_reader import find_header_row, read_transaction_rows
+from .statement_processor_provider import StatementProcessorProvider
 
 
+@StatementProcessorProvider.register("hdfc-cc")
 class HdfcCreditCardStatementProcessor(StatementProcessor):
     """Processor for HDFC Credit Card Statements."""
 
+    # Column position -> column name of the columns used
+    COLUMNS = {
+        17: "txn_date",  # 18th column (0-based index is 17)
+        21: "narration",  # 22nd column (0-based index is 21)
+        48: "txn_amount",  # 49th column (0-based index is 48)
+        54: "debit_credit",  # 55th column (0-based index is 54)
+    }
+
     def __init__(self, txn_store):
         """Initialize with a transaction store."""
         super().__init__(txn_store)
@@ -15,26 +25,27 @@ class HdfcCreditCardStatementProcessor(StatementProcessor):
         """Return the statement type."""
         return "hdfc-cc"
 
-    def parse_statement(self, file_path):
-        # Read the XLS file
-        df = pd.read_excel(file_path, header=None)
+    @classmethod
+    def matches(cls, probe):
+        """Credit card statements have "Transaction type" in the 2nd column of the header row."""
+        if probe.shape[1] < 2:
+            return False
+        return (probe.iloc[:, 1] == "Transaction type").any()
+
+    def parse_statement(self, file_path, df=None):
+        # Read the leading rows of the XLS file
+        probe = df if df is not None else self.read_probe(file_path)
 
         # Extract txn-source from the first 6 digits of the filename
         file_name = os.path.basename(file_path)
         txn_source = file_name[:6]
 
         # Find the header row where the 2nd column value is "Transaction type"
-        header_row_index = df[df.iloc[:, 1] == "Transaction type"].index[0]
+        header_row_index = find_header_row(probe, 1, "Transaction type")
         start_row_index = header_row_index + 1
-        df = df.iloc[start_row_index:].reset_index(drop=True)
 
-        # Rename columns for easier access
-        df.rename(columns={
-            17: "txn_date",  # 18th column (0-based index is 17)
-            21: "narration",  # 22nd column (0-based index is 21)
-            48: "txn_amount",  # 49th column (0-based index is 48)
-            54: "debit_credit"  # 55th column (0-based index is 54)
-        }, inplace=True)
+        # Read only the needed columns of the transaction rows, renamed for easier access
+        df = read_transaction_rows(file_path, start_row_index, self.COLUMNS, stop_column="txn_date")
 
         # Process each transaction record
         transactions = []
@@ -44,7 +55,6 @@ class HdfcCreditCardStatementProcessor(StatementProcessor):
 
             # Concatenate raw data
             raw_data = f"{row['txn_date']}|{row['narration']}|{row['txn_amount']}|{row['debit_credit']}"
-            row_id = hashlib.md5(raw_data.encode()).hexdigest()
 
             # Parse transaction date
             txn_date = pd.to_datetime(row['txn_date'][:10], format='%d/%m/%Y').strftime('%Y-%m-%d')
@@ -54,7 +64,6 @@ class HdfcCreditCardStatementProcessor(StatementProcessor):
 
             # Create transaction record
             transaction = {
-                "row-id": row_id,
                 "txn-source": txn_source,
                 "txn-date": txn_date,
                 "narration": row['narration'],
@@ -68,4 +77,4 @@ class HdfcCreditCardStatementProcessor(StatementProcessor):
             transactions.append(transaction)
 
         # Store transactions in the consolidated CSV file
-        self.store_transactions(transactions)
\ No newline at end of file
+        return self.store_transactions(transactions)
\ No newline at end of file
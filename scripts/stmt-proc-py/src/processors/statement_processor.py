@@ -1,31 +1,53 @@
 from abc import ABC, abstractmethod
 from store.txn_store import TxnStore
+from .excel_reader import read_probe
 
 
 class StatementProcessor(ABC):
     """Abstract base class for statement processors."""
 
+    # True for processors of delimited (CSV) statements, False for Excel workbooks
+    DELIMITED = False
+
     def __init__(self, txn_store: TxnStore):
         """Initialize with a transaction store."""
         if not isinstance(txn_store, TxnStore):
             raise ValueError("txn_store must be an instance of TxnStore")
         self.txn_store = txn_store
 
+    @classmethod
+    def matches(cls, probe):
+        """
+        Return True if the leading rows of a statement (read without header) belong to this processor.
+        Processors that cannot be detected from content keep the default and must be selected by type.
+        """
+        return False
+
     @abstractmethod
-    def parse_statement(self, file_path):
-        """Abstract method to parse a statement file."""
+    def parse_statement(self, file_path, df=None):
+        """
+        Abstract method to parse a statement file.
+        df holds the leading rows of the statement read without header (see
+        StatementProcessorProvider.detect_processor); when None, the processor reads them itself.
+        Returns the number of transactions parsed.
+        """
         pass
 
+    def read_probe(self, file_path):
+        """Read the leading rows of the statement file without header."""
+        return read_probe(file_path)
+
     @abstractmethod
     def statement_type(self):
         """Abstract method to get statement type."""
         pass
     
     def store_transactions(self, transactions):
-        """Delegate storing transactions to the TxnStore class."""
+        """Delegate storing transactions to the TxnStore class and return their number."""
         self.txn_store.store_transactions(transactions)
         """Export transactions to a CSV file."""
         self.txn_store.export_transactions()
+        return len(transactions)
 
 
 
@@ -1,16 +1,66 @@
-from .hdfc_bank_acct_processor import HdfcBankAcctStatementProcessor
-from .hdfc_credit_card_processor import HdfcCreditCardStatementProcessor
 from store.txn_store import TxnStore
+from . import delimited_reader, excel_reader
+from .excel_reader import PROBE_ROWS
 
 
 class StatementProcessorProvider:
-    """Factory class to provide the appropriate statement processor."""
-
-    @staticmethod
-    def get_processor(key, txn_store: TxnStore):
-        if key == "hdfc-sa":
-            return HdfcBankAcctStatementProcessor(txn_store)
-        elif key == "hdfc-cc":
-            return HdfcCreditCardStatementProcessor(txn_store)
-        else:
-            raise ValueError(f"Unsupported statement type: {key}")
\ No newline at end of file
+    """
+    Registry of statement processors.
+
+    Processors register themselves with the register() decorator and declare a cheap
+    signature check (StatementProcessor.matches) on the first rows of a statement.
+    This lets the provider pick the processor for a file by its content, and new
+    banks plug in without touching main.py.
+    """
+
+    _processors = {}
+
+    @classmethod
+    def register(cls, key):
+        """Class decorator registering a processor under the given statement type."""
+        def decorator(processor_class):
+            cls._processors[key] = processor_class
+            return processor_class
+        return decorator
+
+    @classmethod
+    def statement_types(cls):
+        """Return the registered statement types."""
+        return list(cls._processors)
+
+    @classmethod
+    def get_processor(cls, key, txn_store: TxnStore):
+        if key not in cls._processors:
+            raise ValueError(f"Unsupported statement type: {key}")
+        return cls._processors[key](txn_store)
+
+    @classmethod
+    def detect_processor(cls, file_path, txn_store: TxnStore):
+        """
+        Detect the processor for a statement file from its content.
+
+        Only the leading PROBE_ROWS rows are read, as delimited text or as a workbook depending
+        on the file extension; they are returned alongside the processor so it can locate the
+        header row from them instead of reading them again.
+
+        Returns:
+            tuple: (processor, frame)
+        Raises:
+            ValueError: If no registered processor recognizes the statement.
+        """
+        delimited = delimited_reader.is_delimited(file_path)
+        reader = delimited_reader if delimited else excel_reader
+        frame = reader.read_probe(file_path)
+        return cls.detect_processor_for_frame(frame, txn_store, delimited), frame
+
+    @classmethod
+    def detect_processor_for_frame(cls, frame, txn_store: TxnStore, delimited=False):
+        """
+        Return the first registered processor whose signature matches the leading rows of the frame.
+        Only processors of the given format (delimited text or workbook) are considered.
+        """
+        probe = frame.head(PROBE_ROWS)
+        for processor_class in cls._processors.values():
+            if processor_class.DELIMITED == delimited and processor_class.matches(probe):
+                return processor_class(txn_store)
+        raise ValueError(f"Unable to detect statement type. Supported statement types: {', '.join(cls.statement_types())}")
@@ -1,28 +1,109 @@
 import pandas as pd
+import hashlib
 import os
 import sqlite3
+import zlib
 import enum
+from utils.instrumentation import count, stage, timed
 
 """
 txn_store.py
 This module provides a class to handle storing transactions in an SQLite database and exporting them to a CSV file.
 """
+
+# Columns of the transaction DataFrames returned by the store
+TRANSACTION_COLUMNS = "raw_data, txn_source, txn_amount, narration, narration_id, credit_indicator, txn_date, txn_type, category, sub_category, state"
+
 class TxnState:
     """Enum-like class to represent the state of a transaction."""
     PENDING_CLASSIFICATION = "PENDING_CLASSIFICATION"
     PENDING_REVIEW = "PENDING_REVIEW"
     ACCEPTED = "ACCEPTED"
 
+class KeyMode:
+    """
+    Enum-like class for the representation of the transaction key (row_id), an MD5 digest of raw_data.
+    TEXT stores the 32-character hex digest; BLOB the 16-byte digest in a WITHOUT ROWID table;
+    INT64 the first 8 bytes as a signed integer, which is the table's rowid.
+    """
+    TEXT = "text"
+    BLOB = "blob"
+    INT64 = "int64"
+
+    ALL = (TEXT, BLOB, INT64)
+
+# Preset dictionary for compressing raw_data: fragments common in HDFC statement rows.
+# Rows are a hundred bytes or so, too short for zlib to find repetitions within one row.
+RAW_DATA_ZDICT = (
+    b"|nan||nan|0000000000000000|NEFT CR-NEFT DR-IMPS-RTGS-ATW-POS ACH D-ACH C-NETBANKING TRANSFER-"
+    b"INTEREST PAID TILL-SALARY-PAYTM-@OKAXIS-@OKSBI-@OKICICI-@OKHDFCBANK-@YBL-@PAYTM-UPI-"
+)
+
+def deflate_raw_data(raw_data):
+    """Compress raw_data as raw deflate with the preset dictionary."""
+    compressor = zlib.compressobj(9, zlib.DEFLATED, -15, 9, zlib.Z_DEFAULT_STRATEGY, RAW_DATA_ZDICT)
+    return compressor.compress(raw_data.encode()) + compressor.flush()
+
+def inflate_raw_data(data):
+    """Inverse of deflate_raw_data; registered as the SQL function raw_data_decompress."""
+    if data is None:
+        return None
+    return zlib.decompressobj(-15, RAW_DATA_ZDICT).decompress(data).decode()
+
+def row_keys(raw_data_list, key_mode):
+    """
+    Compute the transaction keys of a batch of raw_data strings.
+    Args:
+        raw_data_list (list of str): The raw data of the transactions.
+        key_mode (str): One of the KeyMode values.
+    Returns:
+        list: The keys, in the representation of the key mode.
+    """
+    digests = [hashlib.md5(raw_data.encode()).digest() for raw_data in raw_data_list]
+    if key_mode == KeyMode.BLOB:
+        return digests
+    if key_mode == KeyMode.INT64:
+        return [int.from_bytes(digest[:8], "big", signed=True) for digest in digests]
+    return [digest.hex() for digest in digests]
+
 class TxnStore:
-    """Class to handle storing transactions in an SQLite database and exporting to a CSV file."""
+    """
+    Class to handle storing transactions in an SQLite database and exporting to a CSV file.
+
+    The key mode, whether raw_data is kept compressed in the raw_data_store side table and whether
+    narrations are interned are chosen when the database is created and recorded in store_meta;
+    use migrate() to change them. Reads go through the transactions_view view, which presents row_id
+    as hex text (for BLOB keys), raw_data decompressed and the narration text, whatever the settings.
+
+    Each distinct narration is stored once in the narrations table and transactions reference it by
+    narration_id. With intern_narrations the verbatim copy in transactions.narration is dropped.
+    """
 
-    def __init__(self, db_file, csv_file):
+    def __init__(self, db_file, csv_file, key_mode=None, compress_raw_data=None, intern_narrations=None):
+        """
+        Args:
+            db_file (str): Path to the SQLite database, or ':memory:'.
+            csv_file (str): Path of the consolidated CSV export.
+            key_mode (str): KeyMode for a new database; None keeps the stored one (TEXT for a new database).
+            compress_raw_data (bool): Store raw_data compressed for a new database; None keeps the stored setting.
+            intern_narrations (bool): Store narrations only in the narrations table for a new database;
+                None keeps the stored setting.
+        Raises:
+            ValueError: If the requested settings differ from those of an existing database.
+        """
+        if key_mode is not None and key_mode not in KeyMode.ALL:
+            raise ValueError(f"Unsupported key mode: {key_mode}. Supported key modes: {', '.join(KeyMode.ALL)}")
         self.db_file = db_file
         self.csv_file = csv_file
         self.conn = None
-        self._initialize_database()
+        self.key_mode = KeyMode.TEXT
+        self.compress_raw_data = False
+        self.intern_narrations = False
+        # Narration text -> narration_id of the narrations already looked up
+        self._narration_ids = {}
+        self._initialize_database(key_mode, compress_raw_data, intern_narrations)
 
-    def _initialize_database(self):
+    def _initialize_database(self, key_mode=None, compress_raw_data=None, intern_narrations=None):
         """Initialize the SQLite database with the required table if it doesn't exist."""
         print(f"Initializing database at {self.db_file}...")
         if (self.db_file == ":memory:"):
@@ -38,22 +119,27 @@ class TxnStore:
         # (it will be created if it doesn't exist)    
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            # Create the transactions table if it doesn't exist
-            cursor.execute(f"""
-                CREATE TABLE IF NOT EXISTS transactions (
-                    row_id TEXT PRIMARY KEY,
-                    raw_data TEXT,
-                    txn_source TEXT,
-                    txn_date TEXT,
-                    narration TEXT,
-                    txn_amount REAL,
-                    credit_indicator TEXT,
-                    txn_type TEXT,
-                    category TEXT,
-                    sub_category TEXT
-                    state TEXT DEFAULT '{TxnState.PENDING_CLASSIFICATION}'
-                )
-            """)
+            cursor.execute("CREATE TABLE IF NOT EXISTS store_meta (key TEXT PRIMARY KEY, value TEXT)")
+            settings = dict(cursor.execute("SELECT key, value FROM store_meta").fetchall())
+            if settings:
+                self.key_mode = settings["key_mode"]
+                self.compress_raw_data = settings["compress_raw_data"] == "1"
+                self.intern_narrations = settings.get("intern_narrations") == "1"
+            elif not self._table_exists("transactions"):
+                # New database: create the tables for the requested settings
+                self.key_mode = key_mode or KeyMode.TEXT
+                self.compress_raw_data = bool(compress_raw_data)
+                self.intern_narrations = bool(intern_narrations)
+                self._create_tables("transactions", "raw_data_store", self.key_mode)
+            # else: database created before the settings were recorded, with TEXT keys, raw_data and narrations inline
+            self._save_settings()
+
+            if (key_mode is not None and key_mode != self.key_mode) or \
+                    (compress_raw_data is not None and bool(compress_raw_data) != self.compress_raw_data) or \
+                    (intern_narrations is not None and bool(intern_narrations) != self.intern_narrations):
+                raise ValueError(f"{self.db_file} stores {self.key_mode} keys with compress_raw_data={self.compress_raw_data} "
+                                 f"and intern_narrations={self.intern_narrations}; use TxnStore.migrate() to change them.")
+
             # Add column 'state' if it doesn't exist
             # Check if 'state' column exists before adding
             cursor.execute("PRAGMA table_info(transactions)")
@@ -63,7 +149,31 @@ class TxnStore:
                            ALTER TABLE transactions
                            ADD COLUMN state TEXT DEFAULT '{TxnState.PENDING_CLASSIFICATION}'
                            """)
+            self._create_tables("transactions", "raw_data_store", self.key_mode)
+            if 'narration_id' not in columns:
+                # Database created before narrations were interned: fill the dictionary from the stored narrations
+                cursor.execute("ALTER TABLE transactions ADD COLUMN narration_id INTEGER")
+                cursor.execute("INSERT OR IGNORE INTO narrations (text) SELECT DISTINCT narration FROM transactions WHERE narration IS NOT NULL")
+                cursor.execute("""
+                    UPDATE transactions
+                    SET narration_id = (SELECT narration_id FROM narrations WHERE text = transactions.narration)
+                    WHERE narration IS NOT NULL
+                """)
+            self._create_view()
             
+            # Ledger of processed statement files, keyed by the hash of the file content,
+            # so unchanged statements are not parsed again on re-runs
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS processed_files (
+                    file_hash TEXT PRIMARY KEY,
+                    file_name TEXT,
+                    statement_type TEXT,
+                    row_count INTEGER,
+                    parse_seconds REAL,
+                    processed_at TEXT
+                )
+            """)
+
             # Update state for existing transactions if txn_type is not empty
             cursor.execute("""
                 UPDATE transactions
@@ -72,11 +182,171 @@ class TxnStore:
             """, (TxnState.PENDING_REVIEW, TxnState.PENDING_CLASSIFICATION))
             # Commit the changes
             conn.commit()
-    
+
+    def _table_exists(self, name):
+        cursor = self.get_connection().execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,))
+        return cursor.fetchone() is not None
+
+    def _create_tables(self, transactions_table, raw_data_table, key_mode):
+        """Create the transactions table and the raw_data side table for a key mode, if they don't exist."""
+        if key_mode == KeyMode.INT64:
+            # The key becomes the rowid itself
+            key_column, options = "row_id INTEGER PRIMARY KEY", ""
+        elif key_mode == KeyMode.BLOB:
+            key_column, options = "row_id BLOB PRIMARY KEY NOT NULL", "WITHOUT ROWID"
+        else:
+            key_column, options = "row_id TEXT PRIMARY KEY", ""
+        conn = self.get_connection()
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {transactions_table} (
+                {key_column},
+                raw_data TEXT,
+                txn_source TEXT,
+                txn_date TEXT,
+                narration TEXT,
+                narration_id INTEGER,
+                txn_amount REAL,
+                credit_indicator TEXT,
+                txn_type TEXT,
+                category TEXT,
+                sub_category TEXT,
+                state TEXT DEFAULT '{TxnState.PENDING_CLASSIFICATION}'
+            ) {options}
+        """)
+        # Dictionary of the distinct narrations, shared by the transactions tables
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS narrations (
+                narration_id INTEGER PRIMARY KEY,
+                text TEXT NOT NULL UNIQUE
+            )
+        """)
+        # Compressed raw_data, used when compress_raw_data is set (transactions.raw_data is then NULL)
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {raw_data_table} (
+                {key_column},
+                data BLOB
+            ) {options}
+        """)
+
+    def _create_view(self):
+        """(Re)create transactions_view, presenting the transactions independently of the storage settings."""
+        row_id = "lower(hex(t.row_id))" if self.key_mode == KeyMode.BLOB else "t.row_id"
+        if self.compress_raw_data:
+            raw_data = "COALESCE(t.raw_data, raw_data_decompress(r.data))"
+            source = "transactions t LEFT JOIN raw_data_store r ON r.row_id = t.row_id"
+        else:
+            raw_data, source = "t.raw_data", "transactions t"
+        if self.intern_narrations:
+            narration = "COALESCE(t.narration, n.text)"
+            source += " LEFT JOIN narrations n ON n.narration_id = t.narration_id"
+        else:
+            narration = "t.narration"
+        conn = self.get_connection()
+        conn.execute("DROP VIEW IF EXISTS transactions_view")
+        conn.execute(f"""
+            CREATE VIEW transactions_view AS
+            SELECT {row_id} AS row_id, {raw_data} AS raw_data, t.txn_source, t.txn_date,
+                   {narration} AS narration, t.narration_id, t.txn_amount, t.credit_indicator, t.txn_type, t.category, t.sub_category, t.state
+            FROM {source}
+        """)
+
+    def _save_settings(self):
+        self.get_connection().executemany("INSERT OR REPLACE INTO store_meta (key, value) VALUES (?, ?)", (
+            ("key_mode", self.key_mode),
+            ("compress_raw_data", "1" if self.compress_raw_data else "0"),
+            ("intern_narrations", "1" if self.intern_narrations else "0"),
+        ))
+
+    @timed("store.migrate")
+    def migrate(self, key_mode, compress_raw_data=False, intern_narrations=False):
+        """
+        Rewrite the transactions for another key mode, raw_data or narration storage.
+        Keys are recomputed from raw_data. The database is vacuumed afterwards to release the freed pages.
+        Args:
+            key_mode (str): One of the KeyMode values.
+            compress_raw_data (bool): Keep raw_data compressed in the raw_data_store side table.
+            intern_narrations (bool): Keep narrations only in the narrations table.
+        """
+        if key_mode not in KeyMode.ALL:
+            raise ValueError(f"Unsupported key mode: {key_mode}. Supported key modes: {', '.join(KeyMode.ALL)}")
+        print(f"Migrating transactions to {key_mode} keys (compress_raw_data={compress_raw_data}, intern_narrations={intern_narrations})...")
+        conn = self.get_connection()
+        with conn:
+            conn.execute("DROP TABLE IF EXISTS transactions_migrated")
+            conn.execute("DROP TABLE IF EXISTS raw_data_store_migrated")
+            self._create_tables("transactions_migrated", "raw_data_store_migrated", key_mode)
+            cursor = conn.execute("""
+                SELECT raw_data, txn_source, txn_date, narration, txn_amount, credit_indicator,
+                       txn_type, category, sub_category, state
+                FROM transactions_view
+            """)
+            migrated = 0
+            while True:
+                rows = cursor.fetchmany(10000)
+                if not rows:
+                    break
+                keys = row_keys([row[0] or "" for row in rows], key_mode)
+                self._insert_rows("transactions_migrated", "raw_data_store_migrated", keys, rows, compress_raw_data, intern_narrations)
+                migrated += len(rows)
+            # Rows sharing a key (e.g. all rows without raw_data) are kept only once
+            kept = conn.execute("SELECT COUNT(*) FROM transactions_migrated").fetchone()[0]
+            conn.execute("DROP VIEW IF EXISTS transactions_view")
+            conn.execute("DROP TABLE transactions")
+            conn.execute("DROP TABLE raw_data_store")
+            conn.execute("ALTER TABLE transactions_migrated RENAME TO transactions")
+            conn.execute("ALTER TABLE raw_data_store_migrated RENAME TO raw_data_store")
+            self.key_mode = key_mode
+            self.compress_raw_data = bool(compress_raw_data)
+            self.intern_narrations = bool(intern_narrations)
+            self._save_settings()
+            self._create_view()
+        conn.execute("VACUUM")
+        print(f"Migrated {kept} transactions.")
+        if kept < migrated:
+            print(f"Dropped {migrated - kept} transactions with a duplicate or missing raw_data key.")
+
+    def _insert_rows(self, transactions_table, raw_data_table, keys, rows, compress, intern):
+        """
+        Insert rows (raw_data, txn_source, txn_date, narration, txn_amount, credit_indicator,
+        txn_type, category, sub_category, state) under the given keys, skipping existing keys.
+        """
+        conn = self.get_connection()
+        narration_ids = self._get_narration_ids([row[3] for row in rows])
+        if compress:
+            conn.executemany(f"INSERT OR IGNORE INTO {raw_data_table} (row_id, data) VALUES (?, ?)",
+                             ((key, deflate_raw_data(row[0])) for key, row in zip(keys, rows) if row[0] is not None))
+        conn.executemany(f"""
+            INSERT OR IGNORE INTO {transactions_table} (
+                row_id, raw_data, txn_source, txn_date, narration, narration_id,
+                txn_amount, credit_indicator, txn_type, category, sub_category, state
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            (key, None if compress else row[0], row[1], row[2], None if intern and narration_id else row[3], narration_id) + tuple(row[4:])
+            for key, row, narration_id in zip(keys, rows, narration_ids)
+        ))
+
+    def _get_narration_ids(self, narrations):
+        """
+        Return the narration_id of each narration, adding the new ones to the narrations table.
+        Narrations that are not strings (missing values) get None.
+        """
+        conn = self.get_connection()
+        missing = list({narration for narration in narrations
+                        if isinstance(narration, str) and narration not in self._narration_ids})
+        if missing:
+            conn.executemany("INSERT OR IGNORE INTO narrations (text) VALUES (?)", ((narration,) for narration in missing))
+            # Stay below SQLite's limit on the number of parameters
+            for offset in range(0, len(missing), 500):
+                part = missing[offset:offset + 500]
+                cursor = conn.execute(f"SELECT text, narration_id FROM narrations WHERE text IN ({', '.join('?' * len(part))})", part)
+                self._narration_ids.update(cursor.fetchall())
+        return [self._narration_ids.get(narration) if isinstance(narration, str) else None for narration in narrations]
+
     def get_connection(self):
         """Get the SQLite database connection."""
         if self.conn is None:
             self.conn = sqlite3.connect(self.db_file)
+            self.conn.create_function("raw_data_decompress", 1, inflate_raw_data, deterministic=True)
         return self.conn
     
     def close(self):
@@ -90,79 +360,186 @@ class TxnStore:
             print("Database connection closed.")
 
     def store_transactions(self, transactions):
-        """Store transactions in the SQLite database."""
-        
+        """
+        Store transactions in the SQLite database with a single bulk insert.
+        The keys are computed from raw-data for the whole batch (in TEXT key mode a "row-id"
+        given with a transaction is used as is). Transactions already stored are skipped.
+        """
+        transactions = list(transactions)
+        raw_data_list = [transaction["raw-data"] for transaction in transactions]
+        keys = row_keys(raw_data_list, self.key_mode)
+        if self.key_mode == KeyMode.TEXT:
+            keys = [transaction.get("row-id") or key for transaction, key in zip(transactions, keys)]
+        rows = [
+            (
+                transaction["raw-data"],
+                transaction["txn-source"],
+                transaction["txn-date"],
+                transaction["narration"],
+                transaction["txn-amount"],
+                transaction["credit-indicator"],
+                transaction["txn-type"],
+                transaction["category"],
+                transaction["sub-category"],
+                TxnState.PENDING_CLASSIFICATION  # Default state
+            )
+            for transaction in transactions
+        ]
+        with stage("store.insert") as s, self.get_connection():
+            self._insert_rows("transactions", "raw_data_store", keys, rows, self.compress_raw_data, self.intern_narrations)
+            s.rows = len(rows)
+
+    def get_processed_file(self, file_hash):
+        """
+        Retrieve the ledger entry of a processed statement file.
+        Args:
+            file_hash (str): The hash of the file content.
+        Returns:
+            dict: The ledger entry, or None if the file was not processed yet.
+        """
+        cursor = self.get_connection().execute("""
+            SELECT file_hash, file_name, statement_type, row_count, parse_seconds, processed_at
+            FROM processed_files
+            WHERE file_hash = ?
+        """, (file_hash,))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        return dict(zip(("file_hash", "file_name", "statement_type", "row_count", "parse_seconds", "processed_at"), row))
+
+    def record_processed_file(self, file_hash, file_name, statement_type, row_count, parse_seconds):
+        """Record a processed statement file in the ledger, replacing any previous entry."""
         with self.get_connection() as conn:
-            cursor = conn.cursor()
-            for transaction in transactions:
-                try:
-                    cursor.execute("""
-                        INSERT INTO transactions (
-                            row_id, txn_source, txn_date, narration,
-                            txn_amount, credit_indicator, txn_type, category, sub_category, raw_data, state
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (
-                        transaction["row-id"],
-                        transaction["txn-source"],
-                        transaction["txn-date"],
-                        transaction["narration"],
-                        transaction["txn-amount"],
-                        transaction["credit-indicator"],
-                        transaction["txn-type"],
-                        transaction["category"],
-                        transaction["sub-category"],
-                        transaction["raw-data"],
-                        TxnState.PENDING_CLASSIFICATION  # Default state
-                    ))
-                except sqlite3.IntegrityError:
-                    # Skip duplicate transactions (row_id is the primary key)
-                    pass
-            conn.commit()
+            conn.execute("""
+                INSERT OR REPLACE INTO processed_files (
+                    file_hash, file_name, statement_type, row_count, parse_seconds, processed_at
+                ) VALUES (?, ?, ?, ?, ?, datetime('now'))
+            """, (file_hash, file_name, statement_type, row_count, parse_seconds))
 
+    @timed("store.export")
     def export_transactions(self):
         """Export transactions from the SQLite database to a CSV file."""
         with self.conn as conn:
-            df = pd.read_sql_query("SELECT row_id, txn_source, txn_date, narration, txn_amount, credit_indicator, txn_type, category, sub_category, raw_data, state FROM transactions", conn)
+            df = pd.read_sql_query("SELECT row_id, txn_source, txn_date, narration, txn_amount, credit_indicator, txn_type, category, sub_category, raw_data, state FROM transactions_view", conn)
             df.to_csv(self.csv_file, index=False)
 
+    @timed("store.update")
     def update_transactions_from_csv(self, updated_csv_file):
         """Update type, category, and sub-category in transactions from a CSV file."""
         updated_df = pd.read_csv(updated_csv_file)
+        missing = updated_df['raw_data'].isna()
+        if missing.any():
+            print(f"Skipping {missing.sum()} rows without raw_data in {updated_csv_file}.")
+            updated_df = updated_df[~missing]
+        # Only accepted transactions keep their state, the others are left for review
+        states = updated_df['state'].where(updated_df['state'] == TxnState.ACCEPTED, TxnState.PENDING_REVIEW)
+        keys = row_keys(updated_df['raw_data'].tolist(), self.key_mode)
         with self.get_connection() as conn:
-            cursor = conn.cursor()
-            for _, row in updated_df.iterrows():
-                state = TxnState.PENDING_REVIEW
-                # Check if the transaction is accepted
-                if row['state'] == TxnState.ACCEPTED:
-                    state = TxnState.ACCEPTED
-                # Update the transaction in the database
-                cursor.execute("""
-                    UPDATE transactions
-                    SET txn_type = ?, category = ?, sub_category = ?, state = ?
-                    WHERE raw_data = ?
-                """, (row['type'], row['category'], row['sub-category'], state, row['raw_data']))
+            # Update the transactions in the database by their key
+            conn.executemany("""
+                UPDATE transactions
+                SET txn_type = ?, category = ?, sub_category = ?, state = ?
+                WHERE row_id = ?
+            """, zip(updated_df['type'], updated_df['category'], updated_df['sub-category'], states, keys))
             conn.commit()
 
     def get_transactions(self):
         """Retrieve all transactions as a DataFrame."""
-        query = "SELECT raw_data, txn_source, txn_amount, narration, credit_indicator, txn_date, txn_type, category, sub_category, state FROM transactions"
-        return pd.read_sql_query(query, self.conn)
+        query = f"SELECT {TRANSACTION_COLUMNS} FROM transactions_view"
+        with stage("store.query") as s:
+            df = pd.read_sql_query(query, self.conn)
+            s.rows = len(df)
+        return df
+
+    def get_labelled_transactions(self):
+        """Retrieve the transactions with a transaction type as a DataFrame."""
+        query = f"SELECT {TRANSACTION_COLUMNS} FROM transactions_view WHERE txn_type <> ''"
+        with stage("store.query") as s:
+            df = pd.read_sql_query(query, self.get_connection())
+            s.rows = len(df)
+        return df
+
+    def _iter_query(self, query, params, batch_size):
+        """Iterate over the result of a query in DataFrames of at most batch_size rows, timing each fetch."""
+        batches = iter(pd.read_sql_query(query, self.get_connection(), params=params, chunksize=batch_size))
+        while True:
+            with stage("store.query") as s:
+                batch = next(batches, None)
+                s.rows = 0 if batch is None else len(batch)
+            if batch is None:
+                return
+            yield batch
+
+    def iter_transactions_not_in_state(self, state, batch_size):
+        """
+        Iterate over the transactions whose state is not the given state in DataFrames of at most batch_size rows.
+        The state is filtered by the query, so the other transactions are never loaded.
+        """
+        query = f"SELECT {TRANSACTION_COLUMNS} FROM transactions_view WHERE state IS NOT ?"
+        yield from self._iter_query(query, (state,), batch_size)
 
+    def iter_unlabelled_transactions(self, batch_size):
+        """
+        Iterate over the transactions without a transaction type in DataFrames of at most batch_size rows,
+        ordered by narration so that repeated narrations fall in the same batch.
+        Only one batch is held in memory at a time.
+        """
+        query = f"SELECT {TRANSACTION_COLUMNS} FROM transactions_view WHERE txn_type = '' ORDER BY narration"
+        yield from self._iter_query(query, (), batch_size)
+
+    def get_classification_counts(self):
+        """
+        Count the classified transactions per classification.
+        Returns:
+            dict: The number of transactions keyed by (txn_type, category, sub_category).
+        """
+        cursor = self.get_connection().execute("""
+            SELECT txn_type, category, sub_category, COUNT(*)
+            FROM transactions
+            WHERE txn_type <> '' AND category <> '' AND sub_category <> ''
+            GROUP BY txn_type, category, sub_category
+        """)
+        return {(txn_type, category, sub_category): count for txn_type, category, sub_category, count in cursor}
+
+    @timed("store.update")
     def update_transactions(self, raw_data_list, txn_type, category, sub_category, state = TxnState.PENDING_REVIEW):
-        """Update transactions with the given classifications."""
+        """Update transactions with the given classifications, looking them up by the key computed from raw_data."""
         with self.conn as conn:
-            cursor = conn.cursor()
-            for raw_data in raw_data_list:
-                cursor.execute("""
-                    UPDATE transactions
-                    SET txn_type = ?,
-                        category = ?,
-                        sub_category = ?,
-                        state = ?
-                    WHERE raw_data = ?
-                """, (txn_type, category, sub_category, state, raw_data))
+            conn.executemany("""
+                UPDATE transactions
+                SET txn_type = ?,
+                    category = ?,
+                    sub_category = ?,
+                    state = ?
+                WHERE row_id = ?
+            """, ((txn_type, category, sub_category, state, key) for key in row_keys(raw_data_list, self.key_mode)))
             conn.commit()
 
+    @timed("store.update")
+    def update_classifications(self, raw_data_list, classifications, state=TxnState.PENDING_REVIEW):
+        """
+        Update transactions each with its own classification in a single database transaction,
+        looking them up by the key computed from raw_data.
+        Args:
+            raw_data_list (list): The raw_data of the transactions.
+            classifications (list): The (txn_type, category, sub_category) of each transaction.
+            state (str): The state set on all the transactions.
+        Returns:
+            int: The number of rows updated.
+        """
+        with self.get_connection() as conn:
+            cursor = conn.executemany("""
+                UPDATE transactions
+                SET txn_type = ?, category = ?, sub_category = ?, state = ?
+                WHERE row_id = ?
+            """, (
+                (txn_type, category, sub_category, state, key)
+                for (txn_type, category, sub_category), key in zip(classifications, row_keys(raw_data_list, self.key_mode))
+            ))
+            count("store.rows_updated", cursor.rowcount)
+            return cursor.rowcount
+
+    @timed("store.update")
     def update_transaction(self, txn_date, narration, txn_amnt, credit_indicator, txn_type, category, sub_category, state=TxnState.PENDING_REVIEW):
         """
         Update a specific transaction based on date, narration, amount, and credit indicator.
@@ -192,10 +569,10 @@ class TxnStore:
             # Ensure that the transaction exists before updating
             cursor.execute("""
                 SELECT COUNT(*) FROM transactions
-                WHERE txn_date = ? AND narration = ? AND (CAST(REPLACE(txn_amount, ',', '') AS REAL) - ?) < 0.01 AND credit_indicator = ?
-            """, (txn_date, narration, txn_amnt, credit_indicator))
-            count = cursor.fetchone()[0]
-            if count == 0:
+                WHERE txn_date = ? AND (narration = ? OR narration_id = (SELECT narration_id FROM narrations WHERE text = ?)) AND (CAST(REPLACE(txn_amount, ',', '') AS REAL) - ?) < 0.01 AND credit_indicator = ?
+            """, (txn_date, narration, narration, txn_amnt, credit_indicator))
+            matched = cursor.fetchone()[0]
+            if matched == 0:
                 print(f"No transaction found for date: {txn_date}, narration: {narration}, amount: {txn_amnt}, credit indicator: {credit_indicator}. Update skipped.")
                 return 0
             cursor.execute("""
@@ -204,8 +581,8 @@ class TxnStore:
                     category = ?,
                     sub_category = ?,
                     state = ?
-                WHERE txn_date = ? AND narration = ? AND (CAST(REPLACE(txn_amount, ',', '') AS REAL) - ?) < 0.01 AND credit_indicator = ?
-            """, (txn_type, category, sub_category, state, txn_date, narration, txn_amnt, credit_indicator))
+                WHERE txn_date = ? AND (narration = ? OR narration_id = (SELECT narration_id FROM narrations WHERE text = ?)) AND (CAST(REPLACE(txn_amount, ',', '') AS REAL) - ?) < 0.01 AND credit_indicator = ?
+            """, (txn_type, category, sub_category, state, txn_date, narration, narration, txn_amnt, credit_indicator))
             updated_count = cursor.rowcount
             conn.commit()
             return updated_count
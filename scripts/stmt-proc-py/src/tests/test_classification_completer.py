@@ -0,0 +1,62 @@
+import os
+import sys
+import unittest
+
+# Add the src directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from prompt_toolkit.document import Document
+from classifier.classification_completer import ClassificationIndex, CustomTransactionCompleter
+from classifier.classifier_metadata import ClassifierMetadata
+from store.txn_store import TxnStore
+
+
+class TestClassificationIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = ClassificationIndex(
+            ["Expense|Travel|Fuel", "Expense|Travel|Train", "Expense|Food|Snacks", "Transfer|A/c to A/c|Travel Fund"],
+            usage_counts={"Expense|Travel|Train": 5, "Expense|Food|Snacks": 9},
+        )
+
+    def test_substring_match_ignores_case(self):
+        self.assertEqual(
+            set(self.index.search("TRAV")),
+            {"Expense|Travel|Fuel", "Expense|Travel|Train", "Transfer|A/c to A/c|Travel Fund"},
+        )
+        self.assertEqual(self.index.search("l|f"), ["Expense|Travel|Fuel"])
+        self.assertEqual(self.index.search("travel|fuelx"), [])
+        self.assertEqual(self.index.search("q"), [])
+
+    def test_ranking(self):
+        # Usage count first, then alphabetical
+        self.assertEqual(self.index.search(""), [
+            "Expense|Food|Snacks", "Expense|Travel|Train", "Expense|Travel|Fuel", "Transfer|A/c to A/c|Travel Fund",
+        ])
+        # Prefix matches come before more frequently used ones
+        self.assertEqual(self.index.search("tr", limit=2), ["Transfer|A/c to A/c|Travel Fund", "Expense|Travel|Train"])
+
+    def test_from_sources(self):
+        txn_store = TxnStore(":memory:", "unused.csv")
+        self.addCleanup(txn_store.close)
+        txn_store.store_transactions([
+            {"txn-source": "S", "txn-date": "2024-01-0%d" % day, "narration": "N%d" % day, "txn-amount": 10.0 * day,
+             "credit-indicator": "", "raw-data": "raw %d" % day, "txn-type": "Expense", "category": "Cash",
+             "sub-category": "ATM"}
+            for day in range(1, 4)
+        ])
+        metadata = ClassifierMetadata("unused.csv", [("Expense", "Food", "Snacks"), ("Income", "Salary", None)])
+        index = ClassificationIndex.from_sources(metadata, txn_store)
+        self.assertEqual(index.search(""), ["Expense|Cash|ATM", "Expense|Food|Snacks"])
+
+    def test_completer(self):
+        completer = CustomTransactionCompleter(self.index)
+        completions = list(completer.get_completions(Document("snack"), None))
+        self.assertEqual([completion.text for completion in completions], ["Expense|Food|Snacks"])
+        self.assertEqual(completions[0].start_position, -5)
+        # The predefined classifications are used without an index
+        self.assertTrue(list(CustomTransactionCompleter().get_completions(Document("Fuel"), None)))
+
+
+if __name__ == '__main__':
+    unittest.main()
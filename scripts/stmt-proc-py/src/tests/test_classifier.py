@@ -1,13 +1,19 @@
 import os
 import sys
+import shutil
+import tempfile
+import numpy as np
 import pandas as pd
 import unittest
+from unittest import mock
 
 # Add the src directory to sys.path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
 
-from store.txn_store import TxnStore
+from store.txn_store import TxnStore, TxnState
 from classifier.classifier import Classifier
+from classifier.auto_classifier import AutoClassifier
+from classifier.rules import ClassificationRules
 
 class TestClassifier(unittest.TestCase):
     """
@@ -40,6 +46,146 @@ class TestClassifier(unittest.TestCase):
         if os.path.exists(self.test_csv_file):
             print(f"Removing test CSV file: {self.test_csv_file}")
             os.remove(self.test_csv_file)
-    
+
+    def _feature_strings(self):
+        rng = np.random.default_rng(7)
+        payees = ["upi grocery mart", "upi fuel station", "neft salary acme", "atm withdrawal", "pos online shopping",
+                  "ach insurance premium", "imps rent payment", "upi coffee house"]
+        return pd.Series([
+            f"{payees[rng.integers(len(payees))]} {rng.integers(3)} debit {rng.choice(['1-100', '101-500'])} 1-7"
+            for _ in range(300)
+        ])
+
+    def test_distinct_vectorization_matches_all_rows(self):
+        """
+        Vectorizing the distinct strings with weighted document frequencies gives the vectors of all rows.
+        """
+        raw_data = self._feature_strings()
+        full = self.classifier._vectorize_transactions(raw_data.tolist()).toarray()
+
+        codes, uniques = pd.factorize(raw_data)
+        self.classifier.vectorizer = None
+        distinct = self.classifier._vectorize_transactions(list(uniques), np.bincount(codes)).toarray()
+        np.testing.assert_allclose(distinct[codes], full, atol=1e-12)
+
+    def test_distinct_clustering_matches_all_rows(self):
+        """
+        Clustering the distinct strings weighted by their counts gives the clusters of all rows.
+        """
+        raw_data = self._feature_strings()
+        full = self.classifier._cluster_transactions(self.classifier._vectorize_transactions(raw_data.tolist()))
+        distinct = self.classifier._cluster_distinct(raw_data)
+        # Same partition of the transactions, up to the numbering of the clusters
+        self.assertEqual(pd.crosstab(full, distinct).astype(bool).sum(axis=1).max(), 1)
+        self.assertEqual(pd.crosstab(distinct, full).astype(bool).sum(axis=1).max(), 1)
+
+    def test_predict_distinct_matches_all_rows(self):
+        """
+        AutoClassifier predictions made once per distinct string match the per-row predictions.
+        """
+        from sklearn.pipeline import Pipeline
+        from sklearn.compose import ColumnTransformer
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.multioutput import MultiOutputClassifier
+
+        raw_data = self._feature_strings()
+        X = pd.DataFrame({'raw_data': raw_data})
+        y = (raw_data.str.startswith("upi")).astype(int).values.reshape(-1, 1)
+        auto_classifier = AutoClassifier(self.txn_store)
+        auto_classifier.pipeline = Pipeline([
+            ('preprocessor', ColumnTransformer(transformers=[('text', TfidfVectorizer(), 'raw_data')])),
+            ('clf', MultiOutputClassifier(RandomForestClassifier(n_estimators=10, random_state=42)))
+        ]).fit(X, y)
+        np.testing.assert_array_equal(auto_classifier._predict_distinct(X), auto_classifier.pipeline.predict(X))
+
+        preds, confidence = auto_classifier._predict_proba_distinct(X)
+        np.testing.assert_array_equal(preds, auto_classifier.pipeline.predict(X))
+        np.testing.assert_allclose(confidence, auto_classifier.pipeline.predict_proba(X)[0].max(axis=1))
+
+    def test_prepare_raw_data_ranges(self):
+        """
+        Amount and date ranges computed on numeric columns match the per-value lookup on strings.
+        """
+        amounts = [0, 1, 100, 100.5, 101, 999999.0, 1000000, 1000001, -5.0, float("nan")]
+        df = pd.DataFrame({
+            "raw_data": [str(n) for n in range(len(amounts))],
+            "txn_amount": amounts,
+            "txn_date": ["2025-04-01", "2025-04-07", "2025-04-08", "2025-04-14", "2025-04-15",
+                         "2025-04-21", "2025-04-22", "2025-04-31", "2025-04-30", None],
+            "credit_indicator": ["Yes", "", None, "Yes", "", "", "", "", "", ""],
+            "narration": ["UPI-SHOP_1"] * len(amounts),
+        })
+        auto_classifier = AutoClassifier(self.txn_store)
+        numeric = auto_classifier._prepare_raw_data(df.copy())
+        as_text = auto_classifier._prepare_raw_data(df.assign(txn_amount=df["txn_amount"].astype(str)))
+        self.assertEqual(numeric["amount_range"].tolist(), as_text["amount_range"].tolist())
+        self.assertEqual(numeric["amount_range"].tolist()[:4], ["1000001+", "1-100", "1-100", "1000001+"])
+        self.assertEqual(numeric["date_range"].tolist(), ["1-7", "1-7", "8-14", "8-14", "15-21", "15-21", "22-31", "unknown", "22-31", "unknown"])
+        self.assertEqual(numeric.loc[0, "raw_data"], "upi shop 1 credit 1000001+ 1-7")
+        self.assertEqual(len(auto_classifier._prepare_raw_data(df.head(0))), 0)
+
+    def test_auto_accept(self):
+        """
+        Confident predictions are accepted in bulk, the others are left for review in the review file.
+        """
+        def transaction(n, narration, txn_type="", category="", sub_category=""):
+            return {"raw-data": f"{n}|{narration}", "txn-source": "500100", "txn-date": "2025-04-01", "narration": narration,
+                    "txn-amount": 100.0, "credit-indicator": "", "txn-type": txn_type, "category": category,
+                    "sub-category": sub_category}
+
+        labelled = [transaction(n, "UPI-GROCERY MART", "Expense", "Food", "Groceries") for n in range(10)] + \
+                   [transaction(n, "UPI-FUEL STATION", "Expense", "Travel", "Fuel") for n in range(10, 20)]
+        self.txn_store.store_transactions(labelled + [
+            transaction(20, "UPI-GROCERY MART"),
+            transaction(21, "UPI-NEW SHOP"),
+        ])
+
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        review_file = os.path.join(tmp_dir, "review.csv")
+        auto_classifier = AutoClassifier(self.txn_store)
+        auto_classifier.rules = ClassificationRules([])
+
+        # Predictions are streamed in batches, in narration order
+        export_file = os.path.join(tmp_dir, "export.csv")
+        auto_classifier.export_classification_to_csv(export_file, batch_size=1)
+        export_df = pd.read_csv(export_file)
+        self.assertEqual(export_df["raw_data"].tolist(), ["20|UPI-GROCERY MART", "21|UPI-NEW SHOP"])
+        self.assertEqual(export_df.loc[0, "sub_category"], "Groceries")
+        self.assertEqual(export_df.loc[0, "state"], TxnState.PENDING_REVIEW)
+
+        self.assertEqual(auto_classifier.auto_accept(0.9, review_file, batch_size=1), (1, 1))
+
+        df = self.txn_store.get_transactions().set_index("raw_data")
+        self.assertEqual(df.loc["20|UPI-GROCERY MART", "sub_category"], "Groceries")
+        self.assertEqual(df.loc["20|UPI-GROCERY MART", "state"], TxnState.ACCEPTED)
+        self.assertEqual(df.loc["21|UPI-NEW SHOP", "txn_type"], "")
+        review_df = pd.read_csv(review_file)
+        self.assertEqual(review_df["raw_data"].tolist(), ["21|UPI-NEW SHOP"])
+        self.assertLess(review_df.loc[0, "confidence"], 0.9)
+
+        # The low-confidence transaction is neither trained on nor skipped by the next run
+        self.assertEqual(auto_classifier.auto_accept(0.9, review_file, batch_size=1), (0, 1))
+        df = self.txn_store.get_transactions().set_index("raw_data")
+        self.assertEqual(df.loc["21|UPI-NEW SHOP", "txn_type"], "")
+        self.assertNotIn("21|UPI-NEW SHOP", self.txn_store.get_labelled_transactions()["raw_data"].tolist())
+        self.assertEqual(pd.read_csv(review_file)["raw_data"].tolist(), ["21|UPI-NEW SHOP"])
+
+    def test_import_classification_saves_metadata_when_a_row_fails(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        csv_file = os.path.join(tmp_dir, "import.csv")
+        with open(csv_file, "w") as f:
+            f.write("2024-01-05,UPI-GROCERY MART,250.00,dr,Expense,Food,Groceries\n")
+            f.write("2024-01-06,UPI-FUEL STATION,not a number,dr,Expense,Transport,Fuel\n")
+        self.classifier._save_classifier_metadata = mock.Mock()
+        with mock.patch("builtins.input", side_effect=["0", "1", "2", "3", "4", "5", "6"]):
+            with self.assertRaises(ValueError):
+                self.classifier.import_classification(csv_file)
+        self.classifier._save_classifier_metadata.assert_called_once_with()
+        self.assertIn(("Expense", "Food", "Groceries"), self.classifier.classifier_metadata)
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
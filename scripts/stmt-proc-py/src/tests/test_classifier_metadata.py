@@ -0,0 +1,68 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import pandas as pd
+
+# Add the src directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from classifier.classifier_metadata import ClassifierMetadata
+
+class TestClassifierMetadata(unittest.TestCase):
+    """
+    Unit tests for the ClassifierMetadata class.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.metadata_file = os.path.join(self.tmp_dir, "classifier_metadata.csv")
+        with open(self.metadata_file, "w") as f:
+            f.write("txn_type|category|sub_category\n")
+            f.write("Expense|Food|Groceries\n")
+            f.write("Expense|Food|Restaurant\n")
+            f.write("Income|Salary|Employer\n")
+            f.write("Expense|Shopping|Groceries\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_lookups(self):
+        metadata = ClassifierMetadata.load(self.metadata_file)
+        self.assertEqual(len(metadata), 4)
+        self.assertIn(("Income", "Salary", "Employer"), metadata)
+        self.assertEqual(metadata.txn_types(), ["Expense", "Income"])
+        self.assertEqual(metadata.categories(), ["Food", "Salary", "Shopping"])
+        self.assertEqual(metadata.sub_categories(), ["Employer", "Groceries", "Restaurant"])
+        self.assertEqual(metadata.categories_for_sub_category("Groceries"), ["Food", "Shopping"])
+        self.assertEqual(metadata.categories_for_sub_category("Unknown"), [])
+        self.assertEqual(metadata.txn_type_for_category("Salary"), "Income")
+        self.assertIsNone(metadata.txn_type_for_category("Unknown"))
+
+    def test_add_and_flush_appends_once(self):
+        metadata = ClassifierMetadata.load(self.metadata_file)
+        self.assertFalse(metadata.add("Expense", "Food", "Groceries"))
+        self.assertTrue(metadata.add("Expense", "Travel", "Taxi"))
+        self.assertTrue(metadata.add("Expense", "Travel", "Train"))
+        self.assertEqual(metadata.categories_for_sub_category("Taxi"), ["Travel"])
+        metadata.flush()
+        metadata.flush()
+
+        df = pd.read_csv(self.metadata_file, delimiter="|")
+        self.assertEqual(len(df), 6)
+        self.assertEqual(len(ClassifierMetadata.load(self.metadata_file)), 6)
+
+    def test_flush_writes_header_for_new_file(self):
+        new_file = os.path.join(self.tmp_dir, "new_metadata.csv")
+        metadata = ClassifierMetadata.load(new_file)
+        self.assertEqual(len(metadata), 0)
+        metadata.add("Income", "Interest", "Savings")
+        metadata.flush()
+
+        reloaded = ClassifierMetadata.load(new_file)
+        self.assertEqual(reloaded.txn_types(), ["Income"])
+        self.assertEqual(reloaded.categories_for_sub_category("Savings"), ["Interest"])
+
+if __name__ == '__main__':
+    unittest.main()
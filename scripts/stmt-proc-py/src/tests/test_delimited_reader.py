@@ -0,0 +1,74 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+# Add the src directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from benchmarks.statement_generator import write_hdfc_sa_delimited
+from processors.delimited_reader import is_delimited, iter_transaction_chunks, read_probe
+from processors.hdfc_bank_acct_csv_processor import HdfcBankAcctCsvStatementProcessor
+from processors.statement_processor_provider import StatementProcessorProvider
+from store.txn_store import TxnStore
+
+
+class TestDelimitedReader(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.txn_store = TxnStore(":memory:", os.path.join(self.tmp_dir, "transactions.csv"))
+
+    def tearDown(self):
+        self.txn_store.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def _write(self, name, content):
+        file_path = os.path.join(self.tmp_dir, name)
+        with open(file_path, "w") as f:
+            f.write(content)
+        return file_path
+
+    def test_is_delimited(self):
+        self.assertTrue(is_delimited("500100_statement.CSV"))
+        self.assertTrue(is_delimited("500100_statement.txt"))
+        self.assertFalse(is_delimited("500100_statement.xls"))
+
+    def test_chunks_stop_at_blank_line(self):
+        file_path = self._write("statement.csv", "Date ,Narration\n01/04/25 ,A\n02/04/25 ,B\n03/04/25 ,C\n\nSummary ,D\n")
+        chunks = list(iter_transaction_chunks(file_path, 1, {0: "txn_date", 1: "narration"}, "txn_date", chunk_size=2))
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 1])
+        self.assertEqual(chunks[1]["narration"].tolist(), ["C"])
+
+    def test_detect_and_parse_delimited_statement(self):
+        file_path = os.path.join(self.tmp_dir, "500100_statement.csv")
+        write_hdfc_sa_delimited(file_path, 25)
+
+        processor, probe = StatementProcessorProvider.detect_processor(file_path, self.txn_store)
+        self.assertIsInstance(processor, HdfcBankAcctCsvStatementProcessor)
+        self.assertEqual(probe.iloc[1, 0], "Date")
+
+        processor.CHUNK_SIZE = 10
+        self.assertEqual(processor.parse_statement(file_path, probe), 25)
+        self.assertEqual(processor.parse_statement(file_path), 25)
+
+        rows = self.txn_store.get_connection().execute(
+            "SELECT txn_source, txn_amount, credit_indicator, raw_data FROM transactions").fetchall()
+        self.assertEqual(len(rows), 25)
+        txn_source, txn_amount, credit_indicator, raw_data = rows[0]
+        self.assertEqual(txn_source, "500100")
+        self.assertGreater(txn_amount, 0)
+        fields = raw_data.split("|")
+        self.assertEqual(len(fields), 6)
+        # The unused debit or credit side is missing, as in the XLS statements
+        self.assertEqual(fields[3 if credit_indicator else 4], "nan")
+
+    def test_delimited_probe_is_not_matched_by_workbook_processors(self):
+        file_path = self._write("statement.csv", "Date,Narration,Chq./Ref.No.\n01/04/25,A,1\n")
+        with self.assertRaises(ValueError):
+            StatementProcessorProvider.detect_processor_for_frame(read_probe(file_path), self.txn_store, delimited=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
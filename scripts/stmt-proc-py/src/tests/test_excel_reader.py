@@ -0,0 +1,94 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import pandas as pd
+
+# Add the src directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+import main
+from benchmarks.statement_generator import hdfc_cc_frame, hdfc_sa_frame, write_statement
+from processors.excel_reader import find_header_row, read_probe, read_transaction_rows
+from processors.statement_processor_provider import StatementProcessorProvider
+from store.txn_store import TxnStore
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+
+@unittest.skipIf(openpyxl is None, "openpyxl is required to write test workbooks")
+class TestExcelReader(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.txn_store = TxnStore(":memory:", os.path.join(self.tmp_dir, "transactions.csv"))
+
+    def tearDown(self):
+        self.txn_store.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def _write(self, name, frame):
+        file_path = os.path.join(self.tmp_dir, name)
+        write_statement(frame, file_path)
+        return file_path
+
+    def _raw_data(self):
+        cursor = self.txn_store.get_connection().execute("SELECT raw_data FROM transactions")
+        return sorted(row[0] for row in cursor.fetchall())
+
+    def test_find_header_row(self):
+        probe = pd.DataFrame([["Title", None], ["Date", "Narration"], ["01/04/25", "UPI"]])
+        self.assertEqual(find_header_row(probe, 0, "Date"), 1)
+        with self.assertRaises(ValueError):
+            find_header_row(probe, 1, "Date")
+
+    def test_read_transaction_rows_stops_at_summary(self):
+        file_path = self._write("sa.xlsx", hdfc_sa_frame(25))
+        df = read_transaction_rows(file_path, 22, {0: "txn_date", 1: "narration"}, stop_column="txn_date")
+        self.assertEqual(list(df.columns), ["txn_date", "narration"])
+        self.assertEqual(len(df), 25)
+
+    def test_hdfc_sa_raw_data_matches_full_read(self):
+        file_path = self._write("500100_sa.xlsx", hdfc_sa_frame(40))
+        processor, probe = StatementProcessorProvider.detect_processor(file_path, self.txn_store)
+        processor.parse_statement(file_path, probe)
+
+        # Raw data (and so the row ids) as produced by reading the whole sheet
+        df = pd.read_excel(file_path, header=None)
+        df = df.iloc[22:62]
+        expected = sorted(f"{r[0]}|{r[1]}|{r[2]}|{r[4]}|{r[5]}|{r[6]}" for r in df.itertuples(index=False))
+        self.assertEqual(self._raw_data(), expected)
+
+    def test_hdfc_cc_raw_data_matches_full_read(self):
+        file_path = self._write("437546_cc.xlsx", hdfc_cc_frame(40))
+        processor, probe = StatementProcessorProvider.detect_processor(file_path, self.txn_store)
+        self.assertEqual(len(probe), len(read_probe(file_path)))
+        processor.parse_statement(file_path, probe)
+
+        df = pd.read_excel(file_path, header=None)
+        df = df.iloc[2:42]
+        expected = sorted(f"{r[17]}|{r[21]}|{r[48]}|{r[54]}" for r in df.itertuples(index=False))
+        self.assertEqual(self._raw_data(), expected)
+
+    def test_process_file_skips_unchanged_file(self):
+        file_path = self._write("500100_sa.xlsx", hdfc_sa_frame(10))
+        with mock.patch.object(StatementProcessorProvider, "detect_processor",
+                               wraps=StatementProcessorProvider.detect_processor) as detect:
+            main.process_file(file_path, self.txn_store)
+            main.process_file(file_path, self.txn_store)
+            self.assertEqual(detect.call_count, 1)
+
+            main.process_file(file_path, self.txn_store, force=True)
+            self.assertEqual(detect.call_count, 2)
+
+        cursor = self.txn_store.get_connection().execute("SELECT statement_type, row_count FROM processed_files")
+        self.assertEqual(cursor.fetchall(), [("hdfc-sa", 10)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import json
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+# Add the src directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+import main
+from benchmarks.statement_generator import write_hdfc_sa_delimited
+from store.txn_store import TxnStore
+from utils import instrumentation
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def setUp(self):
+        instrumentation.reset()
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+        instrumentation.reset()
+
+    def test_stages_accumulate(self):
+        for rows in (10, 20):
+            with instrumentation.stage("store.insert") as s:
+                s.rows = rows
+        with self.assertRaises(KeyError):
+            with instrumentation.stage("classifier.cluster"):
+                raise KeyError("failed stages are recorded too")
+
+        @instrumentation.timed("classifier.vectorize")
+        def vectorize(values):
+            """Vectorize the values."""
+            return values
+
+        self.assertEqual(vectorize([1]), [1])
+        self.assertEqual(vectorize.__doc__, "Vectorize the values.")
+        instrumentation.count("files.processed")
+        instrumentation.count("files.processed", 2)
+        instrumentation.snapshot("end")
+
+        report = instrumentation.report()
+        self.assertEqual(report["stages"]["store.insert"]["calls"], 2)
+        self.assertEqual(report["stages"]["store.insert"]["rows"], 30)
+        self.assertIn("rows_per_second", report["stages"]["store.insert"])
+        self.assertEqual(report["stages"]["classifier.cluster"]["calls"], 1)
+        self.assertEqual(report["stages"]["classifier.vectorize"]["rows"], 0)
+        self.assertEqual(report["counters"], {"files.processed": 3})
+        self.assertEqual([snapshot["label"] for snapshot in report["snapshots"]], ["end"])
+
+    def test_run_report(self):
+        file_path = os.path.join(self.tmp_dir, "statement.csv")
+        write_hdfc_sa_delimited(file_path, 50)
+        txn_store = TxnStore(":memory:", os.path.join(self.tmp_dir, "transactions.csv"))
+        self.addCleanup(txn_store.close)
+        main.process_file(file_path, txn_store)
+        main.process_file(file_path, txn_store)
+
+        report_file = os.path.join(self.tmp_dir, "report.json")
+        instrumentation.write_report(report_file)
+        with open(report_file) as file:
+            report = json.load(file)
+        self.assertEqual(report["stages"]["parse.hdfc-sa-csv"]["rows"], 50)
+        self.assertEqual(report["stages"]["store.insert"]["rows"], 50)
+        self.assertIn("parse.detect", report["stages"])
+        self.assertEqual(report["counters"], {"files.processed": 1, "files.skipped": 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
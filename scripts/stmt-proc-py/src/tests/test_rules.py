@@ -0,0 +1,126 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from types import SimpleNamespace
+import numpy as np
+import pandas as pd
+
+# Add the src directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from classifier.rules import ClassificationRules
+from classifier.auto_classifier import AutoClassifier
+from store.txn_store import TxnStore
+
+
+class TestClassificationRules(unittest.TestCase):
+
+    def setUp(self):
+        self.rules = ClassificationRules([
+            ("exact", "NEFT CR-ACME CORP-SALARY", "Income", "Salary", "Acme"),
+            ("prefix", "ATW-", "Expense", "Cash", "ATM"),
+            ("regex", r"\bSIP\b|MUTUAL FUND", "Investment", "Mutual Fund", "SIP"),
+            ("prefix", "ACH D-", "Expense", "Insurance", "Term"),
+        ])
+
+    def test_match_types(self):
+        narrations = pd.Series([
+            " neft cr-acme corp-salary ",
+            "ATW-512345XXXXXX1234-S1ANPN01",
+            "ACH D- ICICI PRU SIP-123",
+            "UPI-GROCERY MART",
+            None,
+        ], index=[10, 11, 12, 13, 14])
+        self.assertEqual(self.rules.classify(narrations).to_dict(), {
+            10: "Income|Salary|Acme",
+            11: "Expense|Cash|ATM",
+            # The regex rule comes before the prefix rule in file order
+            12: "Investment|Mutual Fund|SIP",
+            13: None,
+            14: None,
+        })
+
+    def test_prefix_matches_start_only(self):
+        self.assertIsNone(self.rules.classify(pd.Series(["UPI-ATW-SHOP"]))[0])
+
+    def test_invalid_rules(self):
+        with self.assertRaises(ValueError):
+            ClassificationRules([("contains", "UPI", "Expense", "Shopping", "Amazon")])
+        with self.assertRaises(ValueError):
+            ClassificationRules([("regex", "(UPI", "Expense", "Shopping", "Amazon")])
+
+    def test_regex_rules_that_cannot_be_combined(self):
+        for pattern in (r"(?i)salary", r"(\d+)-\1", r"(A)?(?(1)B|C)"):
+            with self.subTest(pattern=pattern), self.assertRaisesRegex(ValueError, "not supported"):
+                ClassificationRules([
+                    ("prefix", "ATW-", "Expense", "Cash", "ATM"),
+                    ("regex", pattern, "Income", "Salary", "Acme"),
+                ])
+        with self.assertRaisesRegex(ValueError, "cannot be combined"):
+            ClassificationRules([
+                ("regex", r"(?P<amount>\d+) SIP", "Investment", "Mutual Fund", "SIP"),
+                ("regex", r"(?P<amount>\d+) EMI", "Expense", "Loan", "EMI"),
+            ])
+
+    def test_regex_rules_with_literal_digits_and_named_groups(self):
+        rules = ClassificationRules([
+            ("regex", r"(?P<ref>\d+)-(?P=ref)", "Expense", "Transfer", "Self"),
+            ("regex", r"[\1]X|\0", "Expense", "Cash", "ATM"),
+            ("regex", r"(?s:SALARY)", "Income", "Salary", "Acme"),
+        ])
+        # '[\1]' is the octal escape of chr(1) in a character class, not a backreference
+        self.assertEqual(rules.classify(pd.Series(["IMPS 12-12", "\x01X", "salary"])).tolist(),
+                         ["Expense|Transfer|Self", "Expense|Cash|ATM", "Income|Salary|Acme"])
+
+    def test_load(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        rules_file = os.path.join(tmp_dir, "classifier_rules.csv")
+        with open(rules_file, "w") as f:
+            f.write("match_type|pattern|txn_type|category|sub_category\n")
+            f.write("prefix|ATW-|Expense|Cash|ATM\n")
+            f.write('regex|"SIP|MUTUAL FUND"|Investment|Mutual Fund|SIP\n')
+        rules = ClassificationRules.load(rules_file)
+        self.assertEqual(len(rules), 2)
+        self.assertEqual(rules.classify(pd.Series(["HDFC MUTUAL FUND"]))[0], "Investment|Mutual Fund|SIP")
+        self.assertEqual(len(ClassificationRules.load(os.path.join(tmp_dir, "missing.csv"))), 0)
+
+    def test_model_only_sees_the_residue(self):
+        txn_store = TxnStore(":memory:", "../../test_output/test_rules.csv")
+        self.addCleanup(txn_store.close)
+        txn_store.store_transactions([
+            {"raw-data": f"{n}|{narration}", "txn-source": "500100", "txn-date": "2025-04-01", "narration": narration,
+             "txn-amount": 100.0, "credit-indicator": "", "txn-type": "", "category": "", "sub-category": ""}
+            for n, narration in enumerate(["ATW-1234-PUNE", "UPI-GROCERY MART", "ATW-5678-MUMBAI"])
+        ])
+
+        class Pipeline:
+            def __init__(self):
+                self.rows = 0
+
+            named_steps = {"clf": SimpleNamespace(estimators_=[SimpleNamespace(classes_=np.array([0]))])}
+
+            def predict_proba(self, X):
+                self.rows += len(X)
+                return [np.ones((len(X), 1))]
+
+        class Encoder:
+            def inverse_transform(self, labels):
+                return ["Expense|Groceries|Groceries"] * len(labels)
+
+        auto_classifier = AutoClassifier(txn_store)
+        auto_classifier.rules = self.rules
+        auto_classifier.pipeline, auto_classifier.classification_encoder = Pipeline(), Encoder()
+        df = auto_classifier.classify(-1).set_index("narration")
+        self.assertEqual(auto_classifier.pipeline.rows, 1)
+        self.assertEqual(df.loc["UPI-GROCERY MART", "classification"], "Expense|Groceries|Groceries")
+        self.assertEqual(df.loc["UPI-GROCERY MART", "classified_by"], "model")
+        self.assertEqual(df.loc["UPI-GROCERY MART", "confidence"], 1.0)
+        self.assertEqual(df.loc["ATW-1234-PUNE", "classification"], "Expense|Cash|ATM")
+        self.assertEqual(df.loc["ATW-1234-PUNE", "classified_by"], "rule")
+
+
+if __name__ == '__main__':
+    unittest.main()
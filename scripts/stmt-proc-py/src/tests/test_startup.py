@@ -0,0 +1,65 @@
+import os
+import subprocess
+import sys
+import unittest
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../"))
+
+# Modules that are expensive to import and only needed by some operations
+HEAVY_MODULES = ("sklearn", "scipy", "prompt_toolkit")
+
+
+class TestStartup(unittest.TestCase):
+    """
+    Import-time guards for the command line operations.
+
+    Each test runs the imports an operation needs in a fresh interpreter with
+    'python -X importtime' and checks that the heavy modules it does not use are
+    never loaded. A failure message includes the cumulative import time.
+    """
+
+    def _import_profile(self, statement):
+        """
+        Run the statement with -X importtime from the src directory.
+
+        Returns the set of imported top-level packages and the total import time in milliseconds.
+        """
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", statement],
+            cwd=SRC_DIR, capture_output=True, text=True, check=True
+        )
+        packages = set()
+        total_us = 0
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "[us]" in line:
+                continue
+            _, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+            packages.add(name.split(".")[0])
+            # Top-level imports are not indented; their cumulative time includes nested imports
+            if not line.split("|")[2].startswith("  "):
+                total_us += int(cumulative)
+        return packages, total_us / 1000
+
+    def _assert_not_imported(self, operation, statement, modules=HEAVY_MODULES):
+        packages, total_ms = self._import_profile(statement)
+        for module in modules:
+            self.assertNotIn(module, packages, f"'{operation}' should not import {module} (imports took {total_ms:.1f} ms)")
+
+    def test_process_imports(self):
+        self._assert_not_imported("process", "import main")
+
+    def test_import_classification_imports(self):
+        self._assert_not_imported(
+            "import",
+            "import main; from classifier.classifier import Classifier"
+        )
+
+    def test_classify_csv_import_imports(self):
+        self._assert_not_imported(
+            "classify-csv-import",
+            "import main; from classifier.auto_classifier import AutoClassifier"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
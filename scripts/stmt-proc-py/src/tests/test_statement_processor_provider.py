@@ -1,11 +1,13 @@
 import os
 import sys
 import unittest
+import pandas as pd
 
 # Add the src directory to sys.path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
 
 from processors.statement_processor_provider import StatementProcessorProvider
+from processors.statement_processor import StatementProcessor
 from processors.hdfc_bank_acct_processor import HdfcBankAcctStatementProcessor
 from processors.hdfc_credit_card_processor import HdfcCreditCardStatementProcessor
 from store.txn_store import TxnStore
@@ -55,6 +57,55 @@ class TestStatementProcessorProvider(unittest.TestCase):
         self.assertIsNotNone(processor.txn_store)
         self.assertEqual(processor.txn_store, self.txn_store)
 
+    def test_get_unsupported_processor(self):
+        with self.assertRaises(ValueError):
+            self.provider.get_processor("unknown", self.txn_store)
+
+    def test_detect_hdfc_bank_acct_statement(self):
+        frame = pd.DataFrame([
+            ["HDFC BANK Ltd.", None, None],
+            [None, None, None],
+            ["Date", "Narration", "Chq./Ref.No."],
+            ["********", "********", "********"],
+            ["01/04/25", "UPI-SHOP", "0000123"],
+        ])
+        processor = self.provider.detect_processor_for_frame(frame, self.txn_store)
+        self.assertIsInstance(processor, HdfcBankAcctStatementProcessor)
+
+    def test_detect_hdfc_credit_card_statement(self):
+        frame = pd.DataFrame([
+            ["Statement", None, None],
+            [None, "Transaction type", "Primary / Addon Customer Name"],
+            [None, "Domestic", "CUSTOMER"],
+        ])
+        processor = self.provider.detect_processor_for_frame(frame, self.txn_store)
+        self.assertIsInstance(processor, HdfcCreditCardStatementProcessor)
+
+    def test_detect_unknown_statement(self):
+        frame = pd.DataFrame([["Some", "other"], ["bank", "statement"]])
+        with self.assertRaises(ValueError):
+            self.provider.detect_processor_for_frame(frame, self.txn_store)
+
+    def test_register_processor(self):
+        @StatementProcessorProvider.register("test-bank")
+        class TestBankStatementProcessor(StatementProcessor):
+            @classmethod
+            def matches(cls, probe):
+                return (probe[0] == "TEST BANK").any()
+
+            def statement_type(self):
+                return "test-bank"
+
+            def parse_statement(self, file_path, df=None):
+                pass
+
+        try:
+            self.assertIn("test-bank", StatementProcessorProvider.statement_types())
+            processor = self.provider.detect_processor_for_frame(pd.DataFrame([["TEST BANK"]]), self.txn_store)
+            self.assertIsInstance(processor, TestBankStatementProcessor)
+        finally:
+            del StatementProcessorProvider._processors["test-bank"]
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
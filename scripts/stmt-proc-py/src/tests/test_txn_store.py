@@ -1,3 +1,6 @@
+import contextlib
+import hashlib
+import io
 import os
 import sys
 import sqlite3
@@ -7,7 +10,7 @@ import unittest
 # Add the src directory to sys.path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
 
-from store.txn_store import TxnStore
+from store.txn_store import KeyMode, TxnState, TxnStore, row_keys
 
 
 class TestTxnStore(unittest.TestCase):
@@ -127,6 +130,198 @@ class TestTxnStore(unittest.TestCase):
         self.assertEqual(df.iloc[0]["txn_amount"], 100.0)
         self.assertEqual(df.iloc[0]["credit_indicator"], "Yes")
 
+    def test_processed_files_ledger(self):
+        """
+        Test recording and retrieving processed statement files.
+        """
+        self.assertIsNone(self.txn_store.get_processed_file("f00d"))
+
+        self.txn_store.record_processed_file("f00d", "statement.xls", "hdfc-sa", 42, 0.5)
+        processed = self.txn_store.get_processed_file("f00d")
+        self.assertEqual(processed["file_name"], "statement.xls")
+        self.assertEqual(processed["statement_type"], "hdfc-sa")
+        self.assertEqual(processed["row_count"], 42)
+        self.assertIsNotNone(processed["processed_at"])
+
+        # Reprocessing replaces the entry
+        self.txn_store.record_processed_file("f00d", "statement.xls", "hdfc-sa", 43, 0.4)
+        self.assertEqual(self.txn_store.get_processed_file("f00d")["row_count"], 43)
+
+    def _sample_transactions(self, count):
+        return [
+            {
+                "raw-data": f"2025-04-{day % 28 + 1:02d}|UPI-MERCHANT {day}|{day}.5|",
+                "txn-source": "500100",
+                "txn-date": f"2025-04-{day % 28 + 1:02d}",
+                "narration": f"UPI-MERCHANT {day}",
+                "txn-amount": day + 0.5,
+                "credit-indicator": "",
+                "txn-type": "",
+                "category": "",
+                "sub-category": ""
+            }
+            for day in range(count)
+        ]
+
+    def test_row_keys(self):
+        """
+        Test that every key mode represents the MD5 digest of raw_data.
+        """
+        raw_data = "2025-04-01|Test Narration|100.0|Cr"
+        text_key = row_keys([raw_data], KeyMode.TEXT)[0]
+        self.assertEqual(text_key, hashlib.md5(raw_data.encode()).hexdigest())
+        self.assertEqual(row_keys([raw_data], KeyMode.BLOB)[0].hex(), text_key)
+        self.assertEqual(row_keys([raw_data], KeyMode.INT64)[0], int.from_bytes(bytes.fromhex(text_key[:16]), "big", signed=True))
+
+    def test_compact_key_modes(self):
+        """
+        Test storing, reading and updating transactions with compact keys and compressed raw_data.
+        """
+        for key_mode in (KeyMode.BLOB, KeyMode.INT64):
+            for compress in (False, True):
+                with self.subTest(key_mode=key_mode, compress=compress):
+                    txn_store = TxnStore(":memory:", self.test_csv_file, key_mode=key_mode, compress_raw_data=compress)
+                    transactions = self._sample_transactions(5)
+                    txn_store.store_transactions(transactions)
+                    txn_store.store_transactions(transactions)
+
+                    df = txn_store.get_transactions()
+                    self.assertEqual(sorted(df["raw_data"]), sorted(t["raw-data"] for t in transactions))
+
+                    txn_store.update_transactions([transactions[0]["raw-data"]], "Expense", "Food", "Groceries", TxnState.ACCEPTED)
+                    df = txn_store.get_transactions()
+                    updated = df[df["raw_data"] == transactions[0]["raw-data"]].iloc[0]
+                    self.assertEqual((updated["category"], updated["state"]), ("Food", TxnState.ACCEPTED))
+                    txn_store.close()
+
+    def test_settings_are_kept_by_the_database(self):
+        """
+        Test that an existing database keeps its key mode and rejects different settings.
+        """
+        db_file = "../../test_output/test_key_mode.db"
+        self.addCleanup(lambda: os.path.exists(db_file) and os.remove(db_file))
+        TxnStore(db_file, self.test_csv_file, key_mode=KeyMode.INT64).close()
+
+        txn_store = TxnStore(db_file, self.test_csv_file)
+        self.assertEqual(txn_store.key_mode, KeyMode.INT64)
+        txn_store.close()
+        with self.assertRaises(ValueError):
+            TxnStore(db_file, self.test_csv_file, key_mode=KeyMode.BLOB)
+
+    def test_migrate(self):
+        """
+        Test migrating text keys to compact keys with compressed raw_data, and back.
+        """
+        transactions = self._sample_transactions(20)
+        self.txn_store.store_transactions(transactions)
+        self.txn_store.update_transactions([transactions[1]["raw-data"]], "Income", "Salary", "", TxnState.ACCEPTED)
+        expected = self.txn_store.get_transactions().sort_values("raw_data").reset_index(drop=True)
+
+        self.txn_store.migrate(KeyMode.BLOB, compress_raw_data=True)
+        conn = self.txn_store.get_connection()
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM transactions WHERE raw_data IS NOT NULL").fetchone()[0], 0)
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM raw_data_store").fetchone()[0], 20)
+        pd.testing.assert_frame_equal(self.txn_store.get_transactions().sort_values("raw_data").reset_index(drop=True), expected)
+        self.assertEqual(conn.execute("SELECT row_id FROM transactions_view LIMIT 1").fetchone()[0],
+                         conn.execute("SELECT lower(hex(row_id)) FROM transactions LIMIT 1").fetchone()[0])
+
+        self.txn_store.migrate(KeyMode.TEXT)
+        pd.testing.assert_frame_equal(self.txn_store.get_transactions().sort_values("raw_data").reset_index(drop=True), expected)
+
+    def test_migrate_reports_rows_without_raw_data(self):
+        """
+        Test that rows without raw_data, which all get the same key, are reported when migrate keeps only one.
+        """
+        self.txn_store.store_transactions(self._sample_transactions(3))
+        self.txn_store.get_connection().executemany(
+            "INSERT INTO transactions (row_id, raw_data, narration, txn_type) VALUES (?, NULL, 'ATM', '')", [("x",), ("y",)])
+
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.txn_store.migrate(KeyMode.BLOB)
+        self.assertIn("Migrated 4 transactions.", output.getvalue())
+        self.assertIn("Dropped 1 transactions with a duplicate or missing raw_data key.", output.getvalue())
+
+    def test_update_transactions_from_csv_skips_rows_without_raw_data(self):
+        """
+        Test that rows without raw_data are skipped instead of failing the import.
+        """
+        transactions = self._sample_transactions(2)
+        self.txn_store.store_transactions(transactions)
+        csv_file = "../../test_output/test_updated_transactions.csv"
+        self.addCleanup(lambda: os.path.exists(csv_file) and os.remove(csv_file))
+        pd.DataFrame({
+            "raw_data": [transactions[0]["raw-data"], None],
+            "type": ["Expense", "Expense"], "category": ["Food", "Food"], "sub-category": ["Snacks", "Snacks"],
+            "state": [TxnState.ACCEPTED, TxnState.ACCEPTED],
+        }).to_csv(csv_file, index=False)
+
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.txn_store.update_transactions_from_csv(csv_file)
+        self.assertIn("Skipping 1 rows without raw_data", output.getvalue())
+        self.assertEqual(self.txn_store.get_labelled_transactions()["raw_data"].tolist(), [transactions[0]["raw-data"]])
+
+    def test_narrations_are_interned(self):
+        """
+        Test that each distinct narration is stored once and resolved through the view when interned.
+        """
+        txn_store = TxnStore(":memory:", self.test_csv_file, intern_narrations=True)
+        transactions = self._sample_transactions(6)
+        for transaction in transactions[3:]:
+            transaction["narration"] = "NETBANKING TRANSFER"
+        txn_store.store_transactions(transactions)
+
+        conn = txn_store.get_connection()
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM narrations").fetchone()[0], 4)
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM transactions WHERE narration IS NOT NULL").fetchone()[0], 0)
+        df = txn_store.get_transactions()
+        self.assertEqual((df["narration"] == "NETBANKING TRANSFER").sum(), 3)
+        self.assertEqual(df.loc[df["narration"] == "NETBANKING TRANSFER", "narration_id"].nunique(), 1)
+
+        updated = txn_store.update_transaction(transactions[4]["txn-date"], "NETBANKING TRANSFER", transactions[4]["txn-amount"], "",
+                                               "Transfer", "Self", "", TxnState.ACCEPTED)
+        self.assertEqual(updated, 1)
+        txn_store.close()
+
+    def test_labelled_and_unlabelled_transactions(self):
+        """
+        Test that labelled transactions are queried on their own and unlabelled ones come in batches by narration.
+        """
+        transactions = self._sample_transactions(7)
+        transactions[0].update({"txn-type": "Expense", "category": "Food", "sub-category": "Snacks"})
+        self.txn_store.store_transactions(transactions)
+
+        self.assertEqual(self.txn_store.get_labelled_transactions()["narration"].tolist(), ["UPI-MERCHANT 0"])
+        batches = list(self.txn_store.iter_unlabelled_transactions(4))
+        self.assertEqual([len(batch) for batch in batches], [4, 2])
+        narrations = pd.concat(batches)["narration"].tolist()
+        self.assertEqual(narrations, sorted(f"UPI-MERCHANT {day}" for day in range(1, 7)))
+
+    def test_narration_ids_are_filled_for_existing_databases(self):
+        """
+        Test that a database created before the narrations table gets its narration ids on open.
+        """
+        db_file = "../../test_output/test_legacy.db"
+        self.addCleanup(lambda: os.path.exists(db_file) and os.remove(db_file))
+        conn = sqlite3.connect(db_file)
+        conn.execute("""
+            CREATE TABLE transactions (
+                row_id TEXT PRIMARY KEY, raw_data TEXT, txn_source TEXT, txn_date TEXT, narration TEXT, txn_amount REAL,
+                credit_indicator TEXT, txn_type TEXT, category TEXT, sub_category TEXT, state TEXT
+            )
+        """)
+        conn.executemany("INSERT INTO transactions (row_id, raw_data, narration, txn_type) VALUES (?, ?, ?, '')",
+                         [("a", "a|UPI-SHOP", "UPI-SHOP"), ("b", "b|UPI-SHOP", "UPI-SHOP"), ("c", "c|ATM", "ATM")])
+        conn.commit()
+        conn.close()
+
+        txn_store = TxnStore(db_file, self.test_csv_file)
+        df = txn_store.get_transactions()
+        self.assertEqual(df.groupby("narration")["narration_id"].nunique().to_dict(), {"ATM": 1, "UPI-SHOP": 1})
+        self.assertEqual(df["narration_id"].nunique(), 2)
+        txn_store.close()
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
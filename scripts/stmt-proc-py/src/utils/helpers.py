@@ -44,3 +44,19 @@ def parse_date_util(date_str):
         print(f"Error parsing date: {date_str}")
         return None
     
+
+def file_content_hash(file_path, chunk_size=1024 * 1024):
+    """
+    Calculate the SHA-256 hex digest of a file's content.
+    Args:
+        file_path (str): The path to the file.
+        chunk_size (int): The number of bytes read at a time.
+    Returns:
+        str: The hex digest of the file content.
+    """
+    import hashlib
+    hasher = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
@@ -0,0 +1,128 @@
+"""
+instrumentation.py
+Lightweight run instrumentation: stage timers, row counters and peak memory snapshots,
+collected for the whole run and written as a JSON report.
+
+Stages are recorded by name; a stage entered several times (e.g. once per batch) accumulates
+its calls, seconds and rows. Recording is always on, its cost is a few clock reads per stage.
+
+Example:
+    with stage("store.insert") as s:
+        ...
+        s.rows = len(rows)
+"""
+import functools
+import json
+import sys
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+_started = time.perf_counter()
+_stages = {}
+_counters = {}
+_snapshots = []
+
+
+class Stage:
+    """The handle of a running stage; set rows to the number of rows it processed."""
+
+    def __init__(self, name):
+        self.name = name
+        self.rows = None
+
+
+def peak_rss_mb():
+    """
+    Return the peak resident set size of the process in MiB, or None if it is not available.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KiB elsewhere
+    return round(peak / (2 ** 20 if sys.platform == "darwin" else 2 ** 10), 1)
+
+
+@contextmanager
+def stage(name):
+    """
+    Time a pipeline stage.
+    Args:
+        name (str): The stage name, e.g. 'parse.hdfc-sa' or 'classifier.vectorize'.
+    Yields:
+        Stage: The handle to set the number of processed rows on.
+    """
+    handle = Stage(name)
+    start = time.perf_counter()
+    try:
+        yield handle
+    finally:
+        seconds = time.perf_counter() - start
+        entry = _stages.setdefault(name, {"calls": 0, "seconds": 0.0, "rows": 0})
+        entry["calls"] += 1
+        entry["seconds"] += seconds
+        if handle.rows is not None:
+            entry["rows"] += int(handle.rows)
+        entry["peak_rss_mb"] = peak_rss_mb()
+
+
+def timed(name):
+    """Decorator recording every call of a function as the given stage."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count(name, value=1):
+    """Add value to the counter of the given name."""
+    _counters[name] = _counters.get(name, 0) + value
+
+
+def snapshot(label):
+    """Record the peak memory of the process at this point of the run."""
+    _snapshots.append({"label": label, "seconds": round(time.perf_counter() - _started, 3), "peak_rss_mb": peak_rss_mb()})
+
+
+def report():
+    """
+    Return the run report.
+    Returns:
+        dict: The stages (with calls, seconds, rows, rows per second and peak RSS at their last exit),
+            the counters, the memory snapshots, the total seconds and the peak RSS of the run.
+    """
+    stages = {}
+    for name, entry in _stages.items():
+        stages[name] = dict(entry, seconds=round(entry["seconds"], 4))
+        if entry["rows"] and entry["seconds"] > 0:
+            stages[name]["rows_per_second"] = round(entry["rows"] / entry["seconds"], 1)
+    return {
+        "seconds": round(time.perf_counter() - _started, 3),
+        "peak_rss_mb": peak_rss_mb(),
+        "stages": stages,
+        "counters": dict(_counters),
+        "snapshots": list(_snapshots),
+    }
+
+
+def write_report(report_file):
+    """Write the run report to a JSON file."""
+    with open(report_file, "w") as file:
+        json.dump(report(), file, indent=2)
+    print(f"Run report written to {report_file}")
+
+
+def reset():
+    """Discard everything recorded so far and restart the run clock."""
+    global _started
+    _started = time.perf_counter()
+    _stages.clear()
+    _counters.clear()
+    _snapshots.clear()